@@ -0,0 +1,283 @@
+"""
+Benchmarks of the Python-side cost of the ftd2xx wrapper, run without
+hardware.
+
+Two backends are available. ``stub`` answers the hot FT_* functions without
+doing anything, so the figures are the overhead of the wrapper alone.
+``sim`` is the simulator of :mod:`ftd2xx.sim`, whose loopback device also
+copies the data. For each call the time per call and the memory allocated
+per call (traced with tracemalloc) are reported, and the throughput of a
+write and read back is measured for a range of chunk sizes.
+:example:
+    pip install -e .
+    python benchmarks/bench_ftd2xx.py --json results.json
+    python benchmarks/bench_ftd2xx.py --baseline results.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any, Callable
+
+import ftd2xx
+from ftd2xx import sim
+from ftd2xx.ftd2xx import call_ft
+
+CHUNK_SIZES = [64, 512, 4096, 65536, 1 << 20]
+
+
+def stubBackend() -> types.ModuleType:
+    """Return a backend that enumerates and opens like the simulator, but
+    whose data and status functions return at once"""
+    stub = types.ModuleType("ftd2xx_stub")
+    stub.__dict__.update(
+        (name, value) for name, value in vars(sim).items() if not name.startswith("__")
+    )
+
+    def FT_Read(handle, buffer, nbytes, read):
+        sim._store(read, sim._int(nbytes))
+        return 0
+
+    def FT_Write(handle, data, nbytes, written):
+        sim._store(written, sim._int(nbytes))
+        return 0
+
+    def FT_GetQueueStatus(handle, count):
+        sim._store(count, 0)
+        return 0
+
+    def FT_GetStatus(handle, rx, tx, events):
+        sim._store(rx, 0)
+        sim._store(tx, 0)
+        sim._store(events, 0)
+        return 0
+
+    stub.FT_Read = FT_Read
+    stub.FT_Write = FT_Write
+    stub.FT_GetQueueStatus = FT_GetQueueStatus
+    stub.FT_GetStatus = FT_GetStatus
+    return stub
+
+
+def _noop(*args: Any) -> int:
+    return 0
+
+
+def timeCall(function: Callable[[], Any], number: int, repeat: int) -> float:
+    """Return the best time per call in ns over repeat runs of number calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter_ns() - start) / number)
+    return best
+
+
+def allocations(function: Callable[[], Any], number: int) -> dict[str, float]:
+    """Trace number calls and return the peak bytes allocated by one call,
+    and the blocks and bytes still allocated per call afterwards"""
+    function()  # warm up caches
+    tracemalloc.start()
+    try:
+        peak = 0
+        before = tracemalloc.take_snapshot()
+        for _ in range(number):
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+            else:
+                tracemalloc.clear_traces()
+                current = 0
+            function()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = [
+        stat
+        for stat in after.compare_to(before, "filename")
+        if stat.traceback[0].filename != tracemalloc.__file__
+    ]
+    return {
+        "peak_bytes_per_call": peak,
+        "retained_blocks_per_call": sum(s.count_diff for s in stats) / number,
+        "retained_bytes_per_call": sum(s.size_diff for s in stats) / number,
+    }
+
+
+def callBenchmarks(
+    device: ftd2xx.FTD2XX, simulated: sim.SimDevice, number: int, repeat: int
+) -> dict[str, dict[str, float]]:
+    buffer = bytearray(64)
+    # Each case with the number of bytes it reads per call, queued beforehand
+    # so that the reads do not wait for the read timeout
+    cases: dict[str, tuple[Callable[[], Any], int]] = {
+        "call_ft": (lambda: call_ft(_noop, device.handle), 0),
+        "read": (lambda: device.read(64), 64),
+        "readinto": (lambda: device.readinto(buffer), 64),
+        "write": (lambda: device.write(b"\x55" * 64), 0),
+        "getQueueStatus": (device.getQueueStatus, 0),
+        "getStatus": (device.getStatus, 0),
+        "getDeviceInfoDetail": (
+            lambda: ftd2xx.getDeviceInfoDetail(0, update=False),
+            0,
+        ),
+    }
+    traced = min(number, 1000)
+    results = {}
+    for name, (function, consumed) in cases.items():
+        device.purge()
+        simulated.feed(bytes(consumed * number * repeat))
+        result = {"ns_per_call": timeCall(function, number, repeat)}
+        device.purge()
+        simulated.feed(bytes(consumed * (traced + 1)))
+        result.update(allocations(function, traced))
+        results[name] = result
+    device.purge()
+    return results
+
+
+def throughput(
+    device: ftd2xx.FTD2XX, size: int, total: int, repeat: int
+) -> dict[str, float]:
+    """Write total bytes in chunks of size and read each one back"""
+    data = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    buffer = bytearray(size)
+    count = max(1, total // size)
+    best = float("inf")
+    for _ in range(repeat):
+        device.purge()
+        start = time.perf_counter()
+        for _ in range(count):
+            device.write(data)
+            device.readinto(buffer)
+        best = min(best, time.perf_counter() - start)
+    nbytes = count * size
+    return {
+        "chunk_size": size,
+        "chunks": count,
+        "mb_per_s": nbytes / best / 1e6,
+        "us_per_chunk": best / count * 1e6,
+    }
+
+
+def run(
+    backend: str, number: int, repeat: int, sizes: list[int], total: int
+) -> dict[str, Any]:
+    previous = ftd2xx.getBackend()
+    ftd2xx.setBackend(stubBackend() if backend == "stub" else sim)
+    # Data arrives at once, so small chunks do not wait for the latency timer
+    sim.reset(default=False)
+    simulated = sim.addDevice(packet_size=1)
+    try:
+        ftd2xx.createDeviceInfoList()
+        with ftd2xx.open(0, update=False) as device:
+            device.setTimeouts(1000, 1000)
+            calls = callBenchmarks(device, simulated, number, repeat)
+            transfers = [throughput(device, size, total, repeat) for size in sizes]
+    finally:
+        ftd2xx.setBackend(previous)
+        sim.reset()
+    return {
+        "backend": backend,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": sys.platform,
+        "number": number,
+        "repeat": repeat,
+        "calls": calls,
+        "throughput": transfers,
+    }
+
+
+def regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return a description of each figure worse than baseline by more than
+    the tolerance fraction"""
+    found = []
+    for name, result in results["calls"].items():
+        old = baseline.get("calls", {}).get(name)
+        if old and result["ns_per_call"] > old["ns_per_call"] * (1 + tolerance):
+            found.append(
+                f"{name}: {result['ns_per_call']:.0f} ns/call, "
+                f"was {old['ns_per_call']:.0f}"
+            )
+    old_rates = {t["chunk_size"]: t for t in baseline.get("throughput", [])}
+    for result in results["throughput"]:
+        old = old_rates.get(result["chunk_size"])
+        if old and result["mb_per_s"] < old["mb_per_s"] / (1 + tolerance):
+            found.append(
+                f"{result['chunk_size']} byte chunks: {result['mb_per_s']:.1f} MB/s, "
+                f"was {old['mb_per_s']:.1f}"
+            )
+    return found
+
+
+def report(results: dict[str, Any]) -> None:
+    print(f"backend {results['backend']}, Python {results['python']}")
+    print(f"{'call':<20} {'ns/call':>10} {'peak B':>8} {'kept blk':>9}")
+    for name, result in results["calls"].items():
+        print(
+            f"{name:<20} {result['ns_per_call']:>10.0f} "
+            f"{result['peak_bytes_per_call']:>8.0f} "
+            f"{result['retained_blocks_per_call']:>9.3f}"
+        )
+    print(f"{'chunk':>8} {'MB/s':>10} {'us/chunk':>10}")
+    for result in results["throughput"]:
+        print(
+            f"{result['chunk_size']:>8} {result['mb_per_s']:>10.1f} "
+            f"{result['us_per_chunk']:>10.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=["stub", "sim"], default="stub")
+    parser.add_argument("--number", type=int, default=10000, help="calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs, best is kept")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=CHUNK_SIZES, help="chunk sizes"
+    )
+    parser.add_argument(
+        "--total", type=int, default=16 << 20, help="bytes per throughput run"
+    )
+    parser.add_argument("--json", help="write the results to this file, - for stdout")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="fraction by which a figure may be worse than the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.backend, args.number, args.repeat, args.sizes, args.total)
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        report(results)
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,9 @@ Use :any:`ftd2xx.open` or :any:`ftd2xx.openEx`.
         device.write(b"Hello World!")
 """
 
+import importlib
 import sys
+from typing import TYPE_CHECKING, Any
 
 try:
     from _version import (
@@ -18,30 +20,115 @@ except ImportError:
     __version__ = "unknown"
     __version_tuple__ = (0, 0, 0, "unknown", "unknown")
 
+from ._loader import setLibraryPath
 from .ftd2xx import (
     FTD2XX,
     DeviceError,
+    DeviceNotFoundError,
+    DeviceNotOpenedError,
+    DeviceNotOpenedForEraseError,
+    DeviceNotOpenedForWriteError,
+    DeviceRecord,
+    DeviceStatus,
+    EepromEraseFailedError,
+    EepromNotPresentError,
+    EepromNotProgrammedError,
+    EepromReadFailedError,
+    EepromWriteFailedError,
+    FailedToWriteDeviceError,
+    InsufficientResourcesError,
+    InvalidArgsError,
+    InvalidBaudRateError,
+    InvalidHandleError,
+    InvalidParameterError,
+    IoError,
+    NotSupportedError,
+    OtherError,
+    WriteTimeoutError,
     call_ft,
     createDeviceInfoList,
     ft_program_data,
+    getBackend,
     getDeviceInfoDetail,
+    getDeviceInfoList,
     getLibraryVersion,
     listDevices,
     open,
     openEx,
+    pollAll,
+    setBackend,
+    statusDtype,
 )
 
+if TYPE_CHECKING:
+    from .directory import DeviceDirectory, deviceDirectory
+    from .group import openChip
+    from .pool import DevicePool
+    from .stream import StreamReader
+
+# Names from submodules that are imported on first use, so that importing the
+# package does not pay for threads, executors and the like
+_LAZY = {
+    "DeviceDirectory": "directory",
+    "deviceDirectory": "directory",
+    "DevicePool": "pool",
+    "StreamReader": "stream",
+    "openChip": "group",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     "call_ft",
+    "setBackend",
+    "getBackend",
     "listDevices",
     "getLibraryVersion",
     "createDeviceInfoList",
     "getDeviceInfoDetail",
+    "getDeviceInfoList",
     "open",
     "openEx",
+    "openChip",
     "FTD2XX",
+    "DeviceRecord",
+    "DeviceStatus",
     "DeviceError",
+    "InvalidHandleError",
+    "DeviceNotFoundError",
+    "DeviceNotOpenedError",
+    "IoError",
+    "InsufficientResourcesError",
+    "InvalidParameterError",
+    "InvalidBaudRateError",
+    "DeviceNotOpenedForEraseError",
+    "DeviceNotOpenedForWriteError",
+    "FailedToWriteDeviceError",
+    "EepromReadFailedError",
+    "EepromWriteFailedError",
+    "EepromEraseFailedError",
+    "EepromNotPresentError",
+    "EepromNotProgrammedError",
+    "InvalidArgsError",
+    "NotSupportedError",
+    "OtherError",
+    "WriteTimeoutError",
     "ft_program_data",
+    "pollAll",
+    "statusDtype",
+    "DeviceDirectory",
+    "deviceDirectory",
+    "DevicePool",
+    "StreamReader",
+    "setLibraryPath",
 ]
 if sys.platform == "win32":
     from .ftd2xx import w32CreateFile
@@ -33,6 +33,8 @@ from ctypes.wintypes import (
     LONG,
 )
 
+from ._loader import LazyLibrary, getLibraryPath
+
 
 STRING = c_char_p
 UCHAR = c_ubyte
@@ -76,25 +78,34 @@ SECURITY_ATTRIBUTES = _SECURITY_ATTRIBUTES
 
 _libraries = {}
 
-# If you need non-standard DLL directory, set FTD2XX_DLL_DIR to absoluate path to dll
-extra_dll_dir = os.environ.get("FTD2XX_DLL_DIR")
-if extra_dll_dir:
-    os.add_dll_directory(extra_dll_dir)
-try:
-    _libraries["ftd2xx.dll"] = WinDLL("ftd2xx64.dll")
-except OSError:  # 32-bit, or 64-bit library with plain name
+
+def _loadLibrary():
+    # If you need non-standard DLL directory, set FTD2XX_DLL_DIR to absoluate path to dll
+    extra_dll_dir = os.environ.get("FTD2XX_DLL_DIR")
+    if extra_dll_dir:
+        os.add_dll_directory(extra_dll_dir)
+    path = getLibraryPath("")
+    if path:
+        return WinDLL(path)
     try:
-        _libraries["ftd2xx.dll"] = WinDLL("ftd2xx.dll")
-    except OSError as e:
-        if e.winerror == 126:
-            error_message = (
-                e.args[1] + "Unable to find D2XX DLL. "
-                "Please make sure that the directory containing your DLL is in "
-                "one (or both) environment variables: 'PATH', 'FTD2XX_DLL_DIR'. "
-                "Also, you must use 'ftd2xx.dll' or 'ftd2xx64.dll' as the filename."
-            )
-            e.args = (e.args[0], error_message) + e.args[2:]
-        raise e
+        return WinDLL("ftd2xx64.dll")
+    except OSError:  # 32-bit, or 64-bit library with plain name
+        try:
+            return WinDLL("ftd2xx.dll")
+        except OSError as e:
+            if e.winerror == 126:
+                error_message = (
+                    e.args[1] + "Unable to find D2XX DLL. "
+                    "Please make sure that the directory containing your DLL is in "
+                    "one (or both) environment variables: 'PATH', 'FTD2XX_DLL_DIR'. "
+                    "Also, you must use 'ftd2xx.dll' or 'ftd2xx64.dll' as the filename."
+                )
+                e.args = (e.args[0], error_message) + e.args[2:]
+            raise e
+
+
+# Loaded on first call, see _loader
+_libraries["ftd2xx.dll"] = LazyLibrary(_loadLibrary, globals())
 
 
 FT_HANDLE = PVOID
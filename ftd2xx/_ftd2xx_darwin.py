@@ -3,9 +3,14 @@
 # flags '-kdefst -d -c -o _ftd2xx_osx.py ftd2xx.xml -l ftd2xx'
 from ctypes import *
 
+from ._loader import LazyLibrary, getLibraryPath
+
 STRING = c_char_p
 _libraries = {}
-_libraries["/usr/local/lib/libftd2xx.dylib"] = CDLL("/usr/local/lib/libftd2xx.dylib")
+# Loaded on first call, see _loader
+_libraries["/usr/local/lib/libftd2xx.dylib"] = LazyLibrary(
+    lambda: CDLL(getLibraryPath("/usr/local/lib/libftd2xx.dylib")), globals()
+)
 
 
 FT_IO_ERROR = 4
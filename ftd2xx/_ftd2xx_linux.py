@@ -22,8 +22,13 @@ from ctypes import (
 )
 from typing import List
 
+from ._loader import LazyLibrary, getLibraryPath
+
 _libraries = {}
-_libraries["libftd2xx.so"] = CDLL("libftd2xx.so")
+# Loaded on first call, see _loader
+_libraries["libftd2xx.so"] = LazyLibrary(
+    lambda: CDLL(getLibraryPath("libftd2xx.so")), globals()
+)
 STRING = c_char_p
 
 FT_DEVICE_BM = 0
@@ -0,0 +1,140 @@
+"""
+Deferred loading of the D2XX library.
+
+The platform modules bind their prototypes to a :class:`LazyLibrary`, whose
+attributes are :class:`LazyFunction` placeholders recording ``restype``,
+``argtypes``, ``errcheck`` and the docstring. The library is only loaded,
+and each symbol only resolved, when a function is first called; the resolved
+ctypes function then replaces the placeholder in the platform module, so
+later calls go straight to ctypes.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable
+
+#: Environment variable overriding the path or name of the D2XX library
+LIBRARY_PATH_ENV = "FTD2XX_LIBRARY_PATH"
+
+_libraryPath: str | None = None
+_lock = threading.RLock()
+
+_PROTOTYPE = ("restype", "argtypes", "errcheck", "__doc__")
+
+
+def setLibraryPath(path: str | os.PathLike | None) -> None:
+    """Load the D2XX library from path instead of the default location. Only
+    takes effect if the library has not been loaded yet; None restores the
+    default."""
+    global _libraryPath
+    _libraryPath = None if path is None else os.fspath(path)
+
+
+def getLibraryPath(default: str) -> str:
+    """Return the D2XX library to load: the path given to
+    :func:`setLibraryPath`, else the FTD2XX_LIBRARY_PATH environment
+    variable, else default"""
+    return _libraryPath or os.environ.get(LIBRARY_PATH_ENV) or default
+
+
+class LazyLibrary:
+    """Stand-in for a ctypes library that is loaded on first use"""
+
+    def __init__(self, load: Callable[[], Any], namespace: dict | None = None):
+        """
+        Args:
+            load: Returns the loaded ctypes library.
+            namespace: Globals of the module binding the functions, where
+                resolved functions replace their placeholders.
+        """
+        self._load = load
+        self._namespace = namespace
+        self._library: Any = None
+        self._functions: dict[str, LazyFunction] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._library is not None
+
+    @property
+    def library(self) -> Any:
+        """The ctypes library, loaded on first access"""
+        if self._library is None:
+            with _lock:
+                if self._library is None:
+                    self._library = self._load()
+        return self._library
+
+    def __getattr__(self, name: str) -> LazyFunction:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        function = self._functions.get(name)
+        if function is None:
+            function = self._functions[name] = LazyFunction(self, name)
+        return function
+
+    def resolve(self, name: str) -> Any:
+        """Resolve the function name now"""
+        return self.__getattr__(name).resolve()
+
+    def resolveAll(self) -> None:
+        """Resolve every function bound so far, e.g. to fail early on a
+        missing library"""
+        for function in list(self._functions.values()):
+            function.resolve()
+
+
+class LazyFunction:
+    """Placeholder for a library function, resolved when first called"""
+
+    def __init__(self, library: LazyLibrary, name: str):
+        object.__setattr__(self, "_library", library)
+        object.__setattr__(self, "__name__", name)
+        object.__setattr__(self, "_prototype", {})
+        object.__setattr__(self, "_function", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in _PROTOTYPE:
+            raise AttributeError(f"Cannot set {name} on an unresolved function")
+        if self._function is not None:
+            setattr(self._function, name, value)
+        self._prototype[name] = value
+        if name == "__doc__":
+            object.__setattr__(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        prototype = object.__getattribute__(self, "_prototype")
+        if name in prototype:
+            return prototype[name]
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def resolve(self) -> Any:
+        """Look the function up in the library, apply the recorded prototype
+        and put it in place of this placeholder"""
+        function = self._function
+        if function is not None:
+            return function
+        library = self._library
+        with _lock:
+            function = getattr(library.library, self.__name__)
+            for name, value in self._prototype.items():
+                setattr(function, name, value)
+            object.__setattr__(self, "_function", function)
+            namespace = library._namespace
+            if namespace is not None and namespace.get(self.__name__) is self:
+                namespace[self.__name__] = function
+        return function
+
+    def __call__(self, *args: Any) -> Any:
+        return self.resolve()(*args)
+
+    def __repr__(self) -> str:
+        state = "resolved" if self._function is not None else "unresolved"
+        return f"<{state} D2XX function {self.__name__}>"
+
+
+__all__ = ["LazyFunction", "LazyLibrary", "getLibraryPath", "setLibraryPath"]
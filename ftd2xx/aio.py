@@ -0,0 +1,265 @@
+"""
+asyncio integration for FTDI devices.
+
+Each device is serviced by its own reader and writer threads which hand
+received data to the event loop and drain data queued by the transport, so
+coroutines only wake up when data arrives and no executor future is created
+per call.
+:example:
+    reader, writer = await ftd2xx.aio.open_connection(serial=b"FT123456")
+    writer.write(b"AT\\r")
+    reply = await reader.readuntil(b"\\r")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import functools
+import threading
+import time
+from typing import Any, Callable, Protocol
+
+from .directory import deviceDirectory
+
+
+class _Device(Protocol):
+    """Methods of :class:`~ftd2xx.FTD2XX` the transport threads use"""
+
+    def setTimeouts(self, read: int, write: int) -> None: ...
+
+    def getQueueStatus(self) -> int: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+    def write_all(self, data: Any, deadline: float | None = None) -> int: ...
+
+    def close(self) -> None: ...
+
+
+class FTD2XXTransport(asyncio.Transport):
+    """asyncio transport over an open FTD2XX device.
+
+    The transport owns the device and closes it once both I/O threads have
+    stopped. Reads ask the driver for everything it has queued, blocking for at
+    most ``read_timeout`` milliseconds when nothing is pending. Writes cut
+    short by ``write_timeout`` are retried for ``write_deadline`` seconds, or
+    until one sends nothing if None, before the connection is lost with
+    :class:`~ftd2xx.WriteTimeoutError`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        protocol: asyncio.Protocol,
+        device: _Device,
+        chunk_size: int = 1 << 16,
+        read_timeout: int = 10,
+        write_timeout: int = 1000,
+        write_deadline: float | None = None,
+    ):
+        super().__init__({"device": device})
+        self._loop = loop
+        self._protocol = protocol
+        self._device = device
+        self._chunk_size = chunk_size
+        self._read_timeout = read_timeout
+        self._write_deadline = write_deadline
+        self._cond = threading.Condition()
+        self._buffer: collections.deque[bytes] = collections.deque()
+        self._bufferSize = 0
+        self._highWater = 1 << 16
+        self._lowWater = 1 << 14
+        self._protocolPaused = False
+        self._reading = threading.Event()
+        self._reading.set()
+        self._closing = False
+        self._aborted = False
+        self._exc: Exception | None = None
+        self._alive = 2
+        device.setTimeouts(read_timeout, write_timeout)
+        loop.call_soon(protocol.connection_made, self)
+        for target, name in ((self._reader, "reader"), (self._writer, "writer")):
+            threading.Thread(
+                target=target, name=f"ftd2xx-aio-{name}", daemon=True
+            ).start()
+
+    # I/O threads
+
+    def _reader(self) -> None:
+        device = self._device
+        view = memoryview(bytearray(self._chunk_size))
+        try:
+            while not self._closing:
+                if not self._reading.wait(self._read_timeout / 1000):
+                    continue
+                want = min(max(device.getQueueStatus(), 1), self._chunk_size)
+                got = device.readinto(view[:want])
+                if got and not self._closing:
+                    self._loop.call_soon_threadsafe(
+                        self._protocol.data_received, bytes(view[:got])
+                    )
+        except Exception as exc:  # noqa: BLE001 - ends the connection with it
+            self._loop.call_soon_threadsafe(self._fatalError, exc)
+        finally:
+            self._threadDone()
+
+    def _writer(self) -> None:
+        device = self._device
+        limit = self._write_deadline
+        try:
+            while True:
+                with self._cond:
+                    while not self._buffer and not self._closing:
+                        self._cond.wait()
+                    if not self._buffer or self._aborted:
+                        break
+                    data = b"".join(self._buffer)
+                    self._buffer.clear()
+                deadline = None if limit is None else time.monotonic() + limit
+                device.write_all(data, deadline)
+                with self._cond:
+                    # abort() already emptied the buffer, data included
+                    if not self._aborted:
+                        self._bufferSize -= len(data)
+                    resume = self._protocolPaused and self._bufferSize <= self._lowWater
+                if resume:
+                    self._loop.call_soon_threadsafe(self._maybeResumeProtocol)
+        except Exception as exc:  # noqa: BLE001 - ends the connection with it
+            self._loop.call_soon_threadsafe(self._fatalError, exc)
+        finally:
+            self._threadDone()
+
+    def _threadDone(self) -> None:
+        with self._cond:
+            self._alive -= 1
+            last = not self._alive
+        if last:
+            try:
+                self._device.close()
+            finally:
+                self._loop.call_soon_threadsafe(self._connectionLost)
+
+    # Event loop side
+
+    def _connectionLost(self) -> None:
+        self._protocol.connection_lost(self._exc)
+
+    def _fatalError(self, exc: Exception) -> None:
+        if self._exc is None:
+            self._exc = exc
+        self.abort()
+
+    def _maybeResumeProtocol(self) -> None:
+        if self._protocolPaused and self._bufferSize <= self._lowWater:
+            self._protocolPaused = False
+            self._protocol.resume_writing()
+
+    def write(self, data: bytes | bytearray | memoryview) -> None:
+        """Queue data to be written by the writer thread"""
+        if self._closing or not data:
+            return
+        data = bytes(data)
+        with self._cond:
+            self._buffer.append(data)
+            self._bufferSize += len(data)
+            size = self._bufferSize
+            self._cond.notify()
+        if size > self._highWater and not self._protocolPaused:
+            self._protocolPaused = True
+            self._protocol.pause_writing()
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def get_write_buffer_size(self) -> int:
+        return self._bufferSize
+
+    def get_write_buffer_limits(self) -> tuple[int, int]:
+        return (self._lowWater, self._highWater)
+
+    def set_write_buffer_limits(
+        self, high: int | None = None, low: int | None = None
+    ) -> None:
+        if high is None:
+            high = 1 << 16 if low is None else 4 * low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError(f"high ({high!r}) must be >= low ({low!r}) must be >= 0")
+        self._highWater, self._lowWater = high, low
+
+    def pause_reading(self) -> None:
+        self._reading.clear()
+
+    def resume_reading(self) -> None:
+        self._reading.set()
+
+    def is_reading(self) -> bool:
+        return self._reading.is_set() and not self._closing
+
+    def set_protocol(self, protocol: asyncio.BaseProtocol) -> None:
+        self._protocol = protocol  # type: ignore[assignment]
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self._protocol
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        """Stop reading, send the queued data then close the device"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._reading.set()
+
+    def abort(self) -> None:
+        """Close the device, discarding any queued data"""
+        with self._cond:
+            self._aborted = True
+            self._closing = True
+            self._buffer.clear()
+            self._bufferSize = 0
+            self._cond.notify()
+        self._reading.set()
+
+
+async def create_connection(
+    protocol_factory: Callable[[], asyncio.Protocol], device: _Device, **kwargs: Any
+) -> tuple[FTD2XXTransport, asyncio.Protocol]:
+    """Wrap an open device in a :class:`FTD2XXTransport` connected to a
+    protocol created by protocol_factory. Extra keyword arguments are passed to
+    the transport."""
+    loop = asyncio.get_running_loop()
+    protocol = protocol_factory()
+    transport = FTD2XXTransport(loop, protocol, device, **kwargs)
+    return transport, protocol
+
+
+async def open_connection(
+    serial: bytes | None = None,
+    description: bytes | None = None,
+    location: int | None = None,
+    *,
+    device: _Device | None = None,
+    limit: int = 1 << 16,
+    **kwargs: Any,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a device through :data:`~ftd2xx.deviceDirectory` (or use an already
+    open device) and return a (StreamReader, StreamWriter) pair for it. Extra
+    keyword arguments are passed to the transport."""
+    loop = asyncio.get_running_loop()
+    if device is None:
+        device = await loop.run_in_executor(
+            None,
+            functools.partial(deviceDirectory.open, serial, description, location),
+        )
+    reader = asyncio.StreamReader(limit=limit)
+    protocol = asyncio.StreamReaderProtocol(reader)
+    transport, _ = await create_connection(lambda: protocol, device, **kwargs)
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
+
+
+__all__ = ["FTD2XXTransport", "create_connection", "open_connection"]
@@ -0,0 +1,174 @@
+"""
+Bit-bang waveforms as NumPy arrays.
+
+Signals are given per pin as arrays of levels, or as run-length segments,
+and packed into the byte stream the device plays with a few vectorized NumPy
+operations. :class:`BitBang` streams that stream with large writes, and in
+synchronous mode reads the pin samples back and splits them per pin again.
+NumPy is an optional dependency, install it with the ``numpy`` extra.
+:example:
+    bang = BitBang(device, direction=0x03, baudrate=1_000_000)
+    clock = fromSegments([(0, 1), (1, 1)] * 4096)
+    pins = bang.play({0: clock, 1: ~clock})
+    print(pins[2])
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping, Protocol
+
+from . import defines
+from .ftd2xx import DeviceError
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise ImportError("The bitbang module needs numpy: pip install ftd2xx[numpy]")
+
+
+def fromSegments(segments: Iterable[tuple[int, int]]) -> np.ndarray:
+    """Expand run-length (level, count) segments into a boolean array"""
+    _requireNumpy()
+    segments = list(segments)
+    if not segments:
+        return np.zeros(0, dtype=bool)
+    levels, counts = zip(*segments)
+    return np.repeat(np.asarray(levels, dtype=bool), np.asarray(counts, dtype=np.intp))
+
+
+def pack(signals: Mapping[int, object], length: int | None = None) -> np.ndarray:
+    """Pack per-pin signals into one byte per sample.
+
+    Args:
+        signals: Pin number 0 to 7 to an array of levels, or a single level
+            held for the whole waveform.
+        length: Number of samples. Defaults to the length of the longest
+            signal; shorter signals hold their last level.
+
+    Returns:
+        A uint8 array, bit n of each sample being the level of pin n.
+    """
+    _requireNumpy()
+    arrays = {pin: np.asarray(levels, dtype=bool) for pin, levels in signals.items()}
+    if length is None:
+        length = max((a.size for a in arrays.values() if a.ndim), default=1)
+    out: np.ndarray = np.zeros(length, dtype=np.uint8)
+    for pin, levels in arrays.items():
+        if not 0 <= pin <= 7:
+            raise ValueError(f"Pin {pin} is not one of 0 to 7")
+        if levels.ndim and levels.size < length:
+            levels = np.pad(levels, (0, length - levels.size), mode="edge")
+        elif levels.ndim:
+            levels = levels[:length]
+        out |= levels.astype(np.uint8) << np.uint8(pin)
+    return out
+
+
+def unpack(samples, pins: Iterable[int] = range(8)) -> dict[int, np.ndarray]:
+    """Split samples, one byte each, into a boolean array per pin"""
+    _requireNumpy()
+    samples = np.frombuffer(samples, dtype=np.uint8)
+    bits = np.unpackbits(samples[:, None], axis=1, bitorder="little")
+    return {pin: bits[:, pin].astype(bool) for pin in pins}
+
+
+class _Device(Protocol):
+    """Methods of :class:`~ftd2xx.FTD2XX` a :class:`BitBang` plays through"""
+
+    def setBitMode(self, mask: int, enable: int) -> None: ...
+
+    def setBaudRate(self, baud: int) -> None: ...
+
+    def purge(self, mask: int = 0) -> None: ...
+
+    def write_all(self, data: Any) -> int: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+
+class BitBang:
+    """Play waveforms on the pins of a device in bit-bang mode.
+
+    In synchronous mode the device returns one sample of all the pins for
+    every byte written, taken just before the written byte is applied, and
+    the samples are read back after each chunk of ``chunk_size`` bytes so the
+    receive buffers never overflow.
+    """
+
+    def __init__(
+        self,
+        device: _Device,
+        direction: int,
+        sync: bool = True,
+        baudrate: int | None = None,
+        chunk_size: int = 1 << 14,
+    ):
+        """Put device in bit-bang mode.
+
+        Args:
+            device (FTD2XX): An open device.
+            direction (int): Pin mask, 1 for outputs.
+            sync (bool): Synchronous bit-bang, reading a sample per write.
+            baudrate (int): Sets the sample rate, whose relation to the
+                baud rate depends on the chip.
+            chunk_size (int): Bytes written between read backs in
+                synchronous mode, and per write otherwise.
+        """
+        _requireNumpy()
+        self.device = device
+        self.direction = direction
+        self.sync = sync
+        self.chunk_size = chunk_size
+        device.setBitMode(0, defines.BITMODE_RESET)
+        mode = defines.BITMODE_SYNC_BITBANG if sync else defines.BITMODE_ASYNC_BITBANG
+        device.setBitMode(direction, mode)
+        if baudrate is not None:
+            device.setBaudRate(baudrate)
+        if sync:
+            device.purge()
+
+    def _readExactly(self, view: memoryview) -> None:
+        got = 0
+        while got < view.nbytes:
+            n = self.device.readinto(view[got:])
+            if not n:
+                raise DeviceError(
+                    f"Bit-bang read timed out after {got} of {view.nbytes} samples"
+                )
+            got += n
+
+    def write(self, samples) -> np.ndarray | None:
+        """Play samples, one byte per sample, and in synchronous mode return
+        the samples read back as a uint8 array. Sample i read back shows the
+        levels set by sample i - 1, the first one those before playing."""
+        samples = np.ascontiguousarray(samples, dtype=np.uint8)
+        out = memoryview(samples).cast("B")
+        captured = np.empty(samples.size, dtype=np.uint8) if self.sync else None
+        view = memoryview(captured).cast("B") if self.sync else None
+        for start in range(0, out.nbytes, self.chunk_size):
+            chunk = out[start : start + self.chunk_size]
+            self.device.write_all(chunk)
+            if view is not None:
+                self._readExactly(view[start : start + chunk.nbytes])
+        return captured
+
+    def play(
+        self, signals: Mapping[int, object], length: int | None = None
+    ) -> dict[int, np.ndarray] | None:
+        """Pack and play per-pin signals (see :func:`pack`), and in
+        synchronous mode return the sampled levels of every pin, lagging
+        the signals by one sample as for :meth:`write`"""
+        captured = self.write(pack(signals, length))
+        return None if captured is None else unpack(captured)
+
+    def close(self) -> None:
+        """Return the device to its default mode"""
+        self.device.setBitMode(0, defines.BITMODE_RESET)
+
+
+__all__ = ["BitBang", "fromSegments", "pack", "unpack"]
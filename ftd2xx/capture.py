@@ -0,0 +1,400 @@
+"""
+Logic analyzer capture of bit-bang samples into a memory-mapped file.
+
+:class:`Capture` runs a thread that reads the one-byte pin samples of a device
+in bit-bang mode straight into an ``mmap`` of the capture file, used as a
+ring until the :class:`Trigger` fires, so that ``pretrigger`` samples before
+the trigger are kept. Triggers are tested on whole chunks with
+``bytes.translate`` and ``bytes.find``. Finished captures are plain files of
+samples and can be exported as run-length or VCD files chunk by chunk.
+:example:
+    device.setBitMode(0x00, BITMODE_SYNC_BITBANG)
+    with Capture(device, "spi.bin", 1 << 26, Trigger.edge(0x08, rising=False),
+                 pretrigger=1 << 16) as capture:
+        capture.wait(10.0)
+    capture.exportVcd("spi.vcd", samplerate=1e6)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import mmap
+import os
+import struct
+import threading
+import traceback
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Protocol, TextIO
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+#: Format of one run of a run-length export: the sample and how many times
+#: it repeats
+RLE_FORMAT = "<BI"
+
+_MAX_RUN = 0xFFFFFFFF
+
+
+class _Device(Protocol):
+    """The :class:`~ftd2xx.FTD2XX` calls a :class:`Capture` makes"""
+
+    def setTimeouts(self, read: int, write: int) -> None: ...
+
+    def purge(self, mask: int = 0) -> None: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+
+class Trigger:
+    """A condition on the samples, found in whole chunks at a time.
+
+    Each chunk is translated to one byte per sample telling whether the
+    sample matches, and the match is searched for with ``bytes.find``. Edge
+    conditions carry the last sample of a chunk over to the next.
+    """
+
+    def __init__(self, table: bytes, needle: bytes):
+        self._table = table
+        self._needle = needle
+        self._prev = b""
+
+    @classmethod
+    def pattern(cls, mask: int, value: int) -> Trigger:
+        """Fire on the first sample whose masked pins equal value"""
+        table = bytes(int(s & mask == value & mask) for s in range(256))
+        return cls(table, b"\x01")
+
+    @classmethod
+    def edge(cls, mask: int, rising: bool = True) -> Trigger:
+        """Fire when the masked pins go from all low to any high, or from any
+        high to all low when not rising"""
+        table = bytes(int(bool(s & mask)) for s in range(256))
+        return cls(table, b"\x00\x01" if rising else b"\x01\x00")
+
+    def reset(self) -> None:
+        self._prev = b""
+
+    def find(self, chunk: bytes) -> int:
+        """Return the index in chunk of the sample that fires the trigger, or
+        -1. Chunks are expected in order."""
+        prev = self._prev
+        levels = prev + chunk.translate(self._table)
+        index = levels.find(self._needle)
+        carry = len(self._needle) - 1
+        self._prev = levels[len(levels) - carry :] if carry else b""
+        if index < 0:
+            return -1
+        return index + carry - len(prev)
+
+
+class Capture:
+    """Capture up to ``size`` samples of a device into the file at path.
+
+    Without a trigger the capture starts right away. With one, samples go
+    round a ring the size of the capture until the trigger fires, then the
+    capture runs until ``size`` samples from ``pretrigger`` samples before the
+    trigger are stored. :meth:`stop` then rotates the file so it starts with
+    the first sample and truncates it to :attr:`length`.
+    """
+
+    def __init__(
+        self,
+        device: _Device,
+        path: str | os.PathLike,
+        size: int,
+        trigger: Trigger | None = None,
+        pretrigger: int = 0,
+        chunk_size: int = 1 << 16,
+        read_timeout: int = 10,
+    ):
+        """Create the capture file. Call :meth:`start` or use the capture as
+        a context manager to start the reader thread.
+
+        Args:
+            device (FTD2XX): An open device already in bit-bang mode.
+            path: File to capture to, created or overwritten.
+            size (int): Number of samples to capture, rounded up to a whole
+                number of chunks.
+            trigger (Trigger): Condition starting the capture.
+            pretrigger (int): Samples to keep from before the trigger, at most
+                size less one chunk.
+            chunk_size (int): Largest single read from the driver, rounded up
+                to the mmap allocation granularity.
+            read_timeout (int): Device read timeout in milliseconds, set on start.
+        """
+        granularity = mmap.ALLOCATIONGRANULARITY
+        chunk_size = -(-chunk_size // granularity) * granularity
+        size = -(-size // chunk_size) * chunk_size
+        if not 0 <= pretrigger <= size - chunk_size:
+            raise ValueError("pretrigger must leave at least one chunk of capture")
+        self.device = device
+        self.path = os.fspath(path)
+        self.size = size
+        self.trigger = trigger
+        self.pretrigger = pretrigger if trigger is not None else 0
+        self.read_timeout = read_timeout
+        self._chunk_size = chunk_size
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        with contextlib.ExitStack() as stack:
+            self._file = stack.enter_context(open(self.path, "r+b"))
+            self._mmap: mmap.mmap | None = mmap.mmap(self._file.fileno(), size)
+            stack.pop_all()
+        # Samples read since start, and the index of the first one kept
+        self._head = 0
+        self._start = 0 if trigger is None else None
+        self._done = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        #: Index in the capture of the sample that fired the trigger
+        self.triggered: int | None = None if trigger is not None else 0
+        #: Number of samples in the finished capture
+        self.length = 0
+        #: Exception that stopped the reader thread, if any
+        self.error: BaseException | None = None
+
+    def start(self) -> None:
+        """Purge the device, set its timeouts and start the reader thread"""
+        if self._thread is not None or self._mmap is None:
+            return
+        self.device.setTimeouts(self.read_timeout, 0)
+        self.device.purge()
+        if self.trigger is not None:
+            self.trigger.reset()
+        self._thread = threading.Thread(
+            target=self._run, name="ftd2xx-capture", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        device = self.device
+        size = self.size
+        chunk_size = self._chunk_size
+        view = memoryview(self._mmap)
+        try:
+            while not self._stop.is_set():
+                offset = self._head % size
+                want = chunk_size - offset % chunk_size
+                if self._start is not None:
+                    want = min(want, self._start + size - self._head)
+                got = device.readinto(view[offset : offset + want])
+                if not got:
+                    continue
+                if self._start is None:
+                    index = self.trigger.find(self._mmap[offset : offset + got])
+                    if index >= 0:
+                        trigger = self._head + index
+                        self._start = max(trigger - self.pretrigger, 0)
+                        self.triggered = trigger - self._start
+                self._head += got
+                if self._start is not None and self._head - self._start >= size:
+                    break
+        except Exception as exc:  # noqa: BLE001 - re-raised by stop
+            # The frames of the traceback hold views of the mmap, which could
+            # not be closed while they live
+            traceback.clear_frames(exc.__traceback__)
+            self.error = exc
+        finally:
+            view.release()
+            self._done.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait at most timeout seconds (forever if None) for the capture to
+        fill, and return whether it did"""
+        return self._done.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop capturing and write the capture file out in sample order.
+        Without a trigger having fired, the capture is empty."""
+        if self._mmap is None:
+            return
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        mm = self._mmap
+        size = self.size
+        if self._start is None:
+            self.length = 0
+        else:
+            self.length = min(self._head - self._start, size)
+            first = self._start % size
+            if first:
+                _rotate(mm, first, self._chunk_size)
+        mm.flush()
+        mm.close()
+        self._mmap = None
+        self._file.truncate(self.length)
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+
+    def chunks(self, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """Iterate over the finished capture in chunks"""
+        with open(self.path, "rb") as f:
+            remaining = self.length
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def runs(self) -> Iterator[tuple[int, int]]:
+        """Iterate over the finished capture as (sample, count) runs. Runs
+        are found with NumPy when it is installed, a chunk at a time."""
+        return _runs(self.chunks())
+
+    def exportRle(self, path: str | os.PathLike) -> int:
+        """Write the capture as runs packed with :data:`RLE_FORMAT` and return
+        the number of runs"""
+        packer = struct.Struct(RLE_FORMAT)
+        count = 0
+        with open(path, "wb") as f:
+            for value, length in self.runs():
+                while length:
+                    run = min(length, _MAX_RUN)
+                    f.write(packer.pack(value, run))
+                    length -= run
+                    count += 1
+        return count
+
+    def exportVcd(
+        self,
+        path: str | os.PathLike,
+        samplerate: float,
+        pins: Iterable[int] = range(8),
+        names: Iterable[str] | None = None,
+    ) -> None:
+        """Write the capture as a Value Change Dump with a 1 ns timescale.
+
+        Args:
+            path: File to write.
+            samplerate (float): Samples per second.
+            pins: Pins to include, 0 to 7.
+            names: Signal names, defaults to D0 to D7.
+        """
+        pins = list(pins)
+        names = [f"D{pin}" for pin in pins] if names is None else list(names)
+        ids = [chr(33 + i) for i in range(len(pins))]
+        with open(path, "w") as f:
+            f.write("$timescale 1 ns $end\n$scope module ftd2xx $end\n")
+            f.writelines(
+                f"$var wire 1 {ident} {name} $end\n" for ident, name in zip(ids, names)
+            )
+            f.write("$upscope $end\n$enddefinitions $end\n")
+            _writeVcd(f, self.runs(), 1e9 / samplerate, pins, ids)
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the capture when exiting the context manager"""
+        self.stop()
+
+
+def _rotate(mm: mmap.mmap, first: int, block: int) -> None:
+    # Rotate mm left by first bytes in place, copying at most block bytes at
+    # a time: directly when one part fits in a block, otherwise by reversing
+    # both parts and then the whole
+    size = len(mm)
+    if first <= block:
+        head = mm[:first]
+        mm.move(0, first, size - first)
+        mm[size - first :] = head
+    elif size - first <= block:
+        tail = mm[first:]
+        mm.move(size - first, 0, first)
+        mm[: size - first] = tail
+    else:
+        _reverse(mm, 0, first, block)
+        _reverse(mm, first, size, block)
+        _reverse(mm, 0, size, block)
+
+
+def _reverse(mm: mmap.mmap, start: int, end: int, block: int) -> None:
+    while end - start > 1:
+        n = min(block, (end - start) // 2)
+        head = mm[start : start + n]
+        mm[start : start + n] = mm[end - n : end][::-1]
+        mm[end - n : end] = head[::-1]
+        start += n
+        end -= n
+
+
+def _runs(chunks: Iterable[bytes]) -> Iterator[tuple[int, int]]:
+    try:
+        import numpy as np
+    except ImportError:
+        yield from _runsSlow(chunks)
+        return
+    value, count = -1, 0
+    for chunk in chunks:
+        samples = np.frombuffer(chunk, np.uint8)
+        if not len(samples):
+            continue
+        # Start of each run, the first one carrying on from the last chunk
+        starts: np.ndarray = np.flatnonzero(samples[1:] != samples[:-1]) + 1
+        starts = np.concatenate(([0], starts))
+        values = samples[starts].tolist()
+        lengths = np.diff(starts, append=len(samples)).tolist()
+        if values[0] == value:
+            count += lengths[0]
+        else:
+            if count:
+                yield value, count
+            value, count = values[0], lengths[0]
+        if len(values) > 1:
+            yield value, count
+            yield from zip(values[1:-1], lengths[1:-1])
+            value, count = values[-1], lengths[-1]
+    if count:
+        yield value, count
+
+
+def _runsSlow(chunks: Iterable[bytes]) -> Iterator[tuple[int, int]]:
+    # Without NumPy, runs are found one sample at a time
+    value, count = -1, 0
+    for chunk in chunks:
+        for sample, group in itertools.groupby(chunk):
+            length = sum(1 for _ in group)
+            if sample == value:
+                count += length
+                continue
+            if count:
+                yield value, count
+            value, count = sample, length
+    if count:
+        yield value, count
+
+
+def _writeVcd(
+    f: TextIO, runs: Iterator[tuple[int, int]], period: float, pins, ids
+) -> None:
+    time = 0
+    previous = None
+    for value, count in runs:
+        changes = "".join(
+            f"{value >> pin & 1}{ident}\n"
+            for pin, ident in zip(pins, ids)
+            if previous is None or (value ^ previous) >> pin & 1
+        )
+        if changes:
+            f.write(f"#{round(time * period)}\n{changes}")
+        previous = value
+        time += count
+    f.write(f"#{round(time * period)}\n")
+
+
+__all__ = ["RLE_FORMAT", "Capture", "Trigger"]
@@ -134,6 +134,30 @@ class Status(IntEnum):
     OTHER_ERROR = 18
 
 
+@unique
+class BitMode(IntEnum):
+    """Modes for FTD2XX.setBitMode"""
+
+    RESET = 0x00
+    ASYNC_BITBANG = 0x01
+    MPSSE = 0x02
+    SYNC_BITBANG = 0x04
+    MCU_HOST = 0x08
+    FAST_SERIAL = 0x10
+    CBUS_BITBANG = 0x20
+    SYNC_FIFO = 0x40
+
+
+# Bit Modes
+BITMODE_RESET = BitMode.RESET
+BITMODE_ASYNC_BITBANG = BitMode.ASYNC_BITBANG
+BITMODE_MPSSE = BitMode.MPSSE
+BITMODE_SYNC_BITBANG = BitMode.SYNC_BITBANG
+BITMODE_MCU_HOST = BitMode.MCU_HOST
+BITMODE_FAST_SERIAL = BitMode.FAST_SERIAL
+BITMODE_CBUS_BITBANG = BitMode.CBUS_BITBANG
+BITMODE_SYNC_FIFO = BitMode.SYNC_FIFO
+
 # Driver Types
 DRIVER_TYPE_D2XX = 0
 DRIVER_TYPE_VCP = 1
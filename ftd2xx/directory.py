@@ -0,0 +1,185 @@
+"""
+Cached directory of the connected FTDI devices.
+
+Enumerating devices with createDeviceInfoList is slow, so :class:`DeviceDirectory`
+keeps the result of :func:`~ftd2xx.getDeviceInfoList` for a configurable time
+and indexes it by serial number, description and location id.
+:example:
+    with deviceDirectory.open(serial=b"FT123456") as device:
+        device.write(b"Hello World!")
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import NamedTuple
+
+from . import defines
+from .ftd2xx import (
+    FTD2XX,
+    DeviceInfoDetail,
+    DeviceNotFoundError,
+    getDeviceInfoList,
+    open,
+    openEx,
+)
+
+#: Default number of seconds an enumeration result is trusted
+DEFAULT_TTL = 1.0
+
+
+class _Index(NamedTuple):
+    devices: list[DeviceInfoDetail]
+    bySerial: dict[bytes, DeviceInfoDetail]
+    byDescription: dict[bytes, DeviceInfoDetail]
+    byLocation: dict[int, DeviceInfoDetail]
+
+
+class DeviceDirectory:
+    """Cache of the device info list indexed by serial, description and
+    location id.
+
+    The list is rebuilt when it is older than ``ttl`` seconds, or after an
+    open through the directory failed with DEVICE_NOT_FOUND.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        # Held while enumerating, so concurrent callers enumerate once
+        self._lock = threading.Lock()
+        self._expires = 0.0
+        self._index = _Index([], {}, {}, {})
+
+    def refresh(self) -> list[DeviceInfoDetail]:
+        """Enumerate the devices now and rebuild the indexes"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> list[DeviceInfoDetail]:
+        devices = getDeviceInfoList()
+        # Replaced in one assignment, so readers never see a partial index
+        self._index = _Index(
+            devices,
+            {d["serial"]: d for d in devices if d["serial"]},
+            {d["description"]: d for d in devices if d["description"]},
+            {d["location"]: d for d in devices if d["location"]},
+        )
+        self._expires = time.monotonic() + self.ttl
+        return devices
+
+    def invalidate(self) -> None:
+        """Force the next lookup to enumerate the devices again"""
+        self._expires = 0.0
+
+    def _current(self) -> _Index:
+        if time.monotonic() >= self._expires:
+            with self._lock:
+                # Another thread may have enumerated while this one waited
+                if time.monotonic() >= self._expires:
+                    self._refresh()
+        return self._index
+
+    def devices(self) -> list[DeviceInfoDetail]:
+        """Return the (possibly cached) device info list"""
+        return self._current().devices
+
+    def lookup(
+        self,
+        serial: bytes | None = None,
+        description: bytes | None = None,
+        location: int | None = None,
+    ) -> DeviceInfoDetail:
+        """Return the device info entry matching the first given key.
+
+        Raises:
+            DeviceNotFoundError: If no connected device matches.
+        """
+        index = self._current()
+        if serial is not None:
+            entry = index.bySerial.get(serial)
+        elif description is not None:
+            entry = index.byDescription.get(description)
+        elif location is not None:
+            entry = index.byLocation.get(location)
+        else:
+            raise ValueError("One of serial, description or location is required")
+        if entry is None:
+            raise DeviceNotFoundError(defines.Status.DEVICE_NOT_FOUND)
+        return entry
+
+    def open(
+        self,
+        serial: bytes | None = None,
+        description: bytes | None = None,
+        location: int | None = None,
+    ) -> FTD2XX:
+        """Open the device matching the first given key without enumerating
+        the devices again, unless the cached list is stale.
+
+        Serial numbers and descriptions are resolved to a location through
+        the cache, and the device is opened by index. Devices missing from
+        the cache, or without a location, are opened with :func:`openEx`,
+        which has the driver search for them.
+
+        Raises:
+            DeviceError: If the device cannot be opened.
+
+        Returns:
+            An instance of the FTD2XX class if successful. Use it as a context manager.
+        """
+        try:
+            if location is not None:
+                return self._openLocation(location)
+            device = self._openResolved(serial, description)
+            if device is not None:
+                return device
+            if serial is not None:
+                return openEx(serial, defines.OPEN_BY_SERIAL_NUMBER, update=False)
+            return openEx(description, defines.OPEN_BY_DESCRIPTION, update=False)
+        except DeviceNotFoundError:
+            self.invalidate()
+            raise
+
+    def _openResolved(
+        self, serial: bytes | None, description: bytes | None
+    ) -> FTD2XX | None:
+        # Open by the cached location, or return None if the device is not
+        # there any more
+        try:
+            location = self.lookup(serial=serial, description=description)["location"]
+            if not location:
+                return None
+            device = self._openLocation(location)
+        except DeviceNotFoundError:
+            return None
+        if (serial is not None and device.serial != serial) or (
+            serial is None and device.description != description
+        ):
+            device.close()
+            return None
+        return device
+
+    def _openLocation(self, location: int | None) -> FTD2XX:
+        if location is None:
+            raise ValueError("One of serial, description or location is required")
+        entry = self.lookup(location=location)
+        try:
+            device = open(entry["index"], update=False)
+        except DeviceNotFoundError:
+            device = None
+        # Indexes shift when devices are plugged or unplugged, so an entry
+        # that no longer matches is rescanned once before giving up
+        if device is None or (entry["serial"] and device.serial != entry["serial"]):
+            if device is not None:
+                device.close()
+            self.refresh()
+            entry = self.lookup(location=location)
+            device = open(entry["index"], update=False)
+        return device
+
+
+#: Directory shared by the whole process
+deviceDirectory = DeviceDirectory()
+
+__all__ = ["DEFAULT_TTL", "DeviceDirectory", "deviceDirectory"]
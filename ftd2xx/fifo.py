@@ -0,0 +1,244 @@
+"""
+FT245 style synchronous FIFO streaming for FT2232H and FT232H devices.
+
+:class:`SyncFifoStream` puts the device in synchronous FIFO mode with the
+latency timer, USB transfer size and flow control that mode needs, then reads
+large chunks on a worker thread into a few preallocated buffers. Filled
+buffers are handed to the consumer as memoryviews through a bounded queue and
+come back to the worker once released, so the data is read straight into them
+and never copied; only the small view objects are created per chunk.
+:example:
+    with SyncFifoStream(device) as stream:
+        for chunk in stream:
+            sink.write(chunk)
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Iterator, Protocol
+
+from . import defines
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class _Device(Protocol):
+    """Methods of :class:`~ftd2xx.FTD2XX` that configure and stream the FIFO"""
+
+    def setBitMode(self, mask: int, enable: int) -> None: ...
+
+    def setLatencyTimer(self, latency: int) -> None: ...
+
+    def setUSBParameters(self, in_tx_size: int, out_tx_size: int = 0) -> None: ...
+
+    def setFlowControl(
+        self, flowcontrol: int, xon: int = -1, xoff: int = -1
+    ) -> None: ...
+
+    def purge(self, mask: int = 0) -> None: ...
+
+    def setTimeouts(self, read: int, write: int) -> None: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+    def write_all(self, data: Any) -> int: ...
+
+
+class SyncFifoStream:
+    """Receive from a device in synchronous FIFO mode on a worker thread.
+
+    The worker fills ``buffers`` buffers of ``buffer_size`` bytes in turn.
+    When the consumer holds all of them the worker has to wait, which is
+    counted in :attr:`stalls`; the device then stops the FIFO writer with
+    flow control until a buffer is released.
+    """
+
+    def __init__(
+        self,
+        device: _Device,
+        buffers: int = 3,
+        buffer_size: int = 1 << 18,
+        latency: int = 2,
+        transfer_size: int = 1 << 16,
+        read_timeout: int = 100,
+        configure: bool = True,
+    ):
+        """Create a stream for device. Call :meth:`start` or use it as a
+        context manager to start the worker.
+
+        Args:
+            device (FTD2XX): An open FT2232H channel A or FT232H.
+            buffers (int): Number of buffers, 2 or more.
+            buffer_size (int): Size of each buffer, the largest single read.
+            latency (int): Latency timer in milliseconds.
+            transfer_size (int): USB IN transfer size.
+            read_timeout (int): Device read timeout in milliseconds.
+            configure (bool): Set False if the device is already configured.
+        """
+        if buffers < 2:
+            raise ValueError("At least two buffers are needed")
+        self.device = device
+        self.buffer_size = buffer_size
+        self.latency = latency
+        self.transfer_size = transfer_size
+        self.read_timeout = read_timeout
+        self.configure = configure
+        self._free: queue.Queue[bytearray] = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(bytearray(buffer_size))
+        self._filled: queue.Queue[memoryview] = queue.Queue(maxsize=buffers)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+        self._mark = (0.0, 0)
+        #: Bytes received since start
+        self.bytes_read = 0
+        #: Chunks handed to the consumer since start
+        self.chunks = 0
+        #: Times the worker had to wait for the consumer to release a buffer
+        self.stalls = 0
+        #: Exception that stopped the worker, if any
+        self.error: BaseException | None = None
+
+    def start(self) -> None:
+        """Configure the device and start the worker"""
+        if self._thread is not None:
+            return
+        device = self.device
+        if self.configure:
+            device.setBitMode(0xFF, defines.BITMODE_RESET)
+            device.setBitMode(0xFF, defines.BITMODE_SYNC_FIFO)
+            device.setLatencyTimer(self.latency)
+            device.setUSBParameters(self.transfer_size, self.transfer_size)
+            device.setFlowControl(defines.FLOW_RTS_CTS, 0, 0)
+            device.purge()
+        device.setTimeouts(self.read_timeout, self.read_timeout)
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._mark = (self._started, 0)
+        self._thread = threading.Thread(
+            target=self._run, name="ftd2xx-fifo", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker. Chunks already queued can still be read."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        device = self.device
+        free = self._free
+        timeout = self.read_timeout / 1000
+        try:
+            while not self._stop.is_set():
+                try:
+                    buffer = free.get_nowait()
+                except queue.Empty:
+                    self.stalls += 1
+                    try:
+                        buffer = free.get(timeout=timeout)
+                    except queue.Empty:
+                        continue
+                view = memoryview(buffer)
+                got = device.readinto(view)
+                if not got:
+                    view.release()
+                    free.put(buffer)
+                    continue
+                self.bytes_read += got
+                self.chunks += 1
+                # Never blocks: there are no more chunks than buffers
+                self._filled.put(view[:got])
+        except Exception as exc:  # noqa: BLE001 - re-raised in the consumer by get
+            self.error = exc
+
+    def get(self, timeout: float | None = None) -> memoryview | None:
+        """Return the next chunk received, waiting at most timeout seconds
+        (forever if None), or None if there is none. The chunk must be given
+        back with :meth:`release` once consumed.
+
+        Raises:
+            Exception: The error that stopped the worker, once every chunk
+                received before it has been returned.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            wait = self.read_timeout / 1000
+            if remaining is not None:
+                wait = min(wait, max(remaining, 0))
+            try:
+                return self._filled.get(timeout=wait)
+            except queue.Empty:
+                pass
+            if not self.running:
+                if self.error is not None:
+                    raise self.error
+                return None
+            if remaining is not None and remaining <= 0:
+                return None
+
+    def release(self, chunk: memoryview) -> None:
+        """Give a chunk returned by :meth:`get` back to the worker"""
+        buffer = chunk.obj
+        chunk.release()
+        self._free.put(buffer)  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """Iterate over the chunks until the worker stops. Each chunk is
+        released when the next one is asked for."""
+        while True:
+            chunk = self.get()
+            if chunk is None:
+                return
+            try:
+                yield chunk
+            finally:
+                self.release(chunk)
+
+    def write(self, data) -> int:
+        """Write data to the FIFO"""
+        return self.device.write_all(data)
+
+    def throughput(self) -> float:
+        """Return the receive rate in bytes per second since the previous
+        call, or since start"""
+        now = time.monotonic()
+        then, count = self._mark
+        self._mark = (now, self.bytes_read)
+        return (self.bytes_read - count) / (now - then) if now > then else 0.0
+
+    @property
+    def average(self) -> float:
+        """Average receive rate in bytes per second since start"""
+        elapsed = time.monotonic() - self._started
+        return self.bytes_read / elapsed if self._started and elapsed > 0 else 0.0
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the worker when exiting the context manager"""
+        self.stop()
+
+
+__all__ = ["SyncFifoStream"]
@@ -7,13 +7,23 @@ except this uses ctypes instead of an extension approach.
 
 from __future__ import annotations
 
+import builtins
 import ctypes as c
 import logging
+import os
 import sys
-from types import TracebackType
-from typing import Any, Callable, ContextManager, TypedDict
+import threading
+import time
+from types import ModuleType, TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, NamedTuple, TypedDict
 
 from . import defines
+from ._loader import LazyFunction
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from .instrument import Instrumentation
 
 if sys.platform == "win32":
     from . import _ftd2xx as _ft
@@ -24,19 +34,39 @@ elif sys.platform == "darwin":
 else:
     raise Exception("Unknown platform")
 
+# Platform module calling the D2XX library, _ft can be switched to another
+# backend by setBackend
+_native = _ft
 
 ft_program_data = _ft.ft_program_data
 
 LOGGER = logging.getLogger("ftd2xx")
 
+# Size of the per-thread buffer writev coalesces small buffers into
+_STAGE_SIZE = 1 << 16
+
 
 class DeviceError(Exception):
-    """Exception class for status messages"""
+    """Exception class for status messages.
+
+    Created with a failed FT_STATUS, the instance is of the subclass for that
+    status, e.g. ``DeviceError(4)`` is an :class:`IoError`, so specific
+    failures can be caught by class.
+    """
+
+    #: The FT_STATUS of the failed call, None for other errors
+    status: int | None = None
+
+    def __new__(cls, message: int | Any = None, *args: Any, **kwargs: Any):
+        if cls is DeviceError and isinstance(message, int):
+            return super().__new__(_STATUS_ERRORS.get(message, cls))
+        return super().__new__(cls)
 
     def __init__(self, message: int | Any):
         super().__init__()
         if isinstance(message, int):
-            self.message = defines.Status(message).name
+            self.status = message
+            self.message = _STATUS_NAMES.get(message) or defines.Status(message).name
         else:
             self.message = str(message)
 
@@ -44,9 +74,107 @@ class DeviceError(Exception):
         return self.message
 
     def __reduce__(self):
+        if self.status is not None and self.message == _STATUS_NAMES[self.status]:
+            return type(self), (int(self.status),)
         return type(self), (self.message,)
 
 
+# One DeviceError subclass per failed FT_STATUS
+
+
+class InvalidHandleError(DeviceError):
+    status = defines.Status.INVALID_HANDLE
+
+
+class DeviceNotFoundError(DeviceError):
+    status = defines.Status.DEVICE_NOT_FOUND
+
+
+class DeviceNotOpenedError(DeviceError):
+    status = defines.Status.DEVICE_NOT_OPENED
+
+
+class IoError(DeviceError):
+    status = defines.Status.IO_ERROR
+
+
+class InsufficientResourcesError(DeviceError):
+    status = defines.Status.INSUFFICIENT_RESOURCES
+
+
+class InvalidParameterError(DeviceError):
+    status = defines.Status.INVALID_PARAMETER
+
+
+class InvalidBaudRateError(DeviceError):
+    status = defines.Status.INVALID_BAUD_RATE
+
+
+class DeviceNotOpenedForEraseError(DeviceError):
+    status = defines.Status.DEVICE_NOT_OPENED_FOR_ERASE
+
+
+class DeviceNotOpenedForWriteError(DeviceError):
+    status = defines.Status.DEVICE_NOT_OPENED_FOR_WRITE
+
+
+class FailedToWriteDeviceError(DeviceError):
+    status = defines.Status.FAILED_TO_WRITE_DEVICE
+
+
+class EepromReadFailedError(DeviceError):
+    status = defines.Status.EEPROM_READ_FAILED
+
+
+class EepromWriteFailedError(DeviceError):
+    status = defines.Status.EEPROM_WRITE_FAILED
+
+
+class EepromEraseFailedError(DeviceError):
+    status = defines.Status.EEPROM_ERASE_FAILED
+
+
+class EepromNotPresentError(DeviceError):
+    status = defines.Status.EEPROM_NOT_PRESENT
+
+
+class EepromNotProgrammedError(DeviceError):
+    status = defines.Status.EEPROM_NOT_PROGRAMMED
+
+
+class InvalidArgsError(DeviceError):
+    status = defines.Status.INVALID_ARGS
+
+
+class NotSupportedError(DeviceError):
+    status = defines.Status.NOT_SUPPORTED
+
+
+class OtherError(DeviceError):
+    status = defines.Status.OTHER_ERROR
+
+
+_STATUS_NAMES = {int(status): status.name for status in defines.Status}
+_STATUS_ERRORS: dict[int, type[DeviceError]] = {
+    int(error.status): error
+    for error in DeviceError.__subclasses__()
+    if error.status is not None
+}
+
+
+class WriteTimeoutError(DeviceError):
+    """Exception raised when data could not all be written in time"""
+
+    def __init__(self, written: int, total: int):
+        super().__init__(f"Write timed out after {written} of {total} bytes")
+        #: Number of bytes sent before the timeout
+        self.written = written
+        self.total = total
+
+    def __reduce__(self):
+        return type(self), (self.written, self.total)
+
+
 class DeviceInfoDetail(TypedDict):
     index: int
     flags: int
@@ -65,6 +193,79 @@ class DeviceInfo(TypedDict):
     serial: bytes
 
 
+class DeviceRecord(NamedTuple):
+    """Description of an open device, as :meth:`FTD2XX.getDeviceInfo` returns"""
+
+    type: int
+    id: int
+    description: bytes
+    serial: bytes
+
+
+# Line status bits of the errors: overrun, parity, framing, break and FIFO
+_LINE_ERRORS = (
+    defines.ModemStatus.OE
+    | defines.ModemStatus.PE
+    | defines.ModemStatus.FE
+    | defines.ModemStatus.BI
+    | defines.ModemStatus.RCVE
+) >> 8
+
+
+class DeviceStatus:
+    """Queue, event and modem state of a device, as :meth:`FTD2XX.poll`
+    returns. Each device reuses one instance, overwritten by every poll."""
+
+    __slots__ = ("events", "line", "modem", "rx", "tx")
+
+    def __init__(self):
+        #: Bytes in the receive queue
+        self.rx = 0
+        #: Bytes in the transmit queue
+        self.tx = 0
+        #: Events that occurred since the last poll
+        self.events = 0
+        #: Modem status byte: CTS, DSR, RI and DCD
+        self.modem = 0
+        #: Line status byte: data ready, errors and transmitter state
+        self.line = 0
+
+    @property
+    def modem_status(self) -> defines.ModemStatus:
+        """Modem and line status combined, as :meth:`FTD2XX.getModemStatus`
+        returns"""
+        return defines.ModemStatus(self.modem | self.line << 8)
+
+    @property
+    def errors(self) -> int:
+        """Line error bits: overrun, parity, framing, break and FIFO error"""
+        return self.line & _LINE_ERRORS
+
+    def __repr__(self) -> str:
+        return (
+            f"DeviceStatus(rx={self.rx}, tx={self.tx}, events=0x{self.events:x}, "
+            f"modem=0x{self.modem:02x}, line=0x{self.line:02x})"
+        )
+
+
+def statusDtype() -> Any:
+    """Return the NumPy structured dtype of a table :meth:`FTD2XX.poll` and
+    :func:`pollAll` fill, with the fields of :class:`DeviceStatus`"""
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise ImportError("statusDtype needs numpy: pip install ftd2xx[numpy]") from exc
+    return np.dtype(
+        [
+            ("rx", np.uint32),
+            ("tx", np.uint32),
+            ("events", np.uint32),
+            ("modem", np.uint8),
+            ("line", np.uint8),
+        ]
+    )
+
+
 class ProgramData(TypedDict, total=False):
     Signature1: _ft.DWORD | int
     Signature2: _ft.DWORD | int
@@ -172,18 +373,95 @@ class ProgramData(TypedDict, total=False):
 
 
 def call_ft(function: Callable, *args):
-    """Call an FTDI function and check the status. Raise exception on error"""
+    """Call an FTDI function and check the status. Raise exception on error.
+
+    The driver functions of the backends raise :class:`DeviceError`
+    themselves, so this is only needed for functions returning a status."""
     status = function(*args)
     if status != defines.Status.OK:
         raise DeviceError(status)
 
 
+def _errcheck(status: int, function: Any, args: tuple) -> int:
+    # errcheck of the FT_STATUS functions, raising the error of a failed call
+    if status:
+        raise _STATUS_ERRORS.get(status, DeviceError)(status)
+    return status
+
+
+def _checkStatus(module: ModuleType) -> None:
+    """Make the functions of a platform module returning FT_STATUS raise
+    DeviceError on failure, through ctypes errcheck"""
+    for name, function in list(vars(module).items()):
+        if name.startswith("FT_W32_") or not isinstance(function, LazyFunction):
+            continue
+        if function.restype is module.FT_STATUS:
+            function.errcheck = _errcheck
+
+
+_checkStatus(_native)
+
+
+def _bufferAddress(data: Any) -> tuple[int, int, Any]:
+    """Return the address and size of the bytes of a buffer-protocol object,
+    and an object that must be kept alive while the address is used. Writable
+    buffers and bytes are not copied, other read-only buffers are copied once."""
+    view = memoryview(data).cast("B")
+    if not view.nbytes:
+        return 0, 0, None
+    if view.readonly:
+        obj = view.obj
+        if not isinstance(obj, bytes) or len(obj) != view.nbytes:
+            obj = bytes(view)
+        return c.cast(c.c_char_p(obj), c.c_void_p).value, len(obj), obj
+    array = (c.c_char * view.nbytes).from_buffer(view)
+    return c.addressof(array), view.nbytes, array
+
+
+def pollAll(devices: Iterable[FTD2XX], table: Any = None) -> Any:
+    """Poll every device into one row of table each, a NumPy array of
+    :func:`statusDtype`, created if not given, and return the table"""
+    devices = list(devices)
+    if table is None:
+        dtype = statusDtype()
+        import numpy as np
+
+        table = np.zeros(len(devices), dtype=dtype)
+    for index, device in enumerate(devices):
+        device.poll(table[index])
+    return table
+
+
+def setBackend(backend: str | ModuleType) -> None:
+    """Route all driver calls to backend: "native" for the D2XX library,
+    "sim" for the in-process simulator of :mod:`ftd2xx.sim`, or a module
+    providing the same ``FT_*`` functions, raising :class:`DeviceError` on
+    failure, and types. Devices opened before
+    keep their handles but are served by the new backend."""
+    global _ft
+    if backend == "native":
+        _ft = _native
+    elif backend == "sim":
+        from . import sim
+
+        _ft = sim
+    elif isinstance(backend, str):
+        raise ValueError(f"Unknown backend {backend!r}")
+    else:
+        _ft = backend
+
+
+def getBackend() -> ModuleType:
+    """Return the module serving driver calls"""
+    return _ft
+
+
 def listDevices(flags: int = 0) -> list[bytes] | None:
     """Return a list of serial numbers(default), descriptions or
     locations (Windows only) of the connected FTDI devices depending on value
     of flags"""
     n = _ft.DWORD()
-    call_ft(_ft.FT_ListDevices, c.byref(n), None, _ft.DWORD(defines.LIST_NUMBER_ONLY))
+    _ft.FT_ListDevices(c.byref(n), None, _ft.DWORD(defines.LIST_NUMBER_ONLY))
     devcount = n.value
     LOGGER.debug("Found %i devices", devcount)
     if devcount:
@@ -197,7 +475,7 @@ def listDevices(flags: int = 0) -> list[bytes] | None:
         ba = (c.c_char_p * (devcount + 1))(*[c.addressof(x) for x in bd], None)
         # for i in range(devcount):
         #     ba[i] = c.c_char_p(bd[i])
-        call_ft(_ft.FT_ListDevices, ba, c.byref(n), _ft.DWORD(defines.LIST_ALL | flags))
+        _ft.FT_ListDevices(ba, c.byref(n), _ft.DWORD(defines.LIST_ALL | flags))
         return [res for res in ba[:devcount]]
 
     return None
@@ -206,14 +484,14 @@ def listDevices(flags: int = 0) -> list[bytes] | None:
 def getLibraryVersion() -> int:
     """Return a long representing library version"""
     m = _ft.DWORD()
-    call_ft(_ft.FT_GetLibraryVersion, c.byref(m))
+    _ft.FT_GetLibraryVersion(c.byref(m))
     return m.value
 
 
 def createDeviceInfoList() -> int:
     """Create the internal device info list and return number of entries"""
     m = _ft.DWORD()
-    call_ft(_ft.FT_CreateDeviceInfoList, c.byref(m))
+    _ft.FT_CreateDeviceInfoList(c.byref(m))
     return m.value
 
 
@@ -230,8 +508,7 @@ def getDeviceInfoDetail(devnum: int = 0, update: bool = True) -> DeviceInfoDetai
     # createDeviceInfoList is slow, only run if update is True
     if update:
         createDeviceInfoList()
-    call_ft(
-        _ft.FT_GetDeviceInfoDetail,
+    _ft.FT_GetDeviceInfoDetail(
         _ft.DWORD(devnum),
         c.byref(flags),
         c.byref(typ),
@@ -253,6 +530,30 @@ def getDeviceInfoDetail(devnum: int = 0, update: bool = True) -> DeviceInfoDetai
     }
 
 
+def getDeviceInfoList() -> list[DeviceInfoDetail]:
+    """Rebuild the internal device info list and return all of its entries,
+    fetched with a single driver call."""
+    devcount = createDeviceInfoList()
+    if not devcount:
+        return []
+    nodes = (_ft.FT_DEVICE_LIST_INFO_NODE * devcount)()
+    n = _ft.DWORD(devcount)
+    _ft.FT_GetDeviceInfoList(nodes, c.byref(n))
+    return [
+        {
+            "index": i,
+            "flags": node.Flags,
+            "type": node.Type,
+            "id": node.ID,
+            "location": node.LocId,
+            "serial": node.SerialNumber,
+            "description": node.Description,
+            "handle": c.cast(node.ftHandle, _ft.FT_HANDLE),
+        }
+        for i, node in enumerate(nodes[: n.value])
+    ]
+
+
 def open(dev: int = 0, update: bool = True) -> FTD2XX:
     """Open a handle to a usb device by index and return an FTD2XX instance for
     it. Set update to False to avoid a slow call to createDeviceInfoList.
@@ -272,7 +573,7 @@ def open(dev: int = 0, update: bool = True) -> FTD2XX:
             dev.write(b"Hello World")
     """
     h = _ft.FT_HANDLE()
-    call_ft(_ft.FT_Open, dev, c.byref(h))
+    _ft.FT_Open(dev, c.byref(h))
     return FTD2XX(h, update=update)
 
 
@@ -300,7 +601,7 @@ def openEx(
 
     """
     h = _ft.FT_HANDLE()
-    call_ft(_ft.FT_OpenEx, id_str, _ft.DWORD(flags), c.byref(h))
+    _ft.FT_OpenEx(id_str, _ft.DWORD(flags), c.byref(h))
     return FTD2XX(h, update=update)
 
 
@@ -330,27 +631,152 @@ else:
         """Linux only. Get the VID and PID of the device"""
         vid = _ft.DWORD()
         pid = _ft.DWORD()
-        call_ft(_ft.FT_GetVIDPID, c.byref(vid), c.byref(pid))
+        _ft.FT_GetVIDPID(c.byref(vid), c.byref(pid))
         return (vid.value, pid.value)
 
     def setVIDPID(vid, pid):
         """Linux only. Set the VID and PID of the device"""
-        call_ft(_ft.FT_SetVIDPID, _ft.DWORD(vid), _ft.DWORD(pid))
+        _ft.FT_SetVIDPID(_ft.DWORD(vid), _ft.DWORD(pid))
         return None
 
 
-class FTD2XX(ContextManager["FTD2XX"]):
+class _Timespec(c.Structure):
+    _fields_ = [("tv_sec", c.c_long), ("tv_nsec", c.c_long)]
+
+
+if sys.platform == "win32":
+    import win32event
+
+    class _EventWaiter:
+        """Win32 event signalled by the driver on the notified events"""
+
+        def __init__(self):
+            self._event = win32event.CreateEvent(None, False, False, None)
+            self.handle = int(self._event)
+
+        def wait(self, ready: Callable[[], int], timeout: int | None) -> int:
+            """Block until ready() returns non-zero or timeout milliseconds
+            passed, and return its last result"""
+            deadline = None if timeout is None else time.monotonic() + timeout / 1000
+            result = ready()
+            while not result:
+                if deadline is None:
+                    ms = win32event.INFINITE
+                else:
+                    ms = int((deadline - time.monotonic()) * 1000)
+                    if ms <= 0:
+                        break
+                win32event.WaitForSingleObject(self._event, ms)
+                result = ready()
+            return result
+
+        def close(self) -> None:
+            self._event.Close()
+
+else:
+    _libc = c.CDLL(None, use_errno=True)
+
+    class _EventWaiter:
+        """pthread condition variable and mutex signalled by the driver on the
+        notified events"""
+
+        def __init__(self):
+            # The EVENT_HANDLE layout from the headers assumes a 40 byte mutex,
+            # which is larger on some platforms, so give the driver some slack.
+            self._storage = c.create_string_buffer(c.sizeof(_ft.EVENT_HANDLE) + 64)
+            event = _ft.EVENT_HANDLE.from_buffer(self._storage)
+            self._cond = c.byref(event.eCondVar)
+            self._mutex = c.byref(event.eMutex)
+            _libc.pthread_cond_init(self._cond, None)
+            _libc.pthread_mutex_init(self._mutex, None)
+            self.handle = c.addressof(event)
+
+        def wait(self, ready: Callable[[], int], timeout: int | None) -> int:
+            """Block until ready() returns non-zero or timeout milliseconds
+            passed, and return its last result"""
+            if timeout is not None:
+                deadline = time.time() + timeout / 1000
+                abstime = _Timespec(int(deadline), int(deadline % 1 * 1e9))
+            _libc.pthread_mutex_lock(self._mutex)
+            try:
+                # Check under the mutex so a signal between the check and the
+                # wait cannot be missed
+                result = ready()
+                while not result:
+                    if timeout is None:
+                        _libc.pthread_cond_wait(self._cond, self._mutex)
+                    elif _libc.pthread_cond_timedwait(
+                        self._cond, self._mutex, c.byref(abstime)
+                    ):
+                        return ready()
+                    result = ready()
+            finally:
+                _libc.pthread_mutex_unlock(self._mutex)
+            return result
+
+        def close(self) -> None:
+            _libc.pthread_cond_destroy(self._cond)
+            _libc.pthread_mutex_destroy(self._mutex)
+
+
+class _OutParams(threading.local):
+    """Out-parameters of the driver calls and their pointers, allocated once
+    per thread, so that polling methods allocate nothing while calls made on
+    one device from several threads keep their own results"""
+
+    def __init__(self):
+        self.bytes_read = _ft.DWORD()
+        self.bytes_read_ref = c.byref(self.bytes_read)
+        self.bytes_written = _ft.DWORD()
+        self.bytes_written_ref = c.byref(self.bytes_written)
+        self.rx = _ft.DWORD()
+        self.rx_ref = c.byref(self.rx)
+        self.tx = _ft.DWORD()
+        self.tx_ref = c.byref(self.tx)
+        self.events = _ft.DWORD()
+        self.events_ref = c.byref(self.events)
+        self.dword = _ft.DWORD()
+        self.dword_ref = c.byref(self.dword)
+        self.uchar = _ft.UCHAR()
+        self.uchar_ref = c.byref(self.uchar)
+        # Buffer writev coalesces small buffers into, created on first use
+        self.stage: memoryview | None = None
+        self.stage_address = 0
+
+
+_out = _OutParams()
+
+
+class FTD2XX:
     """Class for communicating with an FTDI device
 
     Use :any:`open` or :any:`openEx` to create an instance of this class.
+
+    Instances have no ``__dict__``. The out-parameters of the driver calls are
+    allocated once per thread and reused, so that polling methods such as
+    :meth:`getQueueStatus` allocate nothing and stay safe to call from
+    several threads.
     """
 
+    __slots__ = (
+        "__weakref__",
+        "_event_mask",
+        "_event_waiter",
+        "_instrumentation",
+        "_poll_status",
+        "handle",
+        "info",
+        "status",
+    )
+
     handle: _ft.FT_HANDLE
     status: int
+    #: Type, id, description and serial number of the device
+    info: DeviceRecord
 
     def __init__(self, handle: _ft.FT_HANDLE, update: bool = True):
         """Create an instance of the FTD2XX class with the given device handle
-        and populate the device info in the instance dictionary.
+        and read the device info.
 
         Args:
             update (bool): Set False to disable automatic (slow) call to
@@ -359,30 +785,130 @@ class FTD2XX(ContextManager["FTD2XX"]):
         """
         self.handle = handle
         self.status = 1
+        self._event_waiter: _EventWaiter | None = None
+        self._event_mask = 0
+        self._poll_status = DeviceStatus()
+        self._instrumentation: Instrumentation | None = None
         # createDeviceInfoList is slow, only run if update is True
         if update:
             createDeviceInfoList()
-        self.__dict__.update(self.getDeviceInfo())
+        self.info = DeviceRecord(**self.getDeviceInfo())
+
+    @property
+    def type(self) -> int:
+        return self.info.type
+
+    @property
+    def id(self) -> int:
+        return self.info.id
+
+    @property
+    def description(self) -> bytes:
+        return self.info.description
+
+    @property
+    def serial(self) -> bytes:
+        return self.info.serial
 
     def close(self) -> None:
         """Close the device handle"""
-        call_ft(_ft.FT_Close, self.handle)
+        _ft.FT_Close(self.handle)
         self.status = 0
+        if self._event_waiter is not None:
+            self._event_waiter.close()
+            self._event_waiter = None
 
     def read(self, nchars: int, raw: bool = True) -> bytes:
         """Read up to nchars bytes of data from the device. Can return fewer if
         timedout. Use getQueueStatus to find how many bytes are available"""
-        b_read = _ft.DWORD()
         b = c.create_string_buffer(nchars)
-        call_ft(_ft.FT_Read, self.handle, b, nchars, c.byref(b_read))
-        return b.raw[: b_read.value] if raw else b.value[: b_read.value]
+        out = _out
+        _ft.FT_Read(self.handle, b, nchars, out.bytes_read_ref)
+        nread = out.bytes_read.value
+        return b.raw[:nread] if raw else b.value[:nread]
+
+    def readinto(self, buffer) -> int:
+        """Read up to len(buffer) bytes of data from the device directly into
+        buffer, which can be any writable object supporting the buffer
+        protocol (bytearray, memoryview, array.array, mmap, numpy array...).
+        Return the number of bytes read, which can be fewer if timedout.
+        The buffer is only exported for the duration of the call."""
+        view = memoryview(buffer).cast("B")
+        if view.readonly:
+            raise TypeError("readinto() needs a writable buffer")
+        nbytes = view.nbytes
+        if not nbytes:
+            return 0
+        array = (c.c_char * nbytes).from_buffer(view)
+        out = _out
+        _ft.FT_Read(self.handle, array, nbytes, out.bytes_read_ref)
+        return out.bytes_read.value
 
     def write(self, data: bytes):
         """Send the data to the device. Data must be a string representing the
         bytes to be sent"""
-        w = _ft.DWORD()
-        call_ft(_ft.FT_Write, self.handle, data, len(data), c.byref(w))
-        return w.value
+        out = _out
+        _ft.FT_Write(self.handle, data, len(data), out.bytes_written_ref)
+        return out.bytes_written.value
+
+    def write_all(self, data, deadline: float | None = None) -> int:
+        """Send all of data, which can be any buffer-protocol object, retrying
+        when the write timeout cuts a write short until the :func:`time.monotonic`
+        deadline. Without a deadline, give up on the first write that sends
+        nothing. Return the number of bytes written.
+
+        Raises:
+            WriteTimeoutError: If the data could not all be sent in time.
+        """
+        address, nbytes, _keep = _bufferAddress(data)
+        sent = 0
+        while sent < nbytes:
+            written = self._writeAddress(address + sent, nbytes - sent)
+            sent += written
+            if sent < nbytes and (
+                time.monotonic() >= deadline if deadline is not None else not written
+            ):
+                raise WriteTimeoutError(sent, nbytes)
+        return sent
+
+    def _writeAddress(self, address: int, nbytes: int) -> int:
+        out = _out
+        _ft.FT_Write(self.handle, address, nbytes, out.bytes_written_ref)
+        return out.bytes_written.value
+
+    def writev(self, buffers: Iterable[Any]) -> int:
+        """Send a sequence of buffer-protocol objects as one stream. Small
+        buffers are coalesced in a reusable staging buffer so they go out in
+        as few writes as possible, large ones are written without copying.
+        Return the total number of bytes written, which stops short at the
+        first incomplete write."""
+        out = _out
+        stage = out.stage
+        if stage is None:
+            stage = out.stage = memoryview(bytearray(_STAGE_SIZE))
+            out.stage_address = c.addressof((c.c_char * _STAGE_SIZE).from_buffer(stage))
+        total = fill = 0
+        for data in buffers:
+            view = memoryview(data).cast("B")
+            nbytes = view.nbytes
+            if fill and fill + nbytes > _STAGE_SIZE:
+                written = self._writeAddress(out.stage_address, fill)
+                total += written
+                if written < fill:
+                    return total
+                fill = 0
+            if nbytes < _STAGE_SIZE:
+                stage[fill : fill + nbytes] = view
+                fill += nbytes
+                continue
+            address, nbytes, _keep = _bufferAddress(view)
+            written = self._writeAddress(address, nbytes)
+            total += written
+            if written < nbytes:
+                return total
+        if fill:
+            total += self._writeAddress(out.stage_address, fill)
+        return total
 
     def ioctl(self):
         """Not implemented"""
@@ -390,16 +916,15 @@ class FTD2XX(ContextManager["FTD2XX"]):
 
     def setBaudRate(self, baud: int) -> None:
         """Set the baud rate"""
-        call_ft(_ft.FT_SetBaudRate, self.handle, _ft.DWORD(baud))
+        _ft.FT_SetBaudRate(self.handle, _ft.DWORD(baud))
 
     def setDivisor(self, div: int):
         """Set the clock divider. The clock will be set to 6e6/(div + 1)."""
-        call_ft(_ft.FT_SetDivisor, self.handle, _ft.USHORT(div))
+        _ft.FT_SetDivisor(self.handle, _ft.USHORT(div))
 
     def setDataCharacteristics(self, wordlen: int, stopbits: int, parity: int):
         """Set the data characteristics for UART"""
-        call_ft(
-            _ft.FT_SetDataCharacteristics,
+        _ft.FT_SetDataCharacteristics(
             self.handle,
             _ft.UCHAR(wordlen),
             _ft.UCHAR(stopbits),
@@ -410,8 +935,7 @@ class FTD2XX(ContextManager["FTD2XX"]):
         """Set the flow control for UART"""
         if flowcontrol == defines.FLOW_XON_XOFF and (xon == -1 or xoff == -1):
             raise ValueError
-        call_ft(
-            _ft.FT_SetFlowControl,
+        _ft.FT_SetFlowControl(
             self.handle,
             _ft.USHORT(flowcontrol),
             _ft.UCHAR(xon),
@@ -420,34 +944,33 @@ class FTD2XX(ContextManager["FTD2XX"]):
 
     def resetDevice(self):
         """Reset the device"""
-        call_ft(_ft.FT_ResetDevice, self.handle)
+        _ft.FT_ResetDevice(self.handle)
 
     def setDtr(self):
         """Set the DTR (Data Terminal Ready) signal of the FTDI device."""
-        call_ft(_ft.FT_SetDtr, self.handle)
+        _ft.FT_SetDtr(self.handle)
 
     def clrDtr(self):
         """Clear the DTR signal of the FTDI device."""
-        call_ft(_ft.FT_ClrDtr, self.handle)
+        _ft.FT_ClrDtr(self.handle)
 
     def setRts(self):
         """Set the RTS (Request To Send) signal of the FTDI device."""
-        call_ft(_ft.FT_SetRts, self.handle)
+        _ft.FT_SetRts(self.handle)
 
     def clrRts(self):
         """Clear the RTS signal of the FTDI device."""
-        call_ft(_ft.FT_ClrRts, self.handle)
+        _ft.FT_ClrRts(self.handle)
 
     def getModemStatus(self) -> defines.ModemStatus:
         """Get the modem status of the FTDI device."""
-        m = _ft.DWORD()
-        call_ft(_ft.FT_GetModemStatus, self.handle, c.byref(m))
-        return defines.ModemStatus(m.value & 0xFFFF)
+        out = _out
+        _ft.FT_GetModemStatus(self.handle, out.dword_ref)
+        return defines.ModemStatus(out.dword.value & 0xFFFF)
 
     def setChars(self, evch: int, evch_en: int, erch: int, erch_en: int):
         """Set the event and error characters for UART"""
-        call_ft(
-            _ft.FT_SetChars,
+        _ft.FT_SetChars(
             self.handle,
             _ft.UCHAR(evch),
             _ft.UCHAR(evch_en),
@@ -459,84 +982,131 @@ class FTD2XX(ContextManager["FTD2XX"]):
         """Purge the receive and/or transmit buffers"""
         if not mask:
             mask = defines.PURGE_RX | defines.PURGE_TX
-        call_ft(_ft.FT_Purge, self.handle, _ft.DWORD(mask))
+        _ft.FT_Purge(self.handle, _ft.DWORD(mask))
 
     def setTimeouts(self, read: int, write: int):
         """Set the read and write timeouts in milliseconds"""
-        call_ft(_ft.FT_SetTimeouts, self.handle, _ft.DWORD(read), _ft.DWORD(write))
+        _ft.FT_SetTimeouts(self.handle, _ft.DWORD(read), _ft.DWORD(write))
 
     def setDeadmanTimeout(self, timeout: int):
         """Set the deadman timeout in milliseconds"""
-        call_ft(_ft.FT_SetDeadmanTimeout, self.handle, _ft.DWORD(timeout))
+        _ft.FT_SetDeadmanTimeout(self.handle, _ft.DWORD(timeout))
 
     def getQueueStatus(self) -> int:
         """Get number of bytes in receive queue."""
-        rxQAmount = _ft.DWORD()
-        call_ft(_ft.FT_GetQueueStatus, self.handle, c.byref(rxQAmount))
-        return rxQAmount.value
+        out = _out
+        _ft.FT_GetQueueStatus(self.handle, out.rx_ref)
+        return out.rx.value
 
     def setEventNotification(self, evtmask: int, evthandle):
-        call_ft(
-            _ft.FT_SetEventNotification,
+        """Have the driver signal evthandle on the events in evtmask. evthandle
+        is a Win32 event handle on Windows, and an EVENT_HANDLE structure or
+        its address elsewhere. See :meth:`wait_for_event` for a ready-made
+        waiter."""
+        if isinstance(evthandle, c.Structure):
+            evthandle = c.addressof(evthandle)
+        _ft.FT_SetEventNotification(
             self.handle,
             _ft.DWORD(evtmask),
             _ft.HANDLE(evthandle),
         )
 
+    def poll(self, row: Any = None) -> DeviceStatus:
+        """Read the queue, event and modem state in one go. The result is
+        the same :class:`DeviceStatus` instance on every call, overwritten
+        by the next poll; reading the events clears them.
+
+        Args:
+            row: Optional record to fill as well, such as a row of a NumPy
+                array of :func:`statusDtype`.
+        """
+        handle = self.handle
+        out = _out
+        _ft.FT_GetStatus(handle, out.rx_ref, out.tx_ref, out.events_ref)
+        _ft.FT_GetModemStatus(handle, out.dword_ref)
+        status = self._poll_status
+        status.rx = out.rx.value
+        status.tx = out.tx.value
+        status.events = out.events.value
+        modem = out.dword.value
+        status.modem = modem & 0xFF
+        status.line = modem >> 8 & 0xFF
+        if row is not None:
+            row["rx"] = status.rx
+            row["tx"] = status.tx
+            row["events"] = status.events
+            row["modem"] = status.modem
+            row["line"] = status.line
+        return status
+
     def getStatus(self):
         """Return a 3-tuple of rx queue bytes, tx queue bytes and event
         status"""
-        rxQAmount = _ft.DWORD()
-        txQAmount = _ft.DWORD()
-        evtStatus = _ft.DWORD()
-        call_ft(
-            _ft.FT_GetStatus,
-            self.handle,
-            c.byref(rxQAmount),
-            c.byref(txQAmount),
-            c.byref(evtStatus),
-        )
-        return (rxQAmount.value, txQAmount.value, evtStatus.value)
+        out = _out
+        _ft.FT_GetStatus(self.handle, out.rx_ref, out.tx_ref, out.events_ref)
+        return (out.rx.value, out.tx.value, out.events.value)
+
+    def wait_for_event(
+        self,
+        mask: int = defines.EVENT_RXCHAR | defines.EVENT_MODEM_STATUS,
+        timeout: int | None = None,
+    ) -> int:
+        """Block until one of the events in mask occurs or timeout milliseconds
+        passed (forever if None), without polling. Return the events that
+        occurred, 0 on timeout. EVENT_RXCHAR is also reported while there is
+        data in the receive queue."""
+        if self._event_waiter is None:
+            self._event_waiter = _EventWaiter()
+        if mask != self._event_mask:
+            self.setEventNotification(mask, self._event_waiter.handle)
+            self._event_mask = mask
+
+        def ready() -> int:
+            rx, _, events = self.getStatus()
+            if rx:
+                events |= defines.EVENT_RXCHAR
+            return events & mask
+
+        return self._event_waiter.wait(ready, timeout)
 
     def setBreakOn(self):
-        call_ft(_ft.FT_SetBreakOn, self.handle)
+        _ft.FT_SetBreakOn(self.handle)
 
     def setBreakOff(self):
-        call_ft(_ft.FT_SetBreakOff, self.handle)
+        _ft.FT_SetBreakOff(self.handle)
 
     def setWaitMask(self, mask: int):
-        call_ft(_ft.FT_SetWaitMask, self.handle, _ft.DWORD(mask))
+        _ft.FT_SetWaitMask(self.handle, _ft.DWORD(mask))
 
     def waitOnMask(self):
-        mask = _ft.DWORD()
-        call_ft(_ft.FT_WaitOnMask, self.handle, c.byref(mask))
-        return mask.value
+        out = _out
+        _ft.FT_WaitOnMask(self.handle, out.dword_ref)
+        return out.dword.value
 
     def getEventStatus(self):
-        evtStatus = _ft.DWORD()
-        call_ft(_ft.FT_GetEventStatus, self.handle, c.byref(evtStatus))
-        return evtStatus.value
+        out = _out
+        _ft.FT_GetEventStatus(self.handle, out.events_ref)
+        return out.events.value
 
     def setLatencyTimer(self, latency: int):
-        call_ft(_ft.FT_SetLatencyTimer, self.handle, _ft.UCHAR(latency))
+        _ft.FT_SetLatencyTimer(self.handle, _ft.UCHAR(latency))
 
     def getLatencyTimer(self) -> int:
-        latency = _ft.UCHAR()
-        call_ft(_ft.FT_GetLatencyTimer, self.handle, c.byref(latency))
-        return latency.value
+        out = _out
+        _ft.FT_GetLatencyTimer(self.handle, out.uchar_ref)
+        return out.uchar.value
 
     def setBitMode(self, mask: int, enable: int):
-        call_ft(_ft.FT_SetBitMode, self.handle, _ft.UCHAR(mask), _ft.UCHAR(enable))
+        _ft.FT_SetBitMode(self.handle, _ft.UCHAR(mask), _ft.UCHAR(enable))
 
     def getBitMode(self) -> int:
-        mask = _ft.UCHAR()
-        call_ft(_ft.FT_GetBitMode, self.handle, c.byref(mask))
-        return mask.value
+        out = _out
+        _ft.FT_GetBitMode(self.handle, out.uchar_ref)
+        return out.uchar.value
 
     def setUSBParameters(self, in_tx_size: int, out_tx_size: int = 0):
         """Set the USB request transfer sizes"""
-        call_ft(
-            _ft.FT_SetUSBParameters,
+        _ft.FT_SetUSBParameters(
             self.handle,
             _ft.ULONG(in_tx_size),
             _ft.ULONG(out_tx_size),
@@ -549,8 +1119,7 @@ class FTD2XX(ContextManager["FTD2XX"]):
         desc = c.create_string_buffer(defines.MAX_DESCRIPTION_SIZE)
         serial = c.create_string_buffer(defines.MAX_DESCRIPTION_SIZE)
 
-        call_ft(
-            _ft.FT_GetDeviceInfo,
+        _ft.FT_GetDeviceInfo(
             self.handle,
             c.byref(deviceType),
             c.byref(deviceId),
@@ -566,30 +1135,30 @@ class FTD2XX(ContextManager["FTD2XX"]):
         }
 
     def stopInTask(self):
-        call_ft(_ft.FT_StopInTask, self.handle)
+        _ft.FT_StopInTask(self.handle)
 
     def restartInTask(self):
-        call_ft(_ft.FT_RestartInTask, self.handle)
+        _ft.FT_RestartInTask(self.handle)
 
     def setRestPipeRetryCount(self, count):
-        call_ft(_ft.FT_SetResetPipeRetryCount, self.handle, _ft.DWORD(count))
+        _ft.FT_SetResetPipeRetryCount(self.handle, _ft.DWORD(count))
 
     def resetPort(self):
-        call_ft(_ft.FT_ResetPort, self.handle)
+        _ft.FT_ResetPort(self.handle)
 
     def cyclePort(self):
-        call_ft(_ft.FT_CyclePort, self.handle)
+        _ft.FT_CyclePort(self.handle)
 
     def getDriverVersion(self) -> int:
-        driver = _ft.DWORD()
-        call_ft(_ft.FT_GetDriverVersion, self.handle, c.byref(driver))
-        return driver.value
+        out = _out
+        _ft.FT_GetDriverVersion(self.handle, out.dword_ref)
+        return out.dword.value
 
     def getComPortNumber(self) -> int:
         """Return a long representing the COM port number"""
         m = _ft.LONG()
         try:
-            call_ft(_ft.FT_GetComPortNumber, self.handle, c.byref(m))
+            _ft.FT_GetComPortNumber(self.handle, c.byref(m))
         except AttributeError as exc:
             raise Exception("FT_GetComPortNumber is only available on windows") from exc
         return m.value
@@ -608,7 +1177,7 @@ class FTD2XX(ContextManager["FTD2XX"]):
         progdata.Signature1 = _ft.DWORD(0)
         progdata.Signature2 = _ft.DWORD(0xFFFFFFFF)
         progdata.Version = _ft.DWORD(2)
-        call_ft(_ft.FT_EE_Program, self.handle, progdata)
+        _ft.FT_EE_Program(self.handle, progdata)
 
     def eeRead(self) -> _ft.ft_program_data:
         """Get the program information from the EEPROM"""
@@ -635,28 +1204,27 @@ class FTD2XX(ContextManager["FTD2XX"]):
             )
         )
 
-        call_ft(_ft.FT_EE_Read, self.handle, c.byref(progdata))
+        _ft.FT_EE_Read(self.handle, c.byref(progdata))
         return progdata
 
     def eeUASize(self) -> int:
         """Get the EEPROM user area size"""
         uasize = _ft.DWORD()
-        call_ft(_ft.FT_EE_UASize, self.handle, c.byref(uasize))
+        _ft.FT_EE_UASize(self.handle, c.byref(uasize))
         return uasize.value
 
     def eeUAWrite(self, data: bytes) -> None:
         """Write data to the EEPROM user area. data must be a bytes object with
         appropriate byte values"""
         buf = (c.c_ubyte * len(data)).from_buffer_copy(data)
-        call_ft(_ft.FT_EE_UAWrite, self.handle, buf, len(data))
+        _ft.FT_EE_UAWrite(self.handle, buf, len(data))
 
     def eeUARead(self, b_to_read: int) -> bytes:
         """Read b_to_read bytes from the EEPROM user area"""
         b_read = _ft.DWORD()
         # buf = c.create_string_buffer(b_to_read)
         buf = (c.c_ubyte * (b_to_read + 1))()
-        call_ft(
-            _ft.FT_EE_UARead,
+        _ft.FT_EE_UARead(
             self.handle,
             buf,
             b_to_read,
@@ -664,28 +1232,76 @@ class FTD2XX(ContextManager["FTD2XX"]):
         )
         return bytes(buf[: b_read.value])
 
+    def instrument(self, callback=None, interval: float = 1.0):
+        """Start recording the count, failures, bytes moved and latency of the
+        calls to each method, and return the :class:`~ftd2xx.instrument.Instrumentation`
+        holding them. callback, if given, is called with a snapshot of the
+        statistics every interval seconds. Calls are not slowed down until
+        this is used."""
+        from .instrument import instrument
+
+        return instrument(self, callback, interval)
+
+    def uninstrument(self):
+        """Stop recording calls and return the statistics collected, if any"""
+        from .instrument import uninstrument
+
+        return uninstrument(self)
+
+    def __enter__(self) -> Self:
+        return self
+
     def __exit__(
         self,
-        __exc_type: type[BaseException] | None,
-        __exc_value: BaseException | None,
-        __traceback: TracebackType | None,
-    ) -> bool | None:
+        # builtins.type, as the type property shadows it in the class body
+        exc_type: builtins.type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
         """Close the device when exiting the context manager"""
         self.close()
-        return super().__exit__(__exc_type, __exc_value, __traceback)
 
 
+if os.environ.get("FTD2XX_BACKEND"):
+    setBackend(os.environ["FTD2XX_BACKEND"])
+
 __all__ = [
     "call_ft",
+    "setBackend",
+    "getBackend",
     "listDevices",
     "getLibraryVersion",
     "createDeviceInfoList",
     "getDeviceInfoDetail",
+    "getDeviceInfoList",
     "open",
     "openEx",
     "FTD2XX",
+    "DeviceRecord",
+    "DeviceStatus",
     "DeviceError",
+    "InvalidHandleError",
+    "DeviceNotFoundError",
+    "DeviceNotOpenedError",
+    "IoError",
+    "InsufficientResourcesError",
+    "InvalidParameterError",
+    "InvalidBaudRateError",
+    "DeviceNotOpenedForEraseError",
+    "DeviceNotOpenedForWriteError",
+    "FailedToWriteDeviceError",
+    "EepromReadFailedError",
+    "EepromWriteFailedError",
+    "EepromEraseFailedError",
+    "EepromNotPresentError",
+    "EepromNotProgrammedError",
+    "InvalidArgsError",
+    "NotSupportedError",
+    "OtherError",
+    "WriteTimeoutError",
     "ft_program_data",
+    "pollAll",
+    "statusDtype",
 ]
 if sys.platform == "win32":
     __all__ += ["w32CreateFile"]
@@ -0,0 +1,501 @@
+"""
+Parallel I/O on many FTDI devices.
+
+:class:`DeviceGroup` owns a list of open devices and runs the same operation
+on all of them at once from a bounded thread pool. ctypes releases the GIL
+during the driver calls, so reads and writes on different devices overlap and
+use the USB bandwidth that iterating over the devices one by one leaves idle.
+Results come back in the order of the devices. :func:`openChip` opens all the
+channels of an FT2232H or FT4232H as one such group.
+:example:
+    with DeviceGroup([ftd2xx.openEx(s) for s in serials], timeout=1.0) as group:
+        group.setBaudRate(3_000_000)
+        group.write(b"ping")
+        replies = group.read(4)
+        print(group.stats()["read_rate"])
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Sequence
+
+from . import defines
+from .ftd2xx import (
+    FTD2XX,
+    DeviceError,
+    DeviceNotFoundError,
+    getDeviceInfoList,
+    openEx,
+)
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+#: Interface letters of the channels of multi-interface chips
+CHANNELS = ("A", "B", "C", "D")
+
+_BUFFERS = (bytes, bytearray, memoryview)
+# Arguments of a device left out of an operation
+_SKIP: Any = object()
+
+
+class DeviceGroupError(DeviceError):
+    """Exception raised when an operation failed on some devices of a group"""
+
+    def __init__(self, errors: Mapping[int, BaseException], results: list[Any]):
+        failed = ", ".join(f"{index}: {error!r}" for index, error in errors.items())
+        super().__init__(f"Failed on {len(errors)} device(s): {failed}")
+        #: Exception of each failed device, by device index
+        self.errors = errors
+        #: Result of every device, the exception for those that failed
+        self.results = results
+
+    def __reduce__(self):
+        return type(self), (self.errors, self.results)
+
+
+class _DeviceStats:
+    __slots__ = ("busy", "bytes_read", "bytes_written", "calls", "errors", "timeouts")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.busy = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DeviceGroup:
+    """Devices driven in parallel, each operation fanned out to every device.
+
+    Operations on one device never overlap: a device whose previous operation
+    timed out takes the next one once it is done. Each group method waits for
+    all the devices, or their timeout, and raises :class:`DeviceGroupError` if
+    any failed, unless ``return_exceptions`` is set, in which case exceptions
+    are returned in place of the results.
+    """
+
+    def __init__(
+        self,
+        devices: Iterable[FTD2XX],
+        max_workers: int | None = None,
+        timeout: float | Sequence[float] | None = None,
+    ):
+        """
+        Args:
+            devices: Open devices, now owned and closed by the group.
+            max_workers (int): Size of the thread pool, by default one thread
+                per device up to 32.
+            timeout: Default seconds each device is given to complete an
+                operation, from its submission, or one value per device.
+                None waits forever.
+        """
+        self.devices = list(devices)
+        self.timeout = timeout
+        if max_workers is None:
+            max_workers = min(32, max(1, len(self.devices)))
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="ftd2xx-group"
+        )
+        self._locks = [threading.Lock() for _ in self.devices]
+        self._statsLock = threading.Lock()
+        self._stats: list[_DeviceStats] = []
+        self._wall = 0.0
+        self._batches = 0
+        self._start = 0.0
+        self.resetStats()
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __getitem__(self, index: int) -> FTD2XX:
+        return self.devices[index]
+
+    def _call(
+        self,
+        index: int,
+        function: Callable[..., Any] | str,
+        args: tuple,
+        counter: str | None,
+    ) -> Any:
+        device = self.devices[index]
+        # Methods are looked up on each device, so that instrumented devices
+        # record the calls
+        method: Callable[..., Any]
+        if isinstance(function, str):
+            method = getattr(device, function)
+        else:
+            method = function
+            args = (device, *args)
+        with self._locks[index]:
+            start = time.perf_counter()
+            try:
+                result = method(*args)
+            except BaseException:
+                busy = time.perf_counter() - start
+                with self._statsLock:
+                    stats = self._stats[index]
+                    stats.calls += 1
+                    stats.errors += 1
+                    stats.busy += busy
+                raise
+            busy = time.perf_counter() - start
+        with self._statsLock:
+            stats = self._stats[index]
+            stats.calls += 1
+            stats.busy += busy
+            if counter == "bytes_read":
+                stats.bytes_read += result if isinstance(result, int) else len(result)
+            elif counter == "bytes_written":
+                stats.bytes_written += result
+        return result
+
+    def _run(
+        self,
+        function: Callable[..., Any] | str,
+        args: Sequence[tuple],
+        timeout: float | Sequence[float] | None,
+        return_exceptions: bool,
+        counter: str | None = None,
+    ) -> list[Any]:
+        start = time.monotonic()
+        futures = [
+            None
+            if args[index] is _SKIP
+            else self._executor.submit(
+                self._call, index, function, args[index], counter
+            )
+            for index in range(len(self.devices))
+        ]
+        if timeout is None:
+            timeout = self.timeout
+        timeouts = self._perDevice(timeout, (int, float, type(None)))
+        results: list[Any] = []
+        errors: dict[int, BaseException] = {}
+        for index, future in enumerate(futures):
+            if future is None:
+                results.append(None)
+                continue
+            limit = timeouts[index]
+            try:
+                if limit is None:
+                    results.append(future.result())
+                else:
+                    remaining = max(0.0, start + limit - time.monotonic())
+                    results.append(future.result(remaining))
+            except concurrent.futures.TimeoutError:
+                error: BaseException = TimeoutError(
+                    f"Device {index} did not complete within {limit} s"
+                )
+                with self._statsLock:
+                    self._stats[index].timeouts += 1
+                errors[index] = error
+                results.append(error)
+            except Exception as exc:  # noqa: BLE001 - raised in DeviceGroupError
+                errors[index] = exc
+                results.append(exc)
+        with self._statsLock:
+            self._batches += 1
+            self._wall += time.monotonic() - start
+        if errors and not return_exceptions:
+            raise DeviceGroupError(errors, results)
+        return results
+
+    def _perDevice(self, value: Any, single: tuple[type, ...]) -> list[Any]:
+        # Broadcast a single value, or check there is one value per device
+        if isinstance(value, single):
+            return [value] * len(self.devices)
+        values = list(value)
+        if len(values) != len(self.devices):
+            raise ValueError(
+                f"Expected {len(self.devices)} values, one per device, "
+                f"got {len(values)}"
+            )
+        return values
+
+    def map(
+        self,
+        function: Callable[..., Any],
+        *iterables: Iterable[Any],
+        timeout: float | Sequence[float] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Call function(device, *args) on every device in parallel, with args
+        taken from iterables, one item per device, and return the results in
+        device order"""
+        columns = [self._perDevice(iterable, ()) for iterable in iterables]
+        args = list(zip(*columns)) if columns else [()] * len(self.devices)
+        return self._run(function, args, timeout, return_exceptions)
+
+    def read(
+        self,
+        nbytes: int | Sequence[int],
+        timeout: float | Sequence[float] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[bytes]:
+        """Read up to nbytes from every device, or the number given for each"""
+        args = [(n,) for n in self._perDevice(nbytes, (int,))]
+        return self._run("read", args, timeout, return_exceptions, "bytes_read")
+
+    def readinto(
+        self,
+        buffers: Sequence[Any],
+        timeout: float | Sequence[float] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[int]:
+        """Read into one buffer per device, and return the bytes read by each"""
+        args = [(b,) for b in self._perDevice(buffers, ())]
+        return self._run("readinto", args, timeout, return_exceptions, "bytes_read")
+
+    def write(
+        self,
+        data: Any,
+        timeout: float | Sequence[float] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[int]:
+        """Write data to every device, or one buffer per device given a
+        sequence of buffers, and return the bytes written to each"""
+        args = [(d,) for d in self._perDevice(data, _BUFFERS)]
+        return self._run("write_all", args, timeout, return_exceptions, "bytes_written")
+
+    def purge(self, mask: int = 0, timeout: float | None = None) -> None:
+        """Purge the buffers of every device"""
+        self._run("purge", [(mask,)] * len(self.devices), timeout, False)
+
+    def _configure(self, method: str, args: list[tuple], timeout: float | None) -> None:
+        # Every setting goes through here, for subclasses to track
+        self._run(method, args, timeout, False)
+
+    def setBaudRate(self, baud: int | Sequence[int], timeout: float | None = None):
+        """Set the baud rate of every device, or the one given for each"""
+        args = [(b,) for b in self._perDevice(baud, (int,))]
+        self._configure("setBaudRate", args, timeout)
+
+    def setTimeouts(self, read: int, write: int, timeout: float | None = None):
+        """Set the driver read and write timeouts in milliseconds of every
+        device"""
+        self._configure("setTimeouts", [(read, write)] * len(self), timeout)
+
+    def setLatencyTimer(
+        self, latency: int | Sequence[int], timeout: float | None = None
+    ) -> None:
+        """Set the latency timer in milliseconds of every device, or the one
+        given for each"""
+        args = [(n,) for n in self._perDevice(latency, (int,))]
+        self._configure("setLatencyTimer", args, timeout)
+
+    def setBitMode(self, mask: int, enable: int, timeout: float | None = None):
+        """Set the bit mode of every device"""
+        self._configure("setBitMode", [(mask, enable)] * len(self), timeout)
+
+    def setUSBParameters(
+        self, in_tx_size: int, out_tx_size: int = 0, timeout: float | None = None
+    ) -> None:
+        """Set the USB request transfer sizes of every device"""
+        args = [(in_tx_size, out_tx_size)] * len(self)
+        self._configure("setUSBParameters", args, timeout)
+
+    def setDataCharacteristics(
+        self, wordlen: int, stopbits: int, parity: int, timeout: float | None = None
+    ) -> None:
+        """Set the UART data characteristics of every device"""
+        args = [(wordlen, stopbits, parity)] * len(self)
+        self._configure("setDataCharacteristics", args, timeout)
+
+    def setFlowControl(
+        self,
+        flowcontrol: int,
+        xon: int = -1,
+        xoff: int = -1,
+        timeout: float | None = None,
+    ) -> None:
+        """Set the UART flow control of every device"""
+        args = [(flowcontrol, xon, xoff)] * len(self)
+        self._configure("setFlowControl", args, timeout)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the totals since the last reset: calls, failures, timeouts,
+        bytes moved, the time spent in group operations, the read and write
+        rates in bytes per second over that time, the average number of
+        devices busy at once, and the same counters per device"""
+        with self._statsLock:
+            devices = [stats.snapshot() for stats in self._stats]
+            wall = self._wall
+            batches = self._batches
+        totals = {
+            name: sum(device[name] for device in devices)
+            for name in _DeviceStats.__slots__
+        }
+        return {
+            "batches": batches,
+            "wall_time": wall,
+            "elapsed": time.monotonic() - self._start,
+            **totals,
+            "read_rate": totals["bytes_read"] / wall if wall else 0.0,
+            "write_rate": totals["bytes_written"] / wall if wall else 0.0,
+            "parallelism": totals["busy"] / wall if wall else 0.0,
+            "devices": devices,
+        }
+
+    def resetStats(self) -> None:
+        """Clear the statistics"""
+        with self._statsLock:
+            self._stats = [_DeviceStats() for _ in self.devices]
+            self._wall = 0.0
+            self._batches = 0
+            self._start = time.monotonic()
+
+    def close(self) -> None:
+        """Wait for running operations, then close every device"""
+        self._executor.shutdown(wait=True)
+        errors = {}
+        for index, device in enumerate(self.devices):
+            try:
+                device.close()
+            except DeviceError as exc:
+                errors[index] = exc
+        if errors:
+            raise DeviceGroupError(errors, [errors.get(i) for i in range(len(self))])
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the group when exiting the context manager"""
+        self.close()
+
+
+class Chip(DeviceGroup):
+    """The channels of one multi-interface chip, such as an FT2232H or
+    FT4232H, as a single device group.
+
+    Channels are indexed by position or by interface letter. Settings made
+    through the group are recorded per channel, and a setting a channel
+    already has is not sent again. Settings changed on a channel directly are
+    not seen; call :meth:`forget` after doing so.
+    """
+
+    def __init__(
+        self,
+        serial: bytes,
+        channels: dict[str, FTD2XX],
+        max_workers: int | None = None,
+        timeout: float | Sequence[float] | None = None,
+    ):
+        """
+        Args:
+            serial (bytes): Serial number of the chip, without the letter.
+            channels: Open device of each interface letter.
+            max_workers (int): Size of the thread pool.
+            timeout: Default seconds each channel is given per operation.
+        """
+        super().__init__(channels.values(), max_workers, timeout)
+        self.serial = serial
+        #: Interface letter of each channel, in device order
+        self.channels = list(channels)
+        self._settings: list[dict[str, tuple]] = [{} for _ in self.devices]
+
+    def __getitem__(self, key: int | str) -> FTD2XX:
+        if isinstance(key, str):
+            if key not in self.channels:
+                raise KeyError(key)
+            key = self.channels.index(key)
+        return self.devices[key]
+
+    @property
+    def settings(self) -> list[dict[str, tuple]]:
+        """Arguments of the last successful call of each setter, per channel"""
+        return [dict(settings) for settings in self._settings]
+
+    def forget(self) -> None:
+        """Clear the recorded settings, so that the next ones are all sent"""
+        self._settings = [{} for _ in self.devices]
+
+    def _configure(self, method: str, args: list[tuple], timeout: float | None) -> None:
+        settings = self._settings
+        needed = [
+            _SKIP if settings[index].get(method) == arg else arg
+            for index, arg in enumerate(args)
+        ]
+        if all(arg is _SKIP for arg in needed):
+            return
+        results = self._run(method, needed, timeout, True)
+        errors = {}
+        for index, (arg, result) in enumerate(zip(needed, results)):
+            if arg is _SKIP:
+                continue
+            if isinstance(result, BaseException):
+                errors[index] = result
+                settings[index].pop(method, None)
+            else:
+                settings[index][method] = arg
+        if errors:
+            raise DeviceGroupError(errors, results)
+
+
+def openChip(
+    serial: bytes | str,
+    max_workers: int | None = None,
+    timeout: float | Sequence[float] | None = None,
+) -> Chip:
+    """Open every channel of the multi-interface chip whose channels have
+    the serial number serial followed by their interface letter.
+
+    The devices are enumerated once and the channels opened in parallel,
+    without enumerating again for each.
+
+    Raises:
+        DeviceNotFoundError: If no channel of the chip is connected.
+        DeviceGroupError: If a channel could not be opened.
+    """
+    if isinstance(serial, str):
+        serial = serial.encode()
+    found = {}
+    for entry in getDeviceInfoList():
+        channel = entry["serial"][len(serial) :].decode(errors="replace")
+        if entry["serial"].startswith(serial) and channel in CHANNELS:
+            found[channel] = entry["serial"]
+    if not found:
+        raise DeviceNotFoundError(defines.Status.DEVICE_NOT_FOUND)
+    letters = sorted(found)
+    with concurrent.futures.ThreadPoolExecutor(len(letters)) as executor:
+        futures = [
+            executor.submit(
+                openEx, found[letter], defines.OPEN_BY_SERIAL_NUMBER, update=False
+            )
+            for letter in letters
+        ]
+    opened: dict[str, FTD2XX] = {}
+    errors: dict[int, BaseException] = {}
+    for index, (letter, future) in enumerate(zip(letters, futures)):
+        try:
+            opened[letter] = future.result()
+        except BaseException as exc:  # noqa: BLE001 - raised in DeviceGroupError
+            errors[index] = exc
+    if errors:
+        for device in opened.values():
+            try:
+                device.close()
+            except DeviceError:
+                pass
+        results = [
+            opened.get(letter, errors.get(i)) for i, letter in enumerate(letters)
+        ]
+        raise DeviceGroupError(errors, results)
+    return Chip(serial, opened, max_workers, timeout)
+
+
+__all__ = ["CHANNELS", "Chip", "DeviceGroup", "DeviceGroupError", "openChip"]
@@ -0,0 +1,226 @@
+"""
+I2C master on the MPSSE of FT2232H, FT4232H and FT232H devices.
+
+Whole transactions (start, address, data, repeated start, stop) are encoded
+into one MPSSE command stream, and every ACK bit and data byte of all the
+queued transactions comes back in a single read, following FTDI application
+note AN_255. The pins are ADBUS0 SCL, ADBUS1 SDA out and ADBUS2 SDA in, with
+ADBUS1 and ADBUS2 tied together.
+:example:
+    i2c = I2cController(device, frequency=400e3)
+    print(i2c.scan())
+    eeprom = i2c.exchange(0x50, b"\\x00", 256)
+"""
+
+from __future__ import annotations
+
+import math
+
+from .ftd2xx import DeviceError
+from .mpsse import MAX_TRANSFER, CommandBuffer, MpsseDevice, Response, enterMpsse
+
+#: MPSSE clock with the divide by 5 disabled
+BASE_CLOCK = 60_000_000
+
+SCL = 0x01
+SDA_OUT = 0x02
+SDA_IN = 0x04
+
+# Number of times each bus state is set, to hold it long enough for the
+# start and stop setup and hold times
+_HOLD = 4
+
+
+class I2cNackError(DeviceError):
+    """Exception raised when a byte of an I2C transaction was not acknowledged"""
+
+    def __init__(self, address: int, index: int):
+        super().__init__(f"I2C device 0x{address:02x} did not ACK byte {index}")
+        self.address = address
+        #: Index of the unacknowledged byte, 0 being the address byte
+        self.index = index
+
+    def __reduce__(self):
+        return type(self), (self.address, self.index)
+
+
+def clockDivisor(frequency: float, base: int = BASE_CLOCK) -> tuple[int, float]:
+    """Return the MPSSE divisor giving the fastest 3-phase clock not above
+    frequency, and the resulting clock frequency"""
+    divisor = max(0, math.ceil(base / (3 * frequency)) - 1)
+    if divisor > 0xFFFF:
+        raise ValueError(f"Frequency {frequency} Hz is too low")
+    return divisor, base / ((1 + divisor) * 3)
+
+
+class I2cTransfer:
+    """ACK bits and data of one queued transaction, available after the flush"""
+
+    __slots__ = ("_acks", "_data", "address")
+
+    def __init__(self, address: int):
+        self.address = address
+        self._acks: list[Response] = []
+        self._data: list[Response] = []
+
+    @property
+    def ready(self) -> bool:
+        return all(r.ready for r in self._acks) and all(r.ready for r in self._data)
+
+    @property
+    def nack(self) -> int | None:
+        """Index of the first byte sent that was not acknowledged, if any"""
+        for index, ack in enumerate(self._acks):
+            if ack.value & 1:
+                return index
+        return None
+
+    @property
+    def acked(self) -> bool:
+        return self.nack is None
+
+    def check(self) -> None:
+        """Raise I2cNackError if a byte was not acknowledged"""
+        index = self.nack
+        if index is not None:
+            raise I2cNackError(self.address, index)
+
+    @property
+    def data(self) -> bytes:
+        """The bytes read. Meaningless if the transaction was not acknowledged"""
+        return b"".join(r.view for r in self._data)
+
+
+class I2cController:
+    """I2C master batching transactions over an MPSSE device.
+
+    Queued transactions are only sent by :meth:`flush`, or when the data they
+    are expected to return exceeds ``max_read`` bytes. Since every byte is
+    queued before any ACK is seen, a transaction is not cut short by a NACK;
+    check the returned :class:`I2cTransfer` instead.
+    """
+
+    def __init__(
+        self,
+        device: MpsseDevice,
+        frequency: float = 100e3,
+        drive_zero: bool = False,
+        max_read: int = MAX_TRANSFER,
+        init: bool = True,
+    ):
+        """Configure device as an I2C master.
+
+        Args:
+            device (FTD2XX): An open MPSSE capable device.
+            frequency (float): Highest acceptable SCL frequency in Hz.
+            drive_zero (bool): FT232H only, make SCL and SDA open drain.
+            max_read (int): Largest reply to collect in one flush.
+            init (bool): Set False if the device is already in MPSSE mode.
+        """
+        self.device = device
+        self.max_read = max_read
+        self._divisor, self.frequency = clockDivisor(frequency)
+        self._cmd = CommandBuffer(device, write_neg=True, read_neg=False)
+        if init:
+            enterMpsse(device)
+        cmd = self._cmd
+        cmd.setDivideBy5(False)
+        cmd.setAdaptive(False)
+        cmd.setThreePhase(True)
+        cmd.setLoopback(False)
+        cmd.setDivisor(self._divisor)
+        if drive_zero:
+            cmd.setDriveZero(SCL | SDA_OUT)
+        cmd.setGpioLow(SCL | SDA_OUT, SCL | SDA_OUT)
+        cmd.flush()
+
+    def _set(self, value: int, repeat: int = 1, sda: bool = True) -> None:
+        direction = SCL | SDA_OUT if sda else SCL
+        for _ in range(repeat):
+            self._cmd.setGpioLow(value, direction)
+
+    def _start(self) -> None:
+        # SDA is raised before SCL so this also works as a repeated start
+        self._set(SDA_OUT, _HOLD)
+        self._set(SCL | SDA_OUT, _HOLD)
+        self._set(SCL, _HOLD)
+        self._set(0)
+
+    def _stop(self) -> None:
+        self._set(0, _HOLD)
+        self._set(SCL, _HOLD)
+        self._set(SCL | SDA_OUT, _HOLD)
+
+    def _writeByte(self, transfer: I2cTransfer, value: int) -> None:
+        cmd = self._cmd
+        cmd.clockOut(bytes((value,)))
+        self._set(0, sda=False)
+        transfer._acks.append(cmd.clockBitsIn(1))
+        self._set(0)
+
+    def _readByte(self, transfer: I2cTransfer, ack: bool) -> None:
+        cmd = self._cmd
+        if cmd.expected >= self.max_read:
+            cmd.flush()
+        self._set(0, sda=False)
+        transfer._data.append(cmd.clockIn(1))
+        self._set(0)
+        cmd.clockBitsOut(0x00 if ack else 0xFF, 1)
+
+    def queue(self, address: int, out=b"", read_len: int = 0) -> I2cTransfer:
+        """Queue a transaction with the 7-bit address: write out, then after a
+        repeated start read read_len bytes. With neither, only probe the
+        address.
+
+        Returns:
+            A handle whose ACK bits and data are filled in once flushed.
+        """
+        transfer = I2cTransfer(address)
+        if self._cmd.expected >= self.max_read:
+            self._cmd.flush()
+        out = memoryview(out).cast("B")
+        if out.nbytes or not read_len:
+            self._start()
+            self._writeByte(transfer, address << 1)
+            for value in out:
+                self._writeByte(transfer, value)
+        if read_len:
+            self._start()
+            self._writeByte(transfer, address << 1 | 1)
+            for i in range(read_len):
+                self._readByte(transfer, i < read_len - 1)
+        self._stop()
+        return transfer
+
+    def flush(self) -> None:
+        """Send every queued transaction with one write and one read"""
+        self._cmd.flush()
+
+    def exchange(self, address: int, out=b"", read_len: int = 0) -> bytes:
+        """Run one transaction now, along with any queued ones, and return
+        the bytes read.
+
+        Raises:
+            I2cNackError: If a byte was not acknowledged.
+        """
+        transfer = self.queue(address, out, read_len)
+        self.flush()
+        transfer.check()
+        return transfer.data
+
+    def write(self, address: int, out) -> None:
+        """Write out to the device at address now"""
+        self.exchange(address, out)
+
+    def read(self, address: int, nbytes: int) -> bytes:
+        """Read nbytes from the device at address now"""
+        return self.exchange(address, b"", nbytes)
+
+    def scan(self, addresses=range(0x08, 0x78)) -> list[int]:
+        """Probe addresses in a single batch and return those that ACK"""
+        transfers = [self.queue(address) for address in addresses]
+        self.flush()
+        return [t.address for t in transfers if t.acked]
+
+
+__all__ = ["I2cController", "I2cNackError", "I2cTransfer", "clockDivisor"]
@@ -0,0 +1,271 @@
+"""
+Opt-in timing and throughput statistics for FTD2XX devices.
+
+Instrumenting a device switches its class to a subclass whose public methods
+record, per method, the number of calls and failures, the bytes moved and a
+histogram of the call latencies. Devices that are not instrumented run the
+plain class, so the statistics cost nothing until enabled.
+:example:
+    stats = device.instrument(callback=print, interval=10.0)
+    ...
+    print(stats.snapshot()["methods"]["read"]["p99_ns"])
+    device.uninstrument()
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from .ftd2xx import FTD2XX
+
+# Number of bytes moved by a method, from its result
+_SIZES: dict[str, Callable[[Any], int]] = {
+    "read": len,
+    "readinto": int,
+    "write": int,
+    "write_all": int,
+    "writev": int,
+    "eeUARead": len,
+}
+
+Snapshot = Dict[str, Any]
+
+
+def _bucket(ns: int) -> int:
+    # Lower bound of the bucket holding ns: exact below 8, then 4 buckets per
+    # power of two, so a value is known to within 25%
+    if ns < 8:
+        return ns
+    shift = ns.bit_length() - 3
+    return ns >> shift << shift
+
+
+def _bucketEnd(bucket: int) -> int:
+    if bucket < 8:
+        return bucket
+    return bucket + (1 << (bucket.bit_length() - 3)) - 1
+
+
+class Histogram:
+    """Latency histogram in nanoseconds with logarithmic buckets, in the
+    manner of HDR histograms"""
+
+    __slots__ = ("count", "counts", "max", "min", "total")
+
+    def __init__(self):
+        #: Number of values by bucket lower bound
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        bucket = _bucket(ns)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        if not self.count or ns < self.min:
+            self.min = ns
+        self.max = max(self.max, ns)
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, percent: float) -> int:
+        """Return the value that percent of the recorded values do not
+        exceed, to within the bucket width"""
+        if not self.count:
+            return 0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(_bucketEnd(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class MethodStats:
+    """Statistics of the calls to one method"""
+
+    __slots__ = ("bytes", "calls", "errors", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency = Histogram()
+
+    def snapshot(self, elapsed: float) -> Snapshot:
+        latency = self.latency
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "bytes_per_s": self.bytes / elapsed if elapsed else 0.0,
+            "total_ns": latency.total,
+            "mean_ns": latency.mean,
+            "min_ns": latency.min,
+            "max_ns": latency.max,
+            "p50_ns": latency.percentile(50),
+            "p90_ns": latency.percentile(90),
+            "p99_ns": latency.percentile(99),
+            "buckets": dict(sorted(latency.counts.items())),
+        }
+
+
+class Instrumentation:
+    """Statistics collected for one device since instrumented or reset.
+
+    Calls made from within other methods, such as those of
+    :meth:`~ftd2xx.FTD2XX.wait_for_event`, are counted too.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Snapshot], Any] | None = None,
+        interval: float = 1.0,
+    ):
+        """
+        Args:
+            callback: Called with a snapshot, from the thread of the call
+                that completes each interval.
+            interval (float): Seconds between callbacks. The statistics are
+                reset after each callback.
+        """
+        self.callback = callback
+        self.interval = interval
+        self.methods: dict[str, MethodStats] = {}
+        self._lock = threading.Lock()
+        self._start = self._due = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the statistics"""
+        with self._lock:
+            self._restart()
+
+    def _restart(self) -> None:
+        self.methods = {}
+        self._start = time.monotonic()
+        self._due = self._start + self.interval
+
+    def record(self, method: str, ns: int, nbytes: int, failed: bool) -> None:
+        """Add a call of method that took ns nanoseconds and moved nbytes"""
+        snapshot = None
+        with self._lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = MethodStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.bytes += nbytes
+            stats.latency.record(ns)
+            if self.callback is not None and time.monotonic() >= self._due:
+                snapshot = self._snapshot()
+                self._restart()
+        if snapshot is not None:
+            self.callback(snapshot)
+
+    def _snapshot(self) -> Snapshot:
+        elapsed = time.monotonic() - self._start
+        return {
+            "elapsed": elapsed,
+            "calls": sum(s.calls for s in self.methods.values()),
+            "errors": sum(s.errors for s in self.methods.values()),
+            "bytes": sum(s.bytes for s in self.methods.values()),
+            "methods": {
+                name: stats.snapshot(elapsed)
+                for name, stats in sorted(self.methods.items())
+            },
+        }
+
+    def snapshot(self, reset: bool = False) -> Snapshot:
+        """Return the statistics as a dict of plain values, with the totals
+        and an entry per method called"""
+        with self._lock:
+            snapshot = self._snapshot()
+            if reset:
+                self._restart()
+        return snapshot
+
+
+def _wrap(name: str, method: Callable) -> Callable:
+    size = _SIZES.get(name)
+    clock = time.perf_counter_ns
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = clock()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            self._instrumentation.record(name, clock() - start, 0, True)
+            raise
+        nbytes = size(result) if size is not None and result is not None else 0
+        self._instrumentation.record(name, clock() - start, nbytes, False)
+        return result
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def instrumentedClass(cls: type) -> type:
+    """Return the subclass of cls whose public methods record their calls"""
+    # No slots of its own, so that instances can switch class
+    namespace: dict[str, Any] = {"__slots__": (), "_uninstrumented": cls}
+    for name in dir(cls):
+        if name.startswith("_") or name in ("instrument", "uninstrument"):
+            continue
+        method = getattr(cls, name)
+        if callable(method) and not isinstance(method, type):
+            namespace[name] = _wrap(name, method)
+    return type(f"Instrumented{cls.__name__}", (cls,), namespace)
+
+
+def instrument(
+    device: FTD2XX,
+    callback: Callable[[Snapshot], Any] | None = None,
+    interval: float = 1.0,
+) -> Instrumentation:
+    """Start recording the calls made on device, and return the statistics.
+    If device is already instrumented, its statistics are reset and given
+    the new callback."""
+    instrumentation = getattr(device, "_instrumentation", None)
+    if instrumentation is not None:
+        instrumentation.callback = callback
+        instrumentation.interval = interval
+        instrumentation.reset()
+        return instrumentation
+    instrumentation = Instrumentation(callback, interval)
+    device._instrumentation = instrumentation
+    cls: type = type(device)
+    device.__class__ = instrumentedClass(cls)
+    return instrumentation
+
+
+def uninstrument(device: FTD2XX) -> Instrumentation | None:
+    """Stop recording the calls made on device, and return the statistics
+    collected, if it was instrumented"""
+    cls = getattr(type(device), "_uninstrumented", None)
+    if cls is None:
+        return None
+    device.__class__ = cls
+    instrumentation = device._instrumentation
+    device._instrumentation = None
+    return instrumentation
+
+
+__all__ = [
+    "Histogram",
+    "Instrumentation",
+    "MethodStats",
+    "instrument",
+    "instrumentedClass",
+    "uninstrument",
+]
@@ -0,0 +1,317 @@
+"""
+JTAG master on the MPSSE of FT2232H, FT4232H and FT232H devices.
+
+:class:`JtagController` tracks the TAP state, moves between states along the
+shortest TMS paths and turns IR/DR shifts into MPSSE byte shifts with a bit
+tail, the last bit being clocked together with TMS to leave the shift state.
+Long shifts are streamed in chunks so a multi-megabyte bitstream costs a few
+large writes. The pins are ADBUS0 TCK, ADBUS1 TDI, ADBUS2 TDO and ADBUS3 TMS.
+:example:
+    jtag = JtagController(device, frequency=15e6)
+    jtag.reset()
+    print(hex(jtag.readIdcode()))
+    jtag.shiftIr(CFG_IN, 6)
+    jtag.shiftDr(bitstream)
+"""
+
+from __future__ import annotations
+
+import collections
+from enum import IntEnum
+
+from .mpsse import MAX_TRANSFER, CommandBuffer, MpsseDevice, Response, enterMpsse
+from .spi import clockDivisor
+
+TCK = 0x01
+TDI = 0x02
+TDO = 0x04
+TMS = 0x08
+
+
+class TapState(IntEnum):
+    TEST_LOGIC_RESET = 0
+    RUN_TEST_IDLE = 1
+    SELECT_DR_SCAN = 2
+    CAPTURE_DR = 3
+    SHIFT_DR = 4
+    EXIT1_DR = 5
+    PAUSE_DR = 6
+    EXIT2_DR = 7
+    UPDATE_DR = 8
+    SELECT_IR_SCAN = 9
+    CAPTURE_IR = 10
+    SHIFT_IR = 11
+    EXIT1_IR = 12
+    PAUSE_IR = 13
+    EXIT2_IR = 14
+    UPDATE_IR = 15
+
+
+# Next state for TMS low and TMS high, per IEEE 1149.1
+_TRANSITIONS = {
+    TapState.TEST_LOGIC_RESET: (TapState.RUN_TEST_IDLE, TapState.TEST_LOGIC_RESET),
+    TapState.RUN_TEST_IDLE: (TapState.RUN_TEST_IDLE, TapState.SELECT_DR_SCAN),
+    TapState.SELECT_DR_SCAN: (TapState.CAPTURE_DR, TapState.SELECT_IR_SCAN),
+    TapState.CAPTURE_DR: (TapState.SHIFT_DR, TapState.EXIT1_DR),
+    TapState.SHIFT_DR: (TapState.SHIFT_DR, TapState.EXIT1_DR),
+    TapState.EXIT1_DR: (TapState.PAUSE_DR, TapState.UPDATE_DR),
+    TapState.PAUSE_DR: (TapState.PAUSE_DR, TapState.EXIT2_DR),
+    TapState.EXIT2_DR: (TapState.SHIFT_DR, TapState.UPDATE_DR),
+    TapState.UPDATE_DR: (TapState.RUN_TEST_IDLE, TapState.SELECT_DR_SCAN),
+    TapState.SELECT_IR_SCAN: (TapState.CAPTURE_IR, TapState.TEST_LOGIC_RESET),
+    TapState.CAPTURE_IR: (TapState.SHIFT_IR, TapState.EXIT1_IR),
+    TapState.SHIFT_IR: (TapState.SHIFT_IR, TapState.EXIT1_IR),
+    TapState.EXIT1_IR: (TapState.PAUSE_IR, TapState.UPDATE_IR),
+    TapState.PAUSE_IR: (TapState.PAUSE_IR, TapState.EXIT2_IR),
+    TapState.EXIT2_IR: (TapState.SHIFT_IR, TapState.UPDATE_IR),
+    TapState.UPDATE_IR: (TapState.RUN_TEST_IDLE, TapState.SELECT_DR_SCAN),
+}
+
+
+def _shortestPaths() -> dict[tuple[TapState, TapState], tuple[int, int]]:
+    paths = {}
+    for start in TapState:
+        # Breadth first search, paths are (TMS bits LSB first, length)
+        found = {start: (0, 0)}
+        queue = collections.deque([start])
+        while queue:
+            state = queue.popleft()
+            bits, length = found[state]
+            for tms, following in enumerate(_TRANSITIONS[state]):
+                if following not in found:
+                    found[following] = (bits | tms << length, length + 1)
+                    queue.append(following)
+        for end, path in found.items():
+            paths[start, end] = path
+    return paths
+
+
+_PATHS = _shortestPaths()
+
+
+def tmsPath(start: TapState, end: TapState) -> tuple[int, int]:
+    """Return the shortest TMS sequence from start to end as (bits, length),
+    the first bit to clock being the least significant"""
+    return _PATHS[start, end]
+
+
+class JtagScan:
+    """TDO bits captured by one queued shift, available after the flush"""
+
+    __slots__ = ("_last", "_parts", "_tail", "_tail_bits", "nbits")
+
+    def __init__(
+        self,
+        nbits: int,
+        parts: list[Response],
+        tail: Response | None,
+        tail_bits: int,
+        last: Response,
+    ):
+        self.nbits = nbits
+        self._parts = parts
+        self._tail = tail
+        self._tail_bits = tail_bits
+        self._last = last
+
+    @property
+    def ready(self) -> bool:
+        return self._last.ready
+
+    @property
+    def data(self) -> bytes:
+        """The bits shifted out of TDO, first bit in the LSB of the first byte"""
+        # Bit shifts with LSB first fill the byte from the top
+        last = (self._last.value >> 7) << self._tail_bits
+        if self._tail is not None:
+            last |= self._tail.value >> (8 - self._tail_bits)
+        return b"".join(part.view for part in self._parts) + bytes((last,))
+
+    @property
+    def value(self) -> int:
+        """The bits shifted out of TDO as an integer"""
+        return int.from_bytes(self.data, "little")
+
+    def __len__(self) -> int:
+        return self.nbits
+
+    def __bytes__(self) -> bytes:
+        return self.data
+
+
+class JtagController:
+    """JTAG master driving a TAP over an MPSSE device.
+
+    Commands are queued and only sent by :meth:`flush`, by shifts that read
+    TDO once their reply reaches ``max_read`` bytes, or by long shifts once
+    ``chunk_size`` command bytes are pending. :attr:`state` is the state the
+    TAP will be in once everything queued has been sent.
+    """
+
+    def __init__(
+        self,
+        device: MpsseDevice,
+        frequency: float = 6e6,
+        max_read: int = MAX_TRANSFER,
+        chunk_size: int = 1 << 20,
+        init: bool = True,
+    ):
+        """Configure device as a JTAG master and reset the TAP.
+
+        Args:
+            device (FTD2XX): An open MPSSE capable device.
+            frequency (float): Highest acceptable TCK frequency in Hz.
+            max_read (int): Largest reply to collect in one flush.
+            chunk_size (int): Command bytes to queue before a long shift is
+                sent out.
+            init (bool): Set False if the device is already in MPSSE mode.
+        """
+        self.device = device
+        self.max_read = max_read
+        self.chunk_size = chunk_size
+        self._divisor, self.frequency = clockDivisor(frequency)
+        # TDI changes on the falling edge and TDO is sampled on the rising
+        # edge, LSB first
+        self._cmd = CommandBuffer(device, lsb=True, write_neg=True, read_neg=False)
+        if init:
+            enterMpsse(device)
+        cmd = self._cmd
+        cmd.setDivideBy5(False)
+        cmd.setThreePhase(False)
+        cmd.setAdaptive(False)
+        cmd.setLoopback(False)
+        cmd.setDivisor(self._divisor)
+        cmd.setGpioLow(TMS, TCK | TDI | TMS)
+        self.state = TapState.TEST_LOGIC_RESET
+        self.reset()
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of command bytes waiting to be sent"""
+        return len(self._cmd)
+
+    def _clockTms(self, bits: int, nbits: int, tdi: bool = False) -> None:
+        while nbits:
+            count = min(nbits, 7)
+            self._cmd.clockTms(bits, count, tdi)
+            bits >>= count
+            nbits -= count
+
+    def reset(self) -> None:
+        """Queue five TMS high clocks, which reset the TAP from any state, then
+        move to Run-Test/Idle"""
+        self._clockTms(0x1F, 5)
+        self.state = TapState.TEST_LOGIC_RESET
+        self.goto(TapState.RUN_TEST_IDLE)
+
+    def goto(self, state: TapState) -> None:
+        """Queue the shortest TMS sequence from the current state to state"""
+        bits, nbits = _PATHS[self.state, state]
+        self._clockTms(bits, nbits)
+        self.state = state
+
+    def runTest(self, cycles: int) -> None:
+        """Queue cycles TCK clocks in Run-Test/Idle"""
+        self.goto(TapState.RUN_TEST_IDLE)
+        self._cmd.clockCycles(cycles)
+
+    def _shift(
+        self,
+        shift_state: TapState,
+        data,
+        nbits: int | None,
+        read: bool,
+        end: TapState,
+    ) -> JtagScan | None:
+        if isinstance(data, int):
+            if nbits is None:
+                raise ValueError("nbits is required when shifting an int")
+            data = data.to_bytes((nbits + 7) // 8, "little")
+        view = memoryview(data).cast("B")
+        if nbits is None:
+            nbits = view.nbytes * 8
+        if not 0 < nbits <= view.nbytes * 8:
+            raise ValueError(f"Cannot shift {nbits} bits out of {view.nbytes} bytes")
+        cmd = self._cmd
+        self.goto(shift_state)
+        # All but the last bit are shifted in bytes then bits, the last one is
+        # clocked with TMS high to leave the shift state
+        nbytes, tail_bits = divmod(nbits - 1, 8)
+        parts = []
+        start = 0
+        while start < nbytes:
+            if read:
+                if cmd.expected >= self.max_read:
+                    cmd.flush()
+                length = min(
+                    nbytes - start, self.chunk_size, self.max_read - cmd.expected
+                )
+                parts.append(cmd.clockInOut(view[start : start + length]))
+            else:
+                length = min(nbytes - start, self.chunk_size)
+                cmd.clockOut(view[start : start + length])
+                if len(cmd) >= self.chunk_size:
+                    cmd.flush()
+            start += length
+        last_byte = view[nbytes] if nbytes < view.nbytes else 0
+        tail = None
+        if tail_bits:
+            if read:
+                tail = cmd.clockBitsInOut(last_byte, tail_bits)
+            else:
+                cmd.clockBitsOut(last_byte, tail_bits)
+        tdi = bool(last_byte >> tail_bits & 1)
+        last = cmd.clockTms(1, 1, tdi, read)
+        self.state = _TRANSITIONS[shift_state][1]
+        self.goto(end)
+        if not read:
+            return None
+        return JtagScan(nbits, parts, tail, tail_bits, last)
+
+    def shiftIr(
+        self,
+        data,
+        nbits: int | None = None,
+        read: bool = False,
+        end: TapState = TapState.RUN_TEST_IDLE,
+    ) -> JtagScan | None:
+        """Queue a shift of nbits bits (all bits of data by default) into the
+        instruction register, first bit in the LSB of the first byte, then
+        move to end. data is a bytes-like object or an int.
+
+        Returns:
+            With read, a handle on the bits shifted out once flushed.
+        """
+        return self._shift(TapState.SHIFT_IR, data, nbits, read, end)
+
+    def shiftDr(
+        self,
+        data,
+        nbits: int | None = None,
+        read: bool = False,
+        end: TapState = TapState.RUN_TEST_IDLE,
+    ) -> JtagScan | None:
+        """Queue a shift of nbits bits (all bits of data by default) into the
+        data register, first bit in the LSB of the first byte, then move to
+        end. data is a bytes-like object or an int.
+
+        Returns:
+            With read, a handle on the bits shifted out once flushed.
+        """
+        return self._shift(TapState.SHIFT_DR, data, nbits, read, end)
+
+    def flush(self) -> None:
+        """Send every queued command with one write and one read"""
+        self._cmd.flush()
+
+    def readIdcode(self) -> int:
+        """Reset the TAP and read the 32-bit IDCODE of the first device in the
+        chain, which the reset selects"""
+        self.reset()
+        scan = self.shiftDr(0, 32, read=True)
+        self.flush()
+        return scan.value
+
+
+__all__ = ["JtagController", "JtagScan", "TapState", "clockDivisor", "tmsPath"]
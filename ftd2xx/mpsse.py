@@ -0,0 +1,403 @@
+"""
+Batched MPSSE commands for FT2232H, FT4232H and FT232H devices.
+
+A :class:`CommandBuffer` collects MPSSE operations into one bytearray and keeps
+track of how many bytes each of them returns, so that a whole sequence of
+transfers costs a single write and a single read. The opcodes follow FTDI
+application note AN_108.
+:example:
+    enterMpsse(device)
+    cmd = CommandBuffer(device)
+    cmd.setDivisor(29)
+    cmd.setGpioLow(0x08, 0x0B)
+    reply = cmd.clockInOut(b"\\x9f\\x00\\x00\\x00")
+    cmd.flush()
+    print(reply.data)
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Protocol
+
+from . import defines
+from .ftd2xx import DeviceError
+
+# Opcode flags for the data shifting commands
+#: Write data on the falling edge of the clock
+WRITE_NEG = 0x01
+#: Shift bits instead of bytes
+BITMODE = 0x02
+#: Read data on the falling edge of the clock
+READ_NEG = 0x04
+#: Shift the least significant bit first
+LSB_FIRST = 0x08
+#: Clock data out on TDI/DO
+DO_WRITE = 0x10
+#: Clock data in from TDO/DI
+DO_READ = 0x20
+#: Clock data out on TMS/CS
+WRITE_TMS = 0x40
+
+# Other commands
+SET_BITS_LOW = 0x80
+GET_BITS_LOW = 0x81
+SET_BITS_HIGH = 0x82
+GET_BITS_HIGH = 0x83
+LOOPBACK_START = 0x84
+LOOPBACK_END = 0x85
+TCK_DIVISOR = 0x86
+SEND_IMMEDIATE = 0x87
+WAIT_ON_HIGH = 0x88
+WAIT_ON_LOW = 0x89
+DIS_DIV_5 = 0x8A
+EN_DIV_5 = 0x8B
+EN_3_PHASE = 0x8C
+DIS_3_PHASE = 0x8D
+CLK_BITS = 0x8E
+CLK_BYTES = 0x8F
+EN_ADAPTIVE = 0x96
+DIS_ADAPTIVE = 0x97
+DRIVE_ZERO = 0x9E
+#: Reply of the MPSSE to an unknown opcode, followed by the opcode
+BAD_COMMAND = 0xFA
+
+#: Largest payload of one byte shifting command
+MAX_TRANSFER = 0x10000
+
+
+class MpsseDevice(Protocol):
+    """The :class:`~ftd2xx.FTD2XX` methods :func:`enterMpsse` and
+    :class:`CommandBuffer` call, also used by the SPI, I2C and JTAG masters"""
+
+    def resetDevice(self) -> None: ...
+
+    def purge(self, mask: int = 0) -> None: ...
+
+    def setUSBParameters(self, in_tx_size: int, out_tx_size: int = 0) -> None: ...
+
+    def setChars(self, evch: int, evch_en: int, erch: int, erch_en: int) -> None: ...
+
+    def setTimeouts(self, read: int, write: int) -> None: ...
+
+    def setLatencyTimer(self, latency: int) -> None: ...
+
+    def setFlowControl(
+        self, flowcontrol: int, xon: int = -1, xoff: int = -1
+    ) -> None: ...
+
+    def setBitMode(self, mask: int, enable: int) -> None: ...
+
+    def read(self, nchars: int) -> bytes: ...
+
+    def write_all(self, data: Any) -> int: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+
+class Response:
+    """Bytes one queued operation returns, available once the
+    :class:`CommandBuffer` holding it has been flushed"""
+
+    __slots__ = ("_data", "length", "offset")
+
+    def __init__(self, offset: int, length: int):
+        self.offset = offset
+        self.length = length
+        self._data: memoryview | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._data is not None
+
+    @property
+    def view(self) -> memoryview:
+        """The returned bytes, as a view into the buffer of the whole flush"""
+        if self._data is None:
+            raise RuntimeError("CommandBuffer has not been flushed yet")
+        return self._data[self.offset : self.offset + self.length]
+
+    @property
+    def data(self) -> bytes:
+        """The returned bytes"""
+        return bytes(self.view)
+
+    @property
+    def value(self) -> int:
+        """The returned bytes as a little-endian integer, for GPIO and bit reads"""
+        return int.from_bytes(self.view, "little")
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __bytes__(self) -> bytes:
+        return self.data
+
+
+def _shiftOpcode(flags: int, lsb: bool, write_neg: bool, read_neg: bool) -> int:
+    if lsb:
+        flags |= LSB_FIRST
+    if write_neg and flags & (DO_WRITE | WRITE_TMS):
+        flags |= WRITE_NEG
+    if read_neg and flags & DO_READ:
+        flags |= READ_NEG
+    return flags
+
+
+class CommandBuffer:
+    """Buffer of MPSSE commands, sent with a single write when flushed.
+
+    Operations that return data give back a :class:`Response` handle whose
+    content is filled in by :meth:`flush`. The edge and bit order of the data
+    shifting commands default to the values given here, which match SPI mode 0:
+    data is written on the falling edge and read on the rising edge, MSB first.
+    """
+
+    def __init__(
+        self,
+        device: MpsseDevice | None = None,
+        lsb: bool = False,
+        write_neg: bool = True,
+        read_neg: bool = False,
+    ):
+        self.device = device
+        self.lsb = lsb
+        self.write_neg = write_neg
+        self.read_neg = read_neg
+        self._buffer = bytearray()
+        self._responses: list[Response] = []
+        self._expected = 0
+
+    def __len__(self) -> int:
+        """Number of command bytes waiting to be sent"""
+        return len(self._buffer)
+
+    @property
+    def expected(self) -> int:
+        """Number of bytes the queued commands will return"""
+        return self._expected
+
+    def clear(self) -> None:
+        """Drop all queued commands"""
+        self._buffer.clear()
+        self._responses = []
+        self._expected = 0
+
+    def _respond(self, length: int) -> Response:
+        response = Response(self._expected, length)
+        self._expected += length
+        self._responses.append(response)
+        return response
+
+    def raw(self, command: bytes, response_length: int = 0) -> Response | None:
+        """Queue raw command bytes that return response_length bytes"""
+        self._buffer += command
+        return self._respond(response_length) if response_length else None
+
+    def _opcode(self, flags: int, lsb, write_neg, read_neg) -> int:
+        return _shiftOpcode(
+            flags,
+            self.lsb if lsb is None else lsb,
+            self.write_neg if write_neg is None else write_neg,
+            self.read_neg if read_neg is None else read_neg,
+        )
+
+    def _shiftBytes(self, opcode: int, data, nbytes: int) -> None:
+        buffer = self._buffer
+        view = None if data is None else memoryview(data).cast("B")
+        for start in range(0, nbytes, MAX_TRANSFER):
+            length = min(MAX_TRANSFER, nbytes - start)
+            buffer += bytes((opcode, (length - 1) & 0xFF, (length - 1) >> 8))
+            if view is not None:
+                buffer += view[start : start + length]
+
+    def clockOut(self, data, lsb=None, write_neg=None) -> None:
+        """Clock bytes out, ignoring the input"""
+        nbytes = memoryview(data).nbytes
+        if nbytes:
+            opcode = self._opcode(DO_WRITE, lsb, write_neg, None)
+            self._shiftBytes(opcode, data, nbytes)
+
+    def clockIn(self, nbytes: int, lsb=None, read_neg=None) -> Response:
+        """Clock nbytes bytes in without driving the output"""
+        if nbytes:
+            self._shiftBytes(self._opcode(DO_READ, lsb, None, read_neg), None, nbytes)
+        return self._respond(nbytes)
+
+    def clockInOut(self, data, lsb=None, write_neg=None, read_neg=None) -> Response:
+        """Clock bytes out while clocking the same number of bytes in"""
+        nbytes = memoryview(data).nbytes
+        if nbytes:
+            opcode = self._opcode(DO_WRITE | DO_READ, lsb, write_neg, read_neg)
+            self._shiftBytes(opcode, data, nbytes)
+        return self._respond(nbytes)
+
+    def _checkBits(self, nbits: int) -> None:
+        if not 1 <= nbits <= 8:
+            raise ValueError("Bit transfers are 1 to 8 bits long")
+
+    def clockBitsOut(self, value: int, nbits: int, lsb=None, write_neg=None) -> None:
+        """Clock the nbits first bits of value out"""
+        self._checkBits(nbits)
+        opcode = self._opcode(DO_WRITE | BITMODE, lsb, write_neg, None)
+        self._buffer += bytes((opcode, nbits - 1, value & 0xFF))
+
+    def clockBitsIn(self, nbits: int, lsb=None, read_neg=None) -> Response:
+        """Clock nbits bits in. They are returned in one byte, shifted in from
+        the end given by lsb."""
+        self._checkBits(nbits)
+        opcode = self._opcode(DO_READ | BITMODE, lsb, None, read_neg)
+        self._buffer += bytes((opcode, nbits - 1))
+        return self._respond(1)
+
+    def clockBitsInOut(
+        self, value: int, nbits: int, lsb=None, write_neg=None, read_neg=None
+    ) -> Response:
+        """Clock nbits bits of value out while clocking nbits bits in"""
+        self._checkBits(nbits)
+        opcode = self._opcode(DO_WRITE | DO_READ | BITMODE, lsb, write_neg, read_neg)
+        self._buffer += bytes((opcode, nbits - 1, value & 0xFF))
+        return self._respond(1)
+
+    def clockTms(
+        self, bits: int, nbits: int, tdi: bool = False, read: bool = False
+    ) -> Response | None:
+        """Clock up to 7 bits out on TMS, LSB first, holding TDI at tdi. With
+        read, TDO is sampled on each clock and returned in one byte."""
+        if not 1 <= nbits <= 7:
+            raise ValueError("TMS transfers are 1 to 7 bits long")
+        flags = WRITE_TMS | LSB_FIRST | BITMODE | WRITE_NEG
+        if read:
+            flags |= DO_READ
+        value = (bits & 0x7F) | (0x80 if tdi else 0)
+        self._buffer += bytes((flags, nbits - 1, value))
+        return self._respond(1) if read else None
+
+    def clockCycles(self, ncycles: int) -> None:
+        """Toggle the clock ncycles times without transferring data"""
+        if ncycles % 8:
+            self._buffer += bytes((CLK_BITS, ncycles % 8 - 1))
+        nbytes = ncycles // 8
+        while nbytes:
+            count = min(nbytes, MAX_TRANSFER)
+            self._buffer += bytes((CLK_BYTES, (count - 1) & 0xFF, (count - 1) >> 8))
+            nbytes -= count
+
+    def setGpioLow(self, value: int, direction: int) -> None:
+        """Set the value and direction (1 for output) of ADBUS/BDBUS 0-7"""
+        self._buffer += bytes((SET_BITS_LOW, value & 0xFF, direction & 0xFF))
+
+    def setGpioHigh(self, value: int, direction: int) -> None:
+        """Set the value and direction (1 for output) of ACBUS/BCBUS 0-7"""
+        self._buffer += bytes((SET_BITS_HIGH, value & 0xFF, direction & 0xFF))
+
+    def readGpioLow(self) -> Response:
+        """Sample ADBUS/BDBUS 0-7"""
+        self._buffer.append(GET_BITS_LOW)
+        return self._respond(1)
+
+    def readGpioHigh(self) -> Response:
+        """Sample ACBUS/BCBUS 0-7"""
+        self._buffer.append(GET_BITS_HIGH)
+        return self._respond(1)
+
+    def waitOnIo(self, high: bool = True) -> None:
+        """Pause the command processor until GPIOL1 goes high (or low)"""
+        self._buffer.append(WAIT_ON_HIGH if high else WAIT_ON_LOW)
+
+    def sendImmediate(self) -> None:
+        """Have the device send the data read so far without waiting for the
+        latency timer"""
+        self._buffer.append(SEND_IMMEDIATE)
+
+    def setDivisor(self, divisor: int) -> None:
+        """Set the clock to base / ((1 + divisor) * 2), where base is 60 MHz
+        with the divide by 5 disabled, 12 MHz otherwise"""
+        self._buffer += bytes((TCK_DIVISOR, divisor & 0xFF, (divisor >> 8) & 0xFF))
+
+    def setDivideBy5(self, enable: bool) -> None:
+        self._buffer.append(EN_DIV_5 if enable else DIS_DIV_5)
+
+    def setThreePhase(self, enable: bool) -> None:
+        """Enable 3-phase data clocking, used by I2C"""
+        self._buffer.append(EN_3_PHASE if enable else DIS_3_PHASE)
+
+    def setAdaptive(self, enable: bool) -> None:
+        """Enable adaptive clocking on RTCK (GPIOL3)"""
+        self._buffer.append(EN_ADAPTIVE if enable else DIS_ADAPTIVE)
+
+    def setLoopback(self, enable: bool) -> None:
+        """Connect TDI/DO to TDO/DI internally"""
+        self._buffer.append(LOOPBACK_START if enable else LOOPBACK_END)
+
+    def setDriveZero(self, low_mask: int, high_mask: int = 0) -> None:
+        """FT232H only. Make the masked pins open drain: driven only when low"""
+        self._buffer += bytes((DRIVE_ZERO, low_mask & 0xFF, high_mask & 0xFF))
+
+    def flush(self, device: MpsseDevice | None = None) -> bytearray:
+        """Send the queued commands with a single write, then read everything
+        they return with a single sized read, and hand each response its
+        slice. Return the whole response.
+
+        Raises:
+            DeviceError: If the device returns less than expected before its
+                read timeout.
+        """
+        device = device or self.device
+        if device is None:
+            raise ValueError("No device to flush the commands to")
+        buffer, responses, expected = self._buffer, self._responses, self._expected
+        self._buffer = bytearray()
+        self._responses = []
+        self._expected = 0
+        if expected and buffer[-1] != SEND_IMMEDIATE:
+            buffer.append(SEND_IMMEDIATE)
+        if buffer:
+            device.write_all(buffer)
+        result = bytearray(expected)
+        if expected:
+            view = memoryview(result)
+            got = 0
+            while got < expected:
+                n = device.readinto(view[got:])
+                if not n:
+                    raise DeviceError(
+                        f"MPSSE read timed out after {got} of {expected} bytes"
+                    )
+                got += n
+        view = memoryview(result)
+        for response in responses:
+            response._data = view
+        return result
+
+
+def enterMpsse(
+    device: MpsseDevice,
+    latency: int = 1,
+    read_timeout: int = 5000,
+    write_timeout: int = 5000,
+) -> None:
+    """Reset device into MPSSE mode and check the command processor is in
+    sync by sending it a bad opcode.
+
+    Raises:
+        DeviceError: If the MPSSE does not answer as expected.
+    """
+    device.resetDevice()
+    device.purge()
+    device.setUSBParameters(MAX_TRANSFER, MAX_TRANSFER)
+    device.setChars(0, 0, 0, 0)
+    device.setTimeouts(read_timeout, write_timeout)
+    device.setLatencyTimer(latency)
+    device.setFlowControl(defines.FLOW_RTS_CTS, 0, 0)
+    device.setBitMode(0, defines.BITMODE_RESET)
+    device.setBitMode(0, defines.BITMODE_MPSSE)
+    # The MPSSE needs a moment after the mode change before taking commands
+    time.sleep(0.05)
+    device.write_all(bytes((0xAA, SEND_IMMEDIATE)))
+    reply = device.read(2)
+    if reply != bytes((BAD_COMMAND, 0xAA)):
+        raise DeviceError(f"MPSSE not in sync, got {reply!r}")
+
+
+__all__ = ["CommandBuffer", "MpsseDevice", "Response", "enterMpsse"]
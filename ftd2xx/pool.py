@@ -0,0 +1,350 @@
+"""
+Pool of open devices keyed by serial number, for long running processes.
+
+A handle goes stale when its adapter is cycled or replugged, and every call
+on it then fails with IO_ERROR or INVALID_HANDLE. :class:`DevicePool` keeps
+one handle per serial number open and lends it out. Before lending a handle
+it checks it with :meth:`~ftd2xx.FTD2XX.getQueueStatus`, and when a call
+fails with one of :attr:`DevicePool.reopen_errors` it reopens the device
+through the location cached by its :class:`~ftd2xx.DeviceDirectory` and
+replays the settings made through the pool. Calls in :data:`RETRIED` are then
+retried once; other calls, such as reads and writes, raise the error after the
+reopen, as part of their data may have been transferred.
+:example:
+    pool = DevicePool()
+    with pool.lease(b"FT123456") as device:
+        device.setBaudRate(115200)
+        device.write(b"Hello World!")
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from .directory import DeviceDirectory, deviceDirectory
+from .ftd2xx import FTD2XX, DeviceError, InvalidHandleError, IoError
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+#: Methods whose last call is replayed on a reopened device, in the order
+#: they were last called
+REPLAYED = frozenset(
+    (
+        "setBaudRate",
+        "setDivisor",
+        "setDataCharacteristics",
+        "setFlowControl",
+        "setChars",
+        "setTimeouts",
+        "setLatencyTimer",
+        "setBitMode",
+        "setUSBParameters",
+    )
+)
+
+#: Methods that can safely be called again on a reopened device after a
+#: failure, because calling them twice has the same effect as calling them once
+RETRIED = REPLAYED | frozenset(
+    (
+        "getQueueStatus",
+        "getStatus",
+        "getModemStatus",
+        "getLatencyTimer",
+        "getBitMode",
+        "getDeviceInfo",
+        "getDriverVersion",
+        "setDtr",
+        "clrDtr",
+        "setRts",
+        "clrRts",
+        "setBreakOn",
+        "setBreakOff",
+        "setDeadmanTimeout",
+        "setWaitMask",
+    )
+)
+
+
+class _Entry:
+    """State of the device kept for one serial number"""
+
+    __slots__ = (
+        "checked",
+        "condition",
+        "device",
+        "leased",
+        "location",
+        "reopens",
+        "serial",
+        "settings",
+    )
+
+    def __init__(self, serial: bytes):
+        self.serial = serial
+        self.location: int | None = None
+        self.device: FTD2XX | None = None
+        #: Arguments of the last call of each replayed method
+        self.settings: dict[str, tuple[tuple, dict]] = {}
+        self.condition = threading.Condition()
+        self.leased = False
+        self.checked = 0.0
+        self.reopens = 0
+
+
+class PooledDevice:
+    """A device lent by a :class:`DevicePool`.
+
+    Attributes and methods are those of the current :class:`~ftd2xx.FTD2XX`
+    handle of the device, which changes when the device is reopened. Closing
+    it gives the device back to the pool, and it cannot be used afterwards.
+    """
+
+    __slots__ = ("_entry", "_pool")
+
+    def __init__(self, pool: DevicePool, entry: _Entry):
+        self._pool = pool
+        self._entry: _Entry | None = entry
+
+    def _current(self) -> _Entry:
+        entry = self._entry
+        if entry is None:
+            raise ValueError("Device was given back to the pool")
+        return entry
+
+    @property
+    def device(self) -> FTD2XX:
+        """The current handle, opened again if the last reopen failed"""
+        entry = self._current()
+        if entry.device is None:
+            self._pool._reopen(entry)
+        return entry.device
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self.device, name)
+        if callable(value):
+            return functools.partial(self._call, name)
+        return value
+
+    def _call(self, name: str, *args, **kwargs) -> Any:
+        entry = self._current()
+        try:
+            result = getattr(self.device, name)(*args, **kwargs)
+        except self._pool.reopen_errors:
+            self._pool._reopen(entry)
+            if name not in RETRIED:
+                raise
+            result = getattr(entry.device, name)(*args, **kwargs)
+        if name in REPLAYED:
+            entry.settings.pop(name, None)
+            entry.settings[name] = (args, kwargs)
+        return result
+
+    def close(self) -> None:
+        """Give the device back to the pool. The handle stays open."""
+        entry = self._entry
+        if entry is not None:
+            self._entry = None
+            self._pool._release(entry)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Give the device back to the pool when exiting the context manager"""
+        self.close()
+
+
+class DevicePool:
+    """Open devices by serial number, lent to one user at a time"""
+
+    #: Failures after which a device is reopened
+    reopen_errors: tuple[type[DeviceError], ...] = (IoError, InvalidHandleError)
+
+    def __init__(
+        self,
+        directory: DeviceDirectory | None = None,
+        check_interval: float = 1.0,
+        attempts: int = 3,
+        retry_delay: float = 0.1,
+    ):
+        """
+        Args:
+            directory: Directory used to locate the devices. Defaults to
+                :data:`~ftd2xx.deviceDirectory`.
+            check_interval (float): Seconds after which an idle device is
+                checked again before it is lent.
+            attempts (int): Number of tries to reopen a device, as a
+                replugged adapter takes a moment to come back.
+            retry_delay (float): Seconds between the tries.
+        """
+        self.directory = deviceDirectory if directory is None else directory
+        self.check_interval = check_interval
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._entries: dict[bytes, _Entry] = {}
+
+    def _entry(self, serial: bytes) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(serial)
+            if entry is None:
+                entry = self._entries[serial] = _Entry(serial)
+            return entry
+
+    def lease(self, serial: bytes | str, timeout: float | None = None) -> PooledDevice:
+        """Lend the device with the given serial number, opening it if
+        needed. Use the result as a context manager, or close it, to give
+        the device back.
+
+        Raises:
+            TimeoutError: If the device is still lent after timeout seconds.
+            DeviceError: If the device cannot be opened.
+        """
+        if isinstance(serial, str):
+            serial = serial.encode()
+        entry = self._entry(serial)
+        with entry.condition:
+            if not entry.condition.wait_for(lambda: not entry.leased, timeout):
+                raise TimeoutError(f"Device {serial!r} is lent out")
+            entry.leased = True
+        try:
+            if entry.device is None:
+                self._open(entry)
+            elif time.monotonic() - entry.checked >= self.check_interval:
+                self._check(entry)
+        except BaseException:
+            self._release(entry)
+            raise
+        return PooledDevice(self, entry)
+
+    def _release(self, entry: _Entry) -> None:
+        with entry.condition:
+            entry.leased = False
+            entry.condition.notify()
+
+    def _open(self, entry: _Entry) -> None:
+        entry.device = self.directory.open(serial=entry.serial)
+        entry.location = self.directory.lookup(serial=entry.serial)["location"]
+        entry.checked = time.monotonic()
+
+    def _check(self, entry: _Entry) -> None:
+        try:
+            entry.device.getQueueStatus()
+        except self.reopen_errors:
+            self._reopen(entry)
+        entry.checked = time.monotonic()
+
+    def _openLocation(self, entry: _Entry) -> FTD2XX:
+        # The location survives a cycle or replug into the same port, so
+        # the cached entry is tried before enumerating by serial number
+        if entry.location is not None:
+            try:
+                device = self.directory.open(location=entry.location)
+            except DeviceError:
+                pass
+            else:
+                if device.serial == entry.serial:
+                    return device
+                device.close()
+        self.directory.invalidate()
+        device = self.directory.open(serial=entry.serial)
+        entry.location = self.directory.lookup(serial=entry.serial)["location"]
+        return device
+
+    def _reopen(self, entry: _Entry) -> None:
+        stale, entry.device = entry.device, None
+        if stale is not None:
+            try:
+                stale.close()
+            except DeviceError:
+                pass
+        for attempt in range(self.attempts):
+            try:
+                device = self._openLocation(entry)
+                break
+            except DeviceError:
+                if attempt + 1 >= self.attempts:
+                    raise
+                time.sleep(self.retry_delay)
+        try:
+            for name, (args, kwargs) in entry.settings.items():
+                getattr(device, name)(*args, **kwargs)
+        except BaseException:
+            device.close()
+            raise
+        entry.device = device
+        entry.checked = time.monotonic()
+        entry.reopens += 1
+
+    def check(self) -> None:
+        """Check the devices that are not lent out, reopening stale ones"""
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            with entry.condition:
+                if entry.leased or entry.device is None:
+                    continue
+                entry.leased = True
+            try:
+                self._check(entry)
+            except DeviceError:
+                pass
+            finally:
+                self._release(entry)
+
+    def stats(self) -> dict[bytes, dict[str, Any]]:
+        """Return the state of each device of the pool as plain values"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            entry.serial: {
+                "open": entry.device is not None,
+                "leased": entry.leased,
+                "location": entry.location,
+                "reopens": entry.reopens,
+                "settings": list(entry.settings),
+            }
+            for entry in entries
+        }
+
+    def close(self) -> None:
+        """Close the devices that are not lent out and forget them"""
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            with entry.condition:
+                if entry.leased:
+                    continue
+                device, entry.device = entry.device, None
+                with self._lock:
+                    self._entries.pop(entry.serial, None)
+            if device is not None:
+                try:
+                    device.close()
+                except DeviceError:
+                    pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the idle devices when exiting the context manager"""
+        self.close()
+
+
+__all__ = ["REPLAYED", "RETRIED", "DevicePool", "PooledDevice"]
@@ -0,0 +1,848 @@
+"""
+In-process simulation of the D2XX driver.
+
+This module is a backend for :func:`ftd2xx.setBackend`: it has the ``FT_*``
+functions and ctypes types of the platform modules, takes the same arguments,
+and serves them from :class:`SimDevice` objects instead of USB hardware. The
+devices model the receive queue, read timeouts, the latency timer, bit-bang
+modes, the EEPROM and the modem lines, with an optional USB bandwidth and
+per-transfer latency, so that code built on :class:`ftd2xx.FTD2XX` can be
+tested and benchmarked without hardware. Setting the FTD2XX_BACKEND
+environment variable to ``sim`` selects it on import.
+:example:
+    ftd2xx.setBackend("sim")
+    sim.addDevice(sim.SimDevice(b"SIM00002", bandwidth=40e6))
+    with ftd2xx.openEx(b"SIM00002") as device:
+        device.write(b"ping")
+        assert device.read(4) == b"ping"
+"""
+
+from __future__ import annotations
+
+import collections
+import ctypes as c
+import functools
+import itertools
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+from . import defines
+from .ftd2xx import DeviceError, _native
+
+# Types shared with the native backend, so that structures built by either
+# can be passed to the other
+DWORD = _native.DWORD
+ULONG = _native.ULONG
+USHORT = _native.USHORT
+UCHAR = _native.UCHAR
+WORD = _native.WORD
+LONG = _native.LONG
+HANDLE = _native.HANDLE
+STRING = _native.STRING
+FT_HANDLE = _native.FT_HANDLE
+FT_STATUS = _native.FT_STATUS
+ft_program_data = _native.ft_program_data
+FT_DEVICE_LIST_INFO_NODE = _native.FT_DEVICE_LIST_INFO_NODE
+if sys.platform != "win32":
+    EVENT_HANDLE = _native.EVENT_HANDLE
+    _libc = c.CDLL(None)
+
+#: Version reported by FT_GetLibraryVersion and FT_GetDriverVersion
+VERSION = 0x00010448
+
+_FLAG_OPENED = 1
+_FLAG_HIGH_SPEED = 2
+_HIGH_SPEED = (defines.DEVICE_2232H, defines.DEVICE_4232H, defines.DEVICE_232H)
+
+_MPSSE_BAD_COMMAND = 0xFA
+
+
+_numbers = itertools.count(1)
+
+
+class SimDevice:
+    """A simulated FTDI device or channel, numbered SIM00001, SIM00002... and
+    given a location unless a serial number or location is given.
+
+    With ``loopback``, data written in UART and FIFO modes comes back on the
+    receive side and RTS/DTR drive CTS/DSR/DCD, as with a loopback plug.
+    Otherwise written data is appended to :attr:`transmitted` and data to
+    receive is given with :meth:`feed`. Received data is only readable once
+    a USB packet is full or the latency timer expires, and each write takes
+    ``usb_latency`` seconds plus its size over ``bandwidth`` bytes per second.
+    A write longer than ``tx_capacity`` bytes is cut short once the write
+    timeout expires, as when flow control holds the transmit side up.
+    """
+
+    def __init__(
+        self,
+        serial: bytes | None = None,
+        description: bytes = b"Simulated FT232H",
+        type: int = defines.DEVICE_232H,
+        id: int = 0x04036014,
+        location: int | None = None,
+        loopback: bool = True,
+        bandwidth: float | None = None,
+        usb_latency: float = 0.0,
+        packet_size: int = 512,
+        user_area_size: int = 128,
+        tx_capacity: int | None = None,
+    ):
+        number = next(_numbers)
+        if serial is None:
+            serial = b"SIM%05d" % number
+        self.serial = serial
+        self.description = description
+        self.type = type
+        self.id = id
+        self.location = 0x10 + number if location is None else location
+        self.loopback = loopback
+        self.bandwidth = bandwidth
+        self.usb_latency = usb_latency
+        self.packet_size = packet_size
+        #: Most bytes a single write accepts, None for no limit
+        self.tx_capacity = tx_capacity
+        #: Bytes FT_GetStatus reports waiting in the transmit queue
+        self.tx_queue = 0
+        #: Level of the bit-bang pins that are not outputs
+        self.inputs = 0
+        #: Data written while not in loopback
+        self.transmitted = bytearray()
+        #: Replaces the mode-specific handling of written data: called with
+        #: the data, returns the data to receive
+        self.handler: Callable[[bytes], bytes] | None = None
+        self.eeprom: dict[str, Any] = {
+            "VendorId": id >> 16,
+            "ProductId": id & 0xFFFF,
+            "Manufacturer": b"FTDI",
+            "ManufacturerId": b"FT",
+            "Description": description,
+            "SerialNumber": serial,
+            "MaxPower": 90,
+        }
+        self.user_area = bytearray(user_area_size)
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.handle: int | None = None
+        self.unplugged = False
+        self._cond = threading.Condition()
+        self._rx = bytearray()
+        self._pending: collections.deque[tuple[float, bytes]] = collections.deque()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.baudrate = 9600
+        self.divisor = 0
+        self.data_characteristics = (defines.BITS_8, defines.STOP_BITS_1, 0)
+        self.flow_control = (defines.FLOW_NONE, 0x11, 0x13)
+        self.chars = (0, 0, 0, 0)
+        self.dtr = self.rts = False
+        self.break_on = False
+        self.read_timeout = self.write_timeout = 0
+        self.deadman_timeout = 5000
+        self.latency_timer = 16
+        self.bitmask = self.bitmode = 0
+        self.outputs = 0
+        self.in_transfer_size = self.out_transfer_size = 4096
+        self.retry_count = 50
+        self.modem_lines = 0
+        self.line_status = 0
+        self.events = 0
+        self.notification: tuple[int, int] | None = None
+        self.wait_mask = 0
+        self.in_task = True
+        self._rx.clear()
+        self._pending.clear()
+
+    @property
+    def modem_status(self) -> int:
+        """Modem status byte and line status byte, as FT_GetModemStatus"""
+        lines = self.modem_lines
+        if self.loopback:
+            lines = (defines.ModemStatus.CTS if self.rts else 0) | (
+                defines.ModemStatus.DSR | defines.ModemStatus.DCD if self.dtr else 0
+            )
+        return int(lines) | self.line_status << 8
+
+    @property
+    def pins(self) -> int:
+        """Current level of the bit-bang pins"""
+        return (self.outputs & self.bitmask) | (self.inputs & ~self.bitmask & 0xFF)
+
+    def feed(self, data: bytes, delay: float = 0.0) -> None:
+        """Make data arrive on the receive side after delay seconds, from the
+        far end"""
+        self._arrive(bytes(data), time.monotonic() + delay)
+
+    def setModemLines(self, lines: int) -> None:
+        """Set the modem lines seen when not in loopback"""
+        with self._cond:
+            self.modem_lines = lines
+        self._event(defines.EVENT_MODEM_STATUS, 0.0)
+
+    def setNotification(self, mask: int, handle: int) -> None:
+        """Signal the event handle on the events in mask, including for data
+        already on its way"""
+        with self._cond:
+            self.notification = (mask, handle)
+            now = time.monotonic()
+            due = [when - now for when, _ in self._pending]
+        for delay in due:
+            self._event(defines.EVENT_RXCHAR, delay)
+
+    def _arrive(self, data: bytes, when: float) -> None:
+        if not data:
+            return
+        if len(data) < self.packet_size:
+            when += self.latency_timer / 1000
+        with self._cond:
+            self._pending.append((when, data))
+        self._event(defines.EVENT_RXCHAR, when - time.monotonic())
+
+    def _event(self, event: int, delay: float) -> None:
+        # Wake waiters, and signal the notification handle once the event is
+        # due. Never called with the condition held, as the waiter behind the
+        # handle takes its own lock before querying the device.
+        with self._cond:
+            if event != defines.EVENT_RXCHAR:
+                # Received data only counts as an event once it has arrived
+                self.events |= event
+            self._cond.notify_all()
+        if self.notification is None or not self.notification[0] & event:
+            return
+        if delay > 0:
+            timer = threading.Timer(delay, self._signal)
+            timer.daemon = True
+            timer.start()
+        else:
+            self._signal()
+
+    def _signal(self) -> None:
+        if self.notification is None:
+            return
+        handle = self.notification[1]
+        if sys.platform == "win32":
+            c.windll.kernel32.SetEvent(c.c_void_p(handle))
+        else:
+            event = EVENT_HANDLE.from_address(handle)
+            _libc.pthread_mutex_lock(c.byref(event.eMutex))
+            _libc.pthread_cond_signal(c.byref(event.eCondVar))
+            _libc.pthread_mutex_unlock(c.byref(event.eMutex))
+
+    def _promote(self, now: float) -> float | None:
+        # Move arrived data to the receive queue, called with the condition
+        # held. Return when the next pending data arrives.
+        pending = self._pending
+        while pending and pending[0][0] <= now:
+            self._rx += pending.popleft()[1]
+            self.events |= defines.EVENT_RXCHAR
+        return pending[0][0] if pending else None
+
+    def queueStatus(self) -> int:
+        with self._cond:
+            self._promote(time.monotonic())
+            return len(self._rx)
+
+    def read(self, address: int, nbytes: int) -> int:
+        """Read up to nbytes to address, waiting for the read timeout"""
+        timeout = self.read_timeout / 1000
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                following = self._promote(now)
+                if len(self._rx) >= nbytes:
+                    break
+                if deadline is not None and now >= deadline:
+                    break
+                wait = None if deadline is None else deadline - now
+                if following is not None:
+                    wait = (
+                        following - now if wait is None else min(wait, following - now)
+                    )
+                self._cond.wait(wait)
+            got = min(nbytes, len(self._rx))
+            if got:
+                source = (c.c_char * got).from_buffer(self._rx)
+                c.memmove(address, source, got)
+                del source
+                del self._rx[:got]
+        self.bytes_read += got
+        return got
+
+    def write(self, data: bytes) -> int:
+        """Write data, taking the time the USB transfer would. Return the
+        number of bytes accepted."""
+        capacity = self.tx_capacity
+        if capacity is not None and len(data) > capacity:
+            # The driver waits for room until the write timeout
+            data = data[:capacity]
+            time.sleep(self.write_timeout / 1000)
+            if not data:
+                return 0
+        duration = self.usb_latency
+        if self.bandwidth:
+            duration += len(data) / self.bandwidth
+        if duration:
+            time.sleep(duration)
+        self.bytes_written += len(data)
+        reply = self._process(data)
+        if reply:
+            self._arrive(reply, time.monotonic() + self.usb_latency)
+        return len(data)
+
+    def _process(self, data: bytes) -> bytes:
+        if self.handler is not None:
+            return self.handler(data)
+        mode = self.bitmode
+        if mode == defines.BITMODE_SYNC_BITBANG:
+            # Each byte written returns the pins sampled before it is applied
+            mask = self.bitmask
+            inputs = self.inputs & ~mask
+            table = bytes((b & mask) | inputs for b in range(256))
+            samples = bytes((self.pins,)) + data[:-1].translate(table)
+            self.outputs = data[-1]
+            return samples
+        if mode == defines.BITMODE_ASYNC_BITBANG:
+            self.outputs = data[-1]
+            return b""
+        if mode == defines.BITMODE_MPSSE:
+            # Only the synchronisation check: bad opcodes are echoed back
+            return b"".join(
+                bytes((_MPSSE_BAD_COMMAND, b)) for b in data if b in (0xAA, 0xAB)
+            )
+        if self.loopback:
+            return data
+        self.transmitted += data
+        return b""
+
+    def purge(self, mask: int) -> None:
+        if mask & defines.PURGE_RX:
+            with self._cond:
+                self._rx.clear()
+                self._pending.clear()
+
+    def waitEvents(self, mask: int) -> int:
+        with self._cond:
+            while True:
+                following = self._promote(time.monotonic())
+                if self.events & mask:
+                    events = self.events & mask
+                    self.events &= ~mask
+                    return events
+                wait = None if following is None else following - time.monotonic()
+                self._cond.wait(wait)
+
+    def __repr__(self) -> str:
+        return f"SimDevice({self.serial!r}, {self.description!r})"
+
+
+_lock = threading.RLock()
+_devices: list[SimDevice] = []
+# Devices as of the last FT_CreateDeviceInfoList
+_listed: list[SimDevice] = []
+_handles: dict[int, SimDevice] = {}
+_handleValues = itertools.count(0x5100, 0x10)
+
+
+def addDevice(device: SimDevice | None = None, **kwargs: Any) -> SimDevice:
+    """Plug device, or a new SimDevice made with kwargs, and return it"""
+    if device is None:
+        device = SimDevice(**kwargs)
+    with _lock:
+        device.unplugged = False
+        _devices.append(device)
+    return device
+
+
+def removeDevice(device: SimDevice) -> None:
+    """Unplug device. Calls on handles still open to it fail with IO_ERROR."""
+    with _lock:
+        _devices.remove(device)
+        device.unplugged = True
+
+
+def devices() -> list[SimDevice]:
+    """Return the plugged devices"""
+    return list(_devices)
+
+
+def reset(default: bool = True) -> None:
+    """Unplug every device, invalidating open handles, and plug in a fresh
+    default device unless default is False"""
+    with _lock:
+        for device in _devices:
+            device.unplugged = True
+        _devices.clear()
+        _listed.clear()
+        _handles.clear()
+    if default:
+        addDevice()
+
+
+# Argument decoding. The functions accept what ftd2xx.py passes to the native
+# functions: Python ints and bytes, ctypes instances and byref() of them.
+
+
+def _int(value: Any) -> int:
+    return value if isinstance(value, int) else value.value
+
+
+def _address(buffer: Any) -> int:
+    if isinstance(buffer, int):
+        return buffer
+    if isinstance(buffer, bytes):
+        buffer = c.c_char_p(buffer)
+    if isinstance(buffer, c.c_char_p):
+        return c.cast(buffer, c.c_void_p).value
+    return c.addressof(getattr(buffer, "_obj", buffer))
+
+
+def _store(ref: Any, value: int) -> None:
+    if ref is not None:
+        getattr(ref, "_obj", ref).value = value
+
+
+def _storeHandle(ref: Any, value: int) -> None:
+    c.c_void_p.from_address(_address(ref)).value = value
+
+
+def _handleValue(handle: Any) -> int:
+    if handle is None or isinstance(handle, int):
+        return handle or 0
+    return c.c_void_p.from_address(c.addressof(handle)).value or 0
+
+
+def _copyString(address: int, value: bytes) -> None:
+    if address:
+        c.memmove(address, value + b"\0", len(value) + 1)
+
+
+def _device(handle: Any) -> SimDevice:
+    device = _handles.get(_handleValue(handle))
+    if device is None:
+        raise DeviceError(defines.INVALID_HANDLE)
+    if device.unplugged:
+        raise DeviceError(defines.IO_ERROR)
+    return device
+
+
+def _status(function: Callable[..., Any]) -> Callable[..., int]:
+    """Return OK once function returns. Failures raise DeviceError, as the
+    native functions do through errcheck."""
+
+    @functools.wraps(function)
+    def wrapper(*args: Any) -> int:
+        function(*args)
+        return defines.OK
+
+    return wrapper
+
+
+def _flags(device: SimDevice) -> int:
+    flags = _FLAG_OPENED if device.handle is not None else 0
+    return flags | (_FLAG_HIGH_SPEED if device.type in _HIGH_SPEED else 0)
+
+
+def _open(device: SimDevice | None, ref: Any) -> None:
+    if device is None:
+        raise DeviceError(defines.DEVICE_NOT_FOUND)
+    with _lock:
+        if device.handle is not None:
+            raise DeviceError(defines.DEVICE_NOT_OPENED)
+        device.handle = next(_handleValues)
+        device._reset()
+        _handles[device.handle] = device
+    _storeHandle(ref, device.handle)
+
+
+# Enumeration and opening
+
+
+@_status
+def FT_CreateDeviceInfoList(count):
+    with _lock:
+        _listed[:] = _devices
+    _store(count, len(_listed))
+
+
+@_status
+def FT_GetDeviceInfoDetail(
+    index, flags, type, id, location, serial, description, handle
+):
+    index = _int(index)
+    if not 0 <= index < len(_listed):
+        raise DeviceError(defines.DEVICE_NOT_FOUND)
+    device = _listed[index]
+    _store(flags, _flags(device))
+    _store(type, device.type)
+    _store(id, device.id)
+    _store(location, device.location)
+    _copyString(_address(serial), device.serial)
+    _copyString(_address(description), device.description)
+    _storeHandle(handle, device.handle or 0)
+
+
+@_status
+def FT_GetDeviceInfoList(nodes, count):
+    listed = _listed[: _int(getattr(count, "_obj", count))]
+    for node, device in zip(nodes, listed):
+        node.Flags = _flags(device)
+        node.Type = device.type
+        node.ID = device.id
+        node.LocId = device.location
+        node.SerialNumber = device.serial[:15]
+        node.Description = device.description[:63]
+        _storeHandle(
+            c.addressof(node) + FT_DEVICE_LIST_INFO_NODE.ftHandle.offset,
+            device.handle or 0,
+        )
+    _store(count, len(listed))
+
+
+def _listValue(device: SimDevice, flags: int) -> bytes:
+    if flags & defines.OPEN_BY_DESCRIPTION:
+        return device.description
+    if flags & 4:  # OPEN_BY_LOCATION
+        return device.location.to_bytes(4, "little")
+    return device.serial
+
+
+@_status
+def FT_ListDevices(arg1, arg2, flags):
+    flags = _int(flags)
+    devices = list(_devices)
+    if flags & defines.LIST_NUMBER_ONLY:
+        _store(arg1, len(devices))
+    elif flags & defines.LIST_BY_INDEX:
+        index = _int(arg1)
+        if not 0 <= index < len(devices):
+            raise DeviceError(defines.DEVICE_NOT_FOUND)
+        _copyString(_address(arg2), _listValue(devices[index], flags))
+    elif flags & defines.LIST_ALL:
+        pointers = c.cast(arg1, c.POINTER(c.c_void_p))
+        for i, device in enumerate(devices):
+            _copyString(pointers[i], _listValue(device, flags))
+        _store(arg2, len(devices))
+    else:
+        raise DeviceError(defines.INVALID_PARAMETER)
+
+
+@_status
+def FT_Open(index, handle):
+    index = _int(index)
+    devices = list(_devices)
+    _open(devices[index] if 0 <= index < len(devices) else None, handle)
+
+
+@_status
+def FT_OpenEx(arg, flags, handle):
+    flags = _int(flags)
+    if flags & 4:  # OPEN_BY_LOCATION
+        location = _int(arg)
+        match = [d for d in _devices if d.location == location]
+    else:
+        name = arg if isinstance(arg, bytes) else c.string_at(_address(arg))
+        key = "description" if flags & defines.OPEN_BY_DESCRIPTION else "serial"
+        match = [d for d in _devices if getattr(d, key) == name]
+    _open(match[0] if match else None, handle)
+
+
+@_status
+def FT_Close(handle):
+    device = _handles.pop(_handleValue(handle), None)
+    if device is None:
+        raise DeviceError(defines.INVALID_HANDLE)
+    device.handle = None
+    device.notification = None
+
+
+@_status
+def FT_GetLibraryVersion(version):
+    _store(version, VERSION)
+
+
+@_status
+def FT_GetVIDPID(vid, pid):
+    _store(vid, 0x0403)
+    _store(pid, 0x6014)
+
+
+@_status
+def FT_SetVIDPID(vid, pid):
+    pass
+
+
+# Data transfer
+
+
+@_status
+def FT_Read(handle, buffer, nbytes, read):
+    _store(read, _device(handle).read(_address(buffer), _int(nbytes)))
+
+
+@_status
+def FT_Write(handle, data, nbytes, written):
+    device = _device(handle)
+    nbytes = _int(nbytes)
+    if not isinstance(data, bytes):
+        data = c.string_at(_address(data), nbytes)
+    _store(written, device.write(data[:nbytes]))
+
+
+@_status
+def FT_GetQueueStatus(handle, count):
+    _store(count, _device(handle).queueStatus())
+
+
+@_status
+def FT_GetStatus(handle, rx, tx, events):
+    device = _device(handle)
+    _store(rx, device.queueStatus())
+    _store(tx, device.tx_queue)
+    with device._cond:
+        _store(events, device.events)
+        device.events = 0
+
+
+@_status
+def FT_GetEventStatus(handle, events):
+    device = _device(handle)
+    with device._cond:
+        device._promote(time.monotonic())
+        _store(events, device.events)
+        device.events = 0
+
+
+@_status
+def FT_Purge(handle, mask):
+    _device(handle).purge(_int(mask))
+
+
+@_status
+def FT_ResetDevice(handle):
+    device = _device(handle)
+    device.purge(defines.PURGE_RX | defines.PURGE_TX)
+    device.bitmask = device.bitmode = 0
+
+
+@_status
+def FT_SetEventNotification(handle, mask, event):
+    _device(handle).setNotification(_int(mask), _handleValue(event))
+
+
+@_status
+def FT_SetWaitMask(handle, mask):
+    _device(handle).wait_mask = _int(mask)
+
+
+@_status
+def FT_WaitOnMask(handle, mask):
+    device = _device(handle)
+    _store(mask, device.waitEvents(device.wait_mask))
+
+
+# Configuration
+
+
+def _setter(*names: str) -> Callable[..., int]:
+    @_status
+    def setter(handle, *args):
+        device = _device(handle)
+        values = tuple(_int(arg) for arg in args)
+        for name, value in zip(names, values):
+            setattr(device, name, value)
+
+    return setter
+
+
+FT_SetBaudRate = _setter("baudrate")
+FT_SetDivisor = _setter("divisor")
+FT_SetDeadmanTimeout = _setter("deadman_timeout")
+FT_SetResetPipeRetryCount = _setter("retry_count")
+FT_SetTimeouts = _setter("read_timeout", "write_timeout")
+FT_SetLatencyTimer = _setter("latency_timer")
+FT_SetUSBParameters = _setter("in_transfer_size", "out_transfer_size")
+
+
+@_status
+def FT_SetDataCharacteristics(handle, wordlen, stopbits, parity):
+    device = _device(handle)
+    device.data_characteristics = (_int(wordlen), _int(stopbits), _int(parity))
+
+
+@_status
+def FT_SetFlowControl(handle, flowcontrol, xon, xoff):
+    _device(handle).flow_control = (_int(flowcontrol), _int(xon), _int(xoff))
+
+
+@_status
+def FT_SetChars(handle, evch, evch_en, erch, erch_en):
+    chars = (_int(evch), _int(evch_en), _int(erch), _int(erch_en))
+    _device(handle).chars = chars
+
+
+def _line(name: str, value: bool) -> Callable[..., int]:
+    @_status
+    def line(handle):
+        device = _device(handle)
+        setattr(device, name, value)
+        if device.loopback:
+            device._event(defines.EVENT_MODEM_STATUS, 0.0)
+
+    return line
+
+
+FT_SetDtr = _line("dtr", True)
+FT_ClrDtr = _line("dtr", False)
+FT_SetRts = _line("rts", True)
+FT_ClrRts = _line("rts", False)
+FT_SetBreakOn = _line("break_on", True)
+FT_SetBreakOff = _line("break_on", False)
+
+
+@_status
+def FT_GetModemStatus(handle, status):
+    _store(status, _device(handle).modem_status)
+
+
+@_status
+def FT_SetBitMode(handle, mask, mode):
+    device = _device(handle)
+    device.bitmask = _int(mask)
+    device.bitmode = _int(mode)
+
+
+@_status
+def FT_GetBitMode(handle, pins):
+    _store(pins, _device(handle).pins)
+
+
+@_status
+def FT_GetLatencyTimer(handle, latency):
+    _store(latency, _device(handle).latency_timer)
+
+
+@_status
+def FT_GetDeviceInfo(handle, type, id, serial, description, dummy):
+    device = _device(handle)
+    _store(type, device.type)
+    _store(id, device.id)
+    _copyString(_address(serial), device.serial)
+    _copyString(_address(description), device.description)
+
+
+@_status
+def FT_GetDriverVersion(handle, version):
+    _device(handle)
+    _store(version, VERSION)
+
+
+@_status
+def FT_GetComPortNumber(handle, port):
+    _device(handle)
+    _store(port, -1)
+
+
+@_status
+def FT_StopInTask(handle):
+    _device(handle).in_task = False
+
+
+@_status
+def FT_RestartInTask(handle):
+    _device(handle).in_task = True
+
+
+@_status
+def FT_ResetPort(handle):
+    _device(handle)
+
+
+@_status
+def FT_CyclePort(handle):
+    _device(handle)
+
+
+# EEPROM
+
+
+def _stringFields(data: Any):
+    for name, ctype in data._fields_:
+        if ctype is STRING:
+            yield name, getattr(type(data), name).offset
+
+
+@_status
+def FT_EE_Program(handle, data):
+    device = _device(handle)
+    data = getattr(data, "_obj", data)
+    strings = dict(_stringFields(data))
+    for name, _ in data._fields_:
+        if name.startswith("Signature") or name == "Version":
+            continue
+        value = getattr(data, name)
+        if name in strings and value is None:
+            continue
+        device.eeprom[name] = value
+    if not device.eeprom.get("SerialNumber"):
+        device.eeprom["SerialNumber"] = device.eeprom["ManufacturerId"] + b"000001"
+    device.serial = device.eeprom["SerialNumber"]
+    device.description = device.eeprom["Description"]
+
+
+@_status
+def FT_EE_Read(handle, data):
+    device = _device(handle)
+    data = getattr(data, "_obj", data)
+    strings = dict(_stringFields(data))
+    for name, _ in data._fields_:
+        if name not in device.eeprom:
+            continue
+        value = device.eeprom[name]
+        if name in strings:
+            pointer = c.c_void_p.from_address(c.addressof(data) + strings[name])
+            _copyString(pointer.value, value)
+        else:
+            setattr(data, name, value)
+
+
+@_status
+def FT_EE_UASize(handle, size):
+    _store(size, len(_device(handle).user_area))
+
+
+@_status
+def FT_EE_UAWrite(handle, buffer, nbytes):
+    device = _device(handle)
+    nbytes = _int(nbytes)
+    if nbytes > len(device.user_area):
+        raise DeviceError(defines.INVALID_PARAMETER)
+    device.user_area[:nbytes] = c.string_at(_address(buffer), nbytes)
+
+
+@_status
+def FT_EE_UARead(handle, buffer, nbytes, read):
+    device = _device(handle)
+    nbytes = min(_int(nbytes), len(device.user_area))
+    c.memmove(_address(buffer), bytes(device.user_area[:nbytes]), nbytes)
+    _store(read, nbytes)
+
+
+def __getattr__(name: str) -> Callable[..., int]:
+    # Any other driver function is reported as unsupported
+    if not name.startswith("FT_"):
+        raise AttributeError(name)
+
+    def unsupported(*args: Any) -> int:
+        raise DeviceError(defines.NOT_SUPPORTED)
+
+    unsupported.__name__ = name
+    return unsupported
+
+
+addDevice()
+
+__all__ = ["SimDevice", "addDevice", "devices", "removeDevice", "reset"]
@@ -0,0 +1,188 @@
+"""
+SPI master on the MPSSE of FT2232H, FT4232H and FT232H devices.
+
+Transactions are queued into one MPSSE command stream, chip select toggles
+included, and many of them are sent with a single write and read. The pins
+are ADBUS0 SCK, ADBUS1 MOSI, ADBUS2 MISO and ADBUS3 onwards chip selects.
+:example:
+    spi = SpiController(device, frequency=30e6)
+    ids = [spi.queue(b"\\x9f", 3, cs=cs) for cs in range(2)]
+    spi.flush()
+    print([t.data for t in ids])
+"""
+
+from __future__ import annotations
+
+import math
+
+from .mpsse import MAX_TRANSFER, CommandBuffer, MpsseDevice, Response, enterMpsse
+
+#: MPSSE clock with the divide by 5 disabled
+BASE_CLOCK = 60_000_000
+#: Fastest SPI clock of the high speed devices
+MAX_FREQUENCY = BASE_CLOCK // 2
+
+SCK = 0x01
+MOSI = 0x02
+MISO = 0x04
+#: First chip select pin, the next ones follow on ADBUS4 to ADBUS7
+CS0 = 0x08
+
+# Data output and input edges for each SPI mode, as (write_neg, read_neg)
+_EDGES = {0: (True, False), 1: (False, True), 2: (False, True), 3: (True, False)}
+
+
+def clockDivisor(frequency: float, base: int = BASE_CLOCK) -> tuple[int, float]:
+    """Return the MPSSE divisor giving the fastest clock not above frequency,
+    and the resulting clock frequency"""
+    divisor = max(0, math.ceil(base / (2 * frequency)) - 1)
+    if divisor > 0xFFFF:
+        raise ValueError(f"Frequency {frequency} Hz is too low")
+    return divisor, base / ((1 + divisor) * 2)
+
+
+class SpiTransfer:
+    """Data read by one queued transaction, available after the flush"""
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, parts: list[Response]):
+        self._parts = parts
+
+    @property
+    def ready(self) -> bool:
+        return all(part.ready for part in self._parts)
+
+    @property
+    def data(self) -> bytes:
+        if len(self._parts) == 1:
+            return self._parts[0].data
+        return b"".join(part.view for part in self._parts)
+
+    def __len__(self) -> int:
+        return sum(part.length for part in self._parts)
+
+    def __bytes__(self) -> bytes:
+        return self.data
+
+
+class SpiController:
+    """SPI master pipelining transactions over an MPSSE device.
+
+    Queued transactions are only sent by :meth:`flush`, which :meth:`write`,
+    :meth:`read` and :meth:`exchange` call, or when the data they are
+    expected to return exceeds ``max_read`` bytes, which keeps the reply
+    within the driver buffers. Chip select stays asserted across such
+    intermediate flushes.
+    """
+
+    def __init__(
+        self,
+        device: MpsseDevice,
+        frequency: float = 1e6,
+        mode: int = 0,
+        cs_count: int = 1,
+        max_read: int = MAX_TRANSFER,
+        init: bool = True,
+    ):
+        """Configure device as an SPI master.
+
+        Args:
+            device (FTD2XX): An open MPSSE capable device.
+            frequency (float): Highest acceptable SCK frequency in Hz.
+            mode (int): SPI mode 0 to 3.
+            cs_count (int): Number of chip select pins, 1 to 5.
+            max_read (int): Largest reply to collect in one flush.
+            init (bool): Set False if the device is already in MPSSE mode.
+        """
+        if mode not in _EDGES:
+            raise ValueError("SPI mode must be 0, 1, 2 or 3")
+        if not 1 <= cs_count <= 5:
+            raise ValueError("cs_count must be 1 to 5")
+        self.device = device
+        self.mode = mode
+        self.max_read = max_read
+        self._divisor, self.frequency = clockDivisor(min(frequency, MAX_FREQUENCY))
+        self._cs = [CS0 << i for i in range(cs_count)]
+        self._direction = SCK | MOSI | sum(self._cs)
+        # Idle with SCK at CPOL and every chip select high
+        self._idle = sum(self._cs) | (SCK if mode & 2 else 0)
+        write_neg, read_neg = _EDGES[mode]
+        self._cmd = CommandBuffer(device, write_neg=write_neg, read_neg=read_neg)
+        if init:
+            enterMpsse(device)
+        cmd = self._cmd
+        cmd.setDivideBy5(False)
+        cmd.setThreePhase(False)
+        cmd.setAdaptive(False)
+        cmd.setLoopback(False)
+        cmd.setDivisor(self._divisor)
+        cmd.setGpioLow(self._idle, self._direction)
+        cmd.flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of command bytes waiting to be sent"""
+        return len(self._cmd)
+
+    def _read(self, nbytes: int, data=None) -> list[Response]:
+        cmd = self._cmd
+        view = None if data is None else memoryview(data).cast("B")
+        parts = []
+        start = 0
+        while start < nbytes:
+            if cmd.expected >= self.max_read:
+                cmd.flush()
+            length = min(nbytes - start, self.max_read - cmd.expected)
+            if view is None:
+                parts.append(cmd.clockIn(length))
+            else:
+                parts.append(cmd.clockInOut(view[start : start + length]))
+            start += length
+        return parts
+
+    def queue(
+        self, out=b"", read_len: int = 0, cs: int = 0, duplex: bool = False
+    ) -> SpiTransfer:
+        """Queue a transaction on chip select cs: clock out, then clock
+        read_len bytes in. With duplex, read as many bytes as are written,
+        while writing.
+
+        Returns:
+            A handle whose data is filled in once the transaction is flushed.
+        """
+        cmd = self._cmd
+        cmd.setGpioLow(self._idle & ~self._cs[cs], self._direction)
+        if duplex:
+            parts = self._read(memoryview(out).nbytes, out)
+        else:
+            cmd.clockOut(out)
+            parts = self._read(read_len)
+        cmd.setGpioLow(self._idle, self._direction)
+        return SpiTransfer(parts)
+
+    def flush(self) -> None:
+        """Send every queued transaction with one write and one read"""
+        self._cmd.flush()
+
+    def exchange(
+        self, out=b"", read_len: int = 0, cs: int = 0, duplex: bool = False
+    ) -> bytes:
+        """Run one transaction now, along with any queued ones, and return
+        the bytes read"""
+        transfer = self.queue(out, read_len, cs, duplex)
+        self.flush()
+        return transfer.data
+
+    def write(self, out, cs: int = 0) -> None:
+        """Run a write-only transaction now, along with any queued ones. Use
+        :meth:`queue` with no read to batch writes instead."""
+        self.queue(out, 0, cs)
+        self.flush()
+
+    def read(self, nbytes: int, cs: int = 0) -> bytes:
+        """Run a read-only transaction now and return the bytes read"""
+        return self.exchange(b"", nbytes, cs)
+
+
+__all__ = ["SpiController", "SpiTransfer", "clockDivisor"]
@@ -0,0 +1,204 @@
+"""
+Background reception of data from an FTDI device.
+
+:class:`StreamReader` runs a thread that keeps draining the device into a
+preallocated ring buffer, so the in-driver buffers do not overflow while the
+consumer is busy.
+:example:
+    with StreamReader(device) as stream:
+        data = stream.read(64, timeout=1.0)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class _Device(Protocol):
+    """What the reader thread calls on an :class:`~ftd2xx.FTD2XX`"""
+
+    def setTimeouts(self, read: int, write: int) -> None: ...
+
+    def getQueueStatus(self) -> int: ...
+
+    def readinto(self, buffer: Any) -> int: ...
+
+
+class StreamReader:
+    """Read an FTD2XX device from a dedicated thread into a ring buffer.
+
+    The reader thread asks the driver for everything it has queued, blocking
+    for at most ``read_timeout`` milliseconds when nothing is pending, and
+    copies it straight into the ring with :meth:`FTD2XX.readinto`. When the
+    ring is full, data is still drained from the device but discarded, and
+    counted in :attr:`overflows` and :attr:`dropped`.
+    """
+
+    def __init__(
+        self,
+        device: _Device,
+        size: int = 1 << 20,
+        chunk_size: int = 1 << 16,
+        read_timeout: int = 10,
+        write_timeout: int = 0,
+    ):
+        """Create a reader for device. Call :meth:`start` or use it as a
+        context manager to start the thread.
+
+        Args:
+            device (FTD2XX): An open device.
+            size (int): Capacity of the ring buffer in bytes.
+            chunk_size (int): Largest single read from the driver.
+            read_timeout (int): Device read timeout in milliseconds, set on start.
+            write_timeout (int): Device write timeout in milliseconds, set on start.
+        """
+        self.device = device
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self._size = size
+        self._chunk_size = min(chunk_size, size)
+        self._ring = bytearray(size)
+        self._view = memoryview(self._ring)
+        self._scratch = memoryview(bytearray(self._chunk_size))
+        # _head only moves in the reader thread and _tail only in the consumer,
+        # so the ring needs no lock; both count bytes since start.
+        self._head = 0
+        self._tail = 0
+        self._data = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        #: Number of times data had to be discarded because the ring was full
+        self.overflows = 0
+        #: Number of bytes discarded because the ring was full
+        self.dropped = 0
+        #: Exception that stopped the reader thread, if any
+        self.error: BaseException | None = None
+
+    def start(self) -> None:
+        """Set the device timeouts and start the reader thread"""
+        if self._thread is not None:
+            return
+        self.device.setTimeouts(self.read_timeout, self.write_timeout)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ftd2xx-reader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader thread. Data already in the ring can still be read."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._data.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        device = self.device
+        size = self._size
+        chunk_size = self._chunk_size
+        view = self._view
+        try:
+            while not self._stop.is_set():
+                want = min(max(device.getQueueStatus(), 1), chunk_size)
+                free = size - (self._head - self._tail)
+                if not free:
+                    got = device.readinto(self._scratch[:want])
+                    if got:
+                        self.overflows += 1
+                        self.dropped += got
+                    continue
+                start = self._head % size
+                want = min(want, free, size - start)
+                got = device.readinto(view[start : start + want])
+                if got:
+                    self._head += got
+                    self._data.set()
+        except Exception as exc:  # noqa: BLE001 - re-raised in the consumer by read
+            self.error = exc
+            self._data.set()
+
+    def read_available(self) -> int:
+        """Return the number of bytes waiting in the ring"""
+        return self._head - self._tail
+
+    def _wait(self, nbytes: int, timeout: float | None) -> int:
+        available = self._head - self._tail
+        if available >= nbytes or timeout is not None and timeout <= 0:
+            return available
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while available < nbytes and self.running:
+            self._data.clear()
+            available = self._head - self._tail
+            if available >= nbytes:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self._data.wait(remaining)
+            available = self._head - self._tail
+        if not available and self.error is not None:
+            raise self.error
+        return available
+
+    def _copyinto(self, target: memoryview, nbytes: int) -> None:
+        start = self._tail % self._size
+        first = min(nbytes, self._size - start)
+        target[:first] = self._view[start : start + first]
+        if first < nbytes:
+            target[first:nbytes] = self._view[: nbytes - first]
+
+    def peek(self, nbytes: int = -1) -> bytes:
+        """Return up to nbytes (all if negative) of the waiting data without
+        consuming it"""
+        available = self._head - self._tail
+        nbytes = available if nbytes < 0 else min(nbytes, available)
+        out = bytearray(nbytes)
+        self._copyinto(memoryview(out), nbytes)
+        return bytes(out)
+
+    def readinto(self, buffer, timeout: float | None = 0) -> int:
+        """Move up to len(buffer) bytes from the ring into buffer and return
+        the number of bytes moved. If fewer bytes are waiting, wait at most
+        timeout seconds (forever if None) for the rest."""
+        target = memoryview(buffer).cast("B")
+        nbytes = min(target.nbytes, self._wait(target.nbytes, timeout))
+        self._copyinto(target, nbytes)
+        self._tail += nbytes
+        return nbytes
+
+    def read(self, nbytes: int = -1, timeout: float | None = 0) -> bytes:
+        """Read up to nbytes (all waiting data if negative) from the ring. If
+        fewer bytes are waiting, wait at most timeout seconds (forever if
+        None) for the rest."""
+        if nbytes < 0:
+            nbytes = self._head - self._tail
+        out = bytearray(nbytes)
+        return bytes(out[: self.readinto(out, timeout)])
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the reader thread when exiting the context manager"""
+        self.stop()
+
+
+__all__ = ["StreamReader"]
@@ -0,0 +1,54 @@
+import unittest
+
+from .. import ftd2xx, sim
+
+
+class FakeDevice:
+    """Base of the stand-ins for FTD2XX: the configuration methods do
+    nothing, and subclasses implement the transfers they need"""
+
+    def resetDevice(self):
+        pass
+
+    def purge(self, mask=0):
+        pass
+
+    def setUSBParameters(self, in_tx_size, out_tx_size=0):
+        pass
+
+    def setChars(self, evch, evch_en, erch, erch_en):
+        pass
+
+    def setTimeouts(self, read, write):
+        pass
+
+    def setLatencyTimer(self, latency):
+        pass
+
+    def setFlowControl(self, flowcontrol, xon=-1, xoff=-1):
+        pass
+
+    def setBitMode(self, mask, enable):
+        pass
+
+    def setBaudRate(self, baud):
+        pass
+
+    def read(self, nchars):
+        buffer = bytearray(nchars)
+        return bytes(buffer[: self.readinto(buffer)])
+
+    def readinto(self, buffer):
+        return 0
+
+
+class SimTestCase(unittest.TestCase):
+    """Test case run on the simulator backend, starting with no simulated
+    devices. Subclasses add theirs after calling :meth:`setUp`."""
+
+    def setUp(self):
+        backend = ftd2xx.getBackend()
+        self.addCleanup(ftd2xx.setBackend, backend)
+        ftd2xx.setBackend("sim")
+        sim.reset(default=False)
+        self.addCleanup(sim.reset)
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import unittest
+
+from .. import aio, ftd2xx, sim
+from . import SimTestCase
+
+
+class EchoDevice:
+    """Stand-in for FTD2XX that echoes back everything written to it"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.rx = bytearray()
+        self.timeout = 0.0
+        self.closed = False
+
+    def setTimeouts(self, read, write):
+        self.timeout = read / 1000
+
+    def getQueueStatus(self):
+        return len(self.rx)
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        with self.cond:
+            if len(self.rx) < view.nbytes:
+                self.cond.wait(self.timeout)
+            n = min(view.nbytes, len(self.rx))
+            view[:n] = self.rx[:n]
+            del self.rx[:n]
+        return n
+
+    def write(self, data):
+        with self.cond:
+            self.rx += data
+            self.cond.notify()
+        return len(data)
+
+    def write_all(self, data, deadline=None):
+        return self.write(data)
+
+    def close(self):
+        self.closed = True
+
+
+class BlockingDevice(EchoDevice):
+    """EchoDevice whose writes wait until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write_all(self, data, deadline=None):
+        self.writing.set()
+        self.released.wait(5)
+        return super().write_all(data, deadline)
+
+
+class TestOpenConnection(unittest.TestCase):
+    def testecho(self):
+        device = EchoDevice()
+
+        async def main():
+            reader, writer = await aio.open_connection(device=device)
+            for i in range(100):
+                writer.write(b"ping %d\n" % i)
+                self.assertEqual(await reader.readline(), b"ping %d\n" % i)
+            writer.close()
+            await writer.wait_closed()
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+        self.assertTrue(device.closed)
+
+    def testabortWhileWriting(self):
+        device = BlockingDevice()
+
+        async def main():
+            transport, _ = await aio.create_connection(asyncio.Protocol, device)
+            transport.write(b"data")
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, device.writing.wait, 5)
+            transport.abort()
+            device.released.set()
+            while not device.closed:
+                await asyncio.sleep(0.01)
+            self.assertEqual(transport.get_write_buffer_size(), 0)
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+
+
+class TestSimConnection(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sim = sim.addDevice(serial=b"SIMAIO1", packet_size=1)
+        self.device = ftd2xx.openEx(b"SIMAIO1")
+
+    def testshortWrites(self):
+        self.sim.tx_capacity = 3
+
+        async def main():
+            reader, writer = await aio.open_connection(
+                device=self.device, write_timeout=5
+            )
+            writer.write(b"0123456789")
+            self.assertEqual(await reader.readexactly(10), b"0123456789")
+            writer.close()
+            await writer.wait_closed()
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+        self.assertEqual(self.sim.bytes_written, 10)
+
+    def testwriteTimeout(self):
+        self.sim.tx_capacity = 0
+
+        async def main():
+            reader, writer = await aio.open_connection(
+                device=self.device, write_timeout=5, write_deadline=0.05
+            )
+            writer.write(b"lost")
+            with self.assertRaises(ftd2xx.WriteTimeoutError):
+                await reader.read(1)
+            with self.assertRaises(ftd2xx.WriteTimeoutError):
+                await writer.drain()
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+        self.assertEqual(self.device.status, 0)
@@ -0,0 +1,89 @@
+import unittest
+
+from .. import bitbang, defines, ftd2xx, sim
+from . import FakeDevice, SimTestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class EchoDevice(FakeDevice):
+    """Stand-in for an FTD2XX in synchronous bit-bang mode that samples the
+    pins just before each written byte is applied, so the samples lag the
+    written bytes by one"""
+
+    def __init__(self):
+        self.pending = bytearray()
+        self.pins = 0
+        self.writes = 0
+
+    def setBitMode(self, mask, enable):
+        self.mode = (mask, enable)
+
+    def purge(self, mask=0):
+        self.pending.clear()
+
+    def write_all(self, data):
+        self.writes += 1
+        data = bytes(data)
+        self.pending.append(self.pins)
+        self.pending += data[:-1]
+        self.pins = data[-1]
+        return len(data)
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        n = min(view.nbytes, len(self.pending))
+        view[:n] = self.pending[:n]
+        del self.pending[:n]
+        return n
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBitBang(unittest.TestCase):
+    def testpack(self):
+        samples = bitbang.pack({0: [1, 0, 1, 0], 1: True, 7: [0, 1]})
+        self.assertEqual(bytes(samples), b"\x03\x82\x83\x82")
+        pins = bitbang.unpack(samples, [0, 7])
+        self.assertEqual(pins[0].tolist(), [True, False, True, False])
+        self.assertEqual(pins[7].tolist(), [False, True, True, True])
+
+    def testfromSegments(self):
+        levels = bitbang.fromSegments([(1, 2), (0, 3)])
+        self.assertEqual(levels.tolist(), [True, True, False, False, False])
+
+    def testplay(self):
+        device = EchoDevice()
+        bang = bitbang.BitBang(device, 0x03, chunk_size=1 << 12)
+        clock = bitbang.fromSegments([(0, 1), (1, 1)] * 50_000)
+        pins = bang.play({0: clock, 1: ~clock})
+        self.assertEqual(device.writes, 25)
+        # Each sample shows the levels set by the previous one
+        self.assertFalse(pins[0][0] or pins[1][0])
+        self.assertTrue((pins[0][1:] == clock[:-1]).all())
+        self.assertTrue((pins[1][1:] != clock[:-1]).all())
+        self.assertFalse(pins[2].any())
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBitBangSim(SimTestCase):
+    def testplay(self):
+        simulated = sim.addDevice(serial=b"SIMBANG1")
+        simulated.inputs = 0x04
+        device = ftd2xx.openEx(b"SIMBANG1")
+        self.addCleanup(device.close)
+        device.setTimeouts(1000, 1000)
+        device.setLatencyTimer(2)
+        bang = bitbang.BitBang(device, 0x03, chunk_size=64)
+        self.assertEqual(device.getBitMode(), 0x04)
+        clock = bitbang.fromSegments([(0, 1), (1, 1)] * 100)
+        pins = bang.play({0: clock, 1: ~clock})
+        self.assertEqual(device.getBitMode(), 0x05)
+        self.assertEqual(pins[0].tolist(), [False] + clock[:-1].tolist())
+        self.assertEqual(pins[1].tolist(), [False] + (~clock[:-1]).tolist())
+        self.assertTrue(pins[2].all())
+        bang.close()
+        self.assertEqual(device.getBitMode(), 0x04)
+        self.assertEqual(simulated.bitmode, defines.BITMODE_RESET)
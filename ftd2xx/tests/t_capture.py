@@ -0,0 +1,132 @@
+import ctypes as c
+import mmap
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from .. import capture
+
+
+class ReplayDevice:
+    """Stand-in for an FTD2XX in bit-bang mode that returns recorded samples"""
+
+    def __init__(self, samples):
+        self.samples = memoryview(samples)
+        self.offset = 0
+
+    def setTimeouts(self, read, write):
+        pass
+
+    def purge(self, mask=0):
+        pass
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        n = min(view.nbytes, len(self.samples) - self.offset)
+        view[:n] = self.samples[self.offset : self.offset + n]
+        self.offset += n
+        return n
+
+
+class FailingDevice(ReplayDevice):
+    """Stand-in whose reads fail while holding a view of the buffer"""
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        array = (c.c_char * view.nbytes).from_buffer(view)  # noqa: F841
+        raise OSError("unplugged")
+
+
+class TestTrigger(unittest.TestCase):
+    def testpattern(self):
+        trigger = capture.Trigger.pattern(0x0F, 0x05)
+        self.assertEqual(trigger.find(b"\x00\x15\x04"), 1)
+        self.assertEqual(trigger.find(b"\x00\x04"), -1)
+
+    def testedge(self):
+        trigger = capture.Trigger.edge(0x08)
+        self.assertEqual(trigger.find(b"\x08\x08\x00"), -1)
+        self.assertEqual(trigger.find(b"\x08\x00"), 0)
+        falling = capture.Trigger.edge(0x08, rising=False)
+        self.assertEqual(falling.find(b"\x00\x08\x08"), -1)
+        self.assertEqual(falling.find(b"\x00"), 0)
+
+
+class TestCapture(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def testtrigger(self):
+        samples = bytearray(b & 0xF7 for b in os.urandom(100_000))
+        samples[70_000:] = b"\x08" * 30_000
+        device = ReplayDevice(samples)
+        granularity = mmap.ALLOCATIONGRANULARITY
+        size = 4 * granularity
+        trigger = capture.Trigger.edge(0x08)
+        with capture.Capture(
+            device,
+            self.path("capture.bin"),
+            size,
+            trigger,
+            pretrigger=1000,
+            chunk_size=granularity,
+        ) as cap:
+            self.assertTrue(cap.wait(5.0))
+        self.assertEqual(cap.length, size)
+        self.assertEqual(cap.triggered, 1000)
+        with open(cap.path, "rb") as f:
+            self.assertEqual(f.read(), bytes(samples[69_000 : 69_000 + size]))
+
+    def testexport(self):
+        samples = b"\x00" * 10 + b"\x03" * 5 + b"\x01" * 3
+        device = ReplayDevice(samples)
+        cap = capture.Capture(device, self.path("capture.bin"), len(samples))
+        cap.start()
+        cap.wait(0.2)
+        cap.stop()
+        self.assertEqual(cap.length, len(samples))
+        self.assertEqual(list(cap.runs()), [(0, 10), (3, 5), (1, 3)])
+        self.assertEqual(cap.exportRle(self.path("capture.rle")), 3)
+        with open(self.path("capture.rle"), "rb") as f:
+            runs = list(struct.iter_unpack(capture.RLE_FORMAT, f.read()))
+        self.assertEqual(runs, [(0, 10), (3, 5), (1, 3)])
+        cap.exportVcd(self.path("capture.vcd"), samplerate=1e6, pins=[0, 1])
+        with open(self.path("capture.vcd")) as f:
+            vcd = f.read()
+        self.assertIn("$var wire 1 ! D0 $end", vcd)
+        self.assertTrue(
+            vcd.endswith('#0\n0!\n0"\n#10000\n1!\n1"\n#15000\n0"\n#18000\n')
+        )
+
+    def testerror(self):
+        cap = capture.Capture(FailingDevice(b""), self.path("capture.bin"), 1)
+        cap.start()
+        self.assertTrue(cap.wait(5.0))
+        self.assertRaisesRegex(OSError, "unplugged", cap.stop)
+
+
+class TestExport(unittest.TestCase):
+    def testrotate(self):
+        data = bytes(random.getrandbits(8) for _ in range(10_000))
+        for first in (1, 7, 4_000, 5_000, 6_001, 9_999):
+            mm = mmap.mmap(-1, len(data))
+            mm[:] = data
+            capture._rotate(mm, first, 1_000)
+            self.assertEqual(mm[:], data[first:] + data[:first], first)
+            mm.close()
+
+    def testruns(self):
+        samples = b"\x00" * 10 + b"\x03" * 5 + b"\x01" * 3 + b"\x01\x02" * 4
+        expected = list(capture._runsSlow([samples]))
+        for size in (1, 2, 3, 7, len(samples)):
+            chunks = [samples[i : i + size] for i in range(0, len(samples), size)]
+            self.assertEqual(list(capture._runs(chunks + [b""])), expected, size)
+            self.assertEqual(list(capture._runsSlow(chunks)), expected, size)
+        self.assertEqual(expected[:4], [(0, 10), (3, 5), (1, 4), (2, 1)])
+        self.assertEqual(list(capture._runs([])), [])
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from .. import ftd2xx, sim
+from ..directory import DeviceDirectory
+from . import SimTestCase
+
+
+class TestDeviceDirectory(unittest.TestCase):
+    def setUp(self):
+        self.directory = DeviceDirectory(ttl=60)
+
+    def testdevices(self):
+        self.assertIsInstance(self.directory.devices(), list)
+
+    def testlookup(self):
+        entry = self.directory.devices()[0]
+        self.assertIs(self.directory.lookup(serial=entry["serial"]), entry)
+        self.assertIs(self.directory.lookup(location=entry["location"]), entry)
+
+    def testlookupMissing(self):
+        self.assertRaises(
+            ftd2xx.DeviceError, self.directory.lookup, serial=b"no such device"
+        )
+
+    def testopen(self):
+        entry = self.directory.devices()[0]
+        with self.directory.open(location=entry["location"]) as device:
+            self.assertEqual(device.serial, entry["serial"])
+        with self.directory.open(serial=entry["serial"]) as device:
+            self.assertEqual(device.serial, entry["serial"])
+
+    def testopenMissingInvalidates(self):
+        self.directory.devices()
+        self.assertRaises(
+            ftd2xx.DeviceError, self.directory.open, serial=b"no such device"
+        )
+        self.assertEqual(self.directory._expires, 0.0)
+
+
+class TestDeviceDirectorySim(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sims = [
+            sim.addDevice(serial=b"SIMDIR%d" % i, description=b"Sim %d" % i)
+            for i in range(3)
+        ]
+        self.directory = DeviceDirectory(ttl=60)
+
+    def patch(self, name):
+        patcher = mock.patch.object(sim, name, wraps=getattr(sim, name))
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def testopenCached(self):
+        self.directory.devices()
+        enumeration = self.patch("FT_CreateDeviceInfoList")
+        openEx = self.patch("FT_OpenEx")
+        with self.directory.open(serial=b"SIMDIR1") as device:
+            self.assertEqual(device.serial, b"SIMDIR1")
+        with self.directory.open(description=b"Sim 2") as device:
+            self.assertEqual(device.serial, b"SIMDIR2")
+        self.assertEqual((enumeration.call_count, openEx.call_count), (0, 0))
+
+    def testopenMoved(self):
+        self.directory.devices()
+        sim.removeDevice(self.sims[0])
+        sim.addDevice(self.sims[0])
+        # Index 1 now holds SIMDIR2, so the list is enumerated again once
+        enumeration = self.patch("FT_CreateDeviceInfoList")
+        with self.directory.open(serial=b"SIMDIR1") as device:
+            self.assertEqual(device.serial, b"SIMDIR1")
+        self.assertEqual(enumeration.call_count, 1)
+        # Plugged after the last enumeration, found by the driver
+        sim.addDevice(serial=b"SIMDIR9")
+        with self.directory.open(serial=b"SIMDIR9") as device:
+            self.assertEqual(device.serial, b"SIMDIR9")
+
+    def testconcurrentRefresh(self):
+        createList = sim.FT_CreateDeviceInfoList
+
+        def slowEnumerate(*args):
+            time.sleep(0.05)
+            return createList(*args)
+
+        enumeration = mock.patch.object(
+            sim, "FT_CreateDeviceInfoList", side_effect=slowEnumerate
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        barrier = threading.Barrier(8)
+
+        def lookup():
+            barrier.wait()
+            self.directory.lookup(serial=b"SIMDIR0")
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(enumeration.call_count, 1)
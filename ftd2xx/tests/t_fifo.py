@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from .. import fifo
+
+
+class CountingDevice:
+    """Stand-in for an FTD2XX in synchronous FIFO mode sending a counter"""
+
+    def __init__(self, total):
+        self.total = total
+        self.sent = 0
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append(name)
+
+        return record
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        n = min(view.nbytes, self.total - self.sent)
+        for i in range(n):
+            view[i] = (self.sent + i) & 0xFF
+        self.sent += n
+        return n
+
+
+class TestSyncFifoStream(unittest.TestCase):
+    def teststream(self):
+        device = CountingDevice(10_000)
+        stream = fifo.SyncFifoStream(device, buffers=2, buffer_size=1024)
+        received = bytearray()
+        with stream:
+            while len(received) < 10_000:
+                chunk = stream.get(timeout=5.0)
+                self.assertIsNotNone(chunk)
+                received += chunk
+                stream.release(chunk)
+        self.assertIn("setUSBParameters", device.calls)
+        self.assertEqual(received, bytes(i & 0xFF for i in range(10_000)))
+        self.assertEqual(stream.bytes_read, 10_000)
+        self.assertEqual(stream.chunks, 10)
+
+    def testiterate(self):
+        device = CountingDevice(4096)
+        stream = fifo.SyncFifoStream(device, buffer_size=1024, read_timeout=10)
+        stream.start()
+        threading.Timer(0.2, stream.stop).start()
+        sizes = [len(chunk) for chunk in stream]
+        self.assertEqual(sizes, [1024] * 4)
+        self.assertGreater(stream.average, 0)
@@ -1,8 +1,12 @@
 # This file was originally generated by PyScripter's unitest wizard
 
+import ctypes as c
+import pickle
+import sys
 import unittest
+from typing import Any
 
-from .. import ftd2xx
+from .. import defines, ftd2xx
 from ..ftd2xx import DeviceError
 
 
@@ -16,6 +20,33 @@ class TestDeviceError(unittest.TestCase):
     def test__str__(self):
         self.assertTrue(str(self.expt) == "OK")
 
+    def teststatusClass(self):
+        self.assertIs(type(self.expt), DeviceError)
+        error = DeviceError(defines.Status.IO_ERROR)
+        self.assertIs(type(error), ftd2xx.IoError)
+        self.assertEqual((error.status, error.message), (4, "IO_ERROR"))
+        self.assertIsInstance(DeviceError(2), ftd2xx.DeviceNotFoundError)
+        self.assertIsNot(DeviceError(2), DeviceError(2))
+        self.assertIsNone(DeviceError("text").status)
+        self.assertEqual(ftd2xx.NotSupportedError("text").status, 17)
+
+    def testpickle(self):
+        for error in (DeviceError(4), DeviceError(0), DeviceError("text")):
+            copy = pickle.loads(pickle.dumps(error))
+            self.assertIs(type(copy), type(error))
+            self.assertEqual((copy.status, copy.message), (error.status, error.message))
+
+    @unittest.skipIf(sys.platform == "win32", "uses the C library")
+    def testerrcheck(self):
+        self.assertIs(ftd2xx._native.FT_Read.errcheck, ftd2xx._errcheck)
+        self.assertNotIn("errcheck", ftd2xx._native.FT_W32_CreateFile._prototype)
+        function: Any = c.CDLL(None).abs
+        function.restype = c.c_ulong
+        function.argtypes = [c.c_int]
+        function.errcheck = ftd2xx._errcheck
+        self.assertEqual(function(0), 0)
+        self.assertRaises(ftd2xx.InvalidParameterError, function, -6)
+
 
 class TestFTD2XX(unittest.TestCase):
     def setUp(self):
@@ -31,9 +62,26 @@ class TestFTD2XX(unittest.TestCase):
         self.device.setTimeouts(1000, 0)
         self.assertIsInstance(self.device.read(1), bytes)
 
+    def testreadinto(self):
+        self.device.setTimeouts(1000, 0)
+        buf = bytearray(16)
+        n = self.device.readinto(memoryview(buf)[4:])
+        self.assertIsInstance(n, int)
+        self.assertLessEqual(n, 12)
+        self.assertRaises(TypeError, self.device.readinto, bytes(4))
+
     def testwrite(self):
         self.assertIsInstance(self.device.write(b"\x00"), int)
 
+    def testwritev(self):
+        self.assertEqual(
+            self.device.writev([b"\x00", bytearray(2), memoryview(b"\x00")]), 4
+        )
+
+    def testwrite_all(self):
+        self.device.setTimeouts(1000, 1000)
+        self.assertEqual(self.device.write_all(bytearray(64)), 64)
+
     def testioctl(self):
         pass
 
@@ -85,6 +133,10 @@ class TestFTD2XX(unittest.TestCase):
     def testsetEventNotification(self):
         pass
 
+    def testwait_for_event(self):
+        self.device.purge()
+        self.assertEqual(self.device.wait_for_event(timeout=10), 0)
+
     def testgetStatus(self):
         self.assertIsInstance(self.device.getStatus(), tuple)
 
@@ -177,6 +229,11 @@ class TestGlobalFunctions(unittest.TestCase):
     def testgetDeviceInfoDetail(self):
         self.assertIsInstance(ftd2xx.getDeviceInfoDetail(), dict)
 
+    def testgetDeviceInfoList(self):
+        devices = ftd2xx.getDeviceInfoList()
+        self.assertIsInstance(devices, list)
+        self.assertEqual(devices[0]["serial"], ftd2xx.getDeviceInfoDetail(0)["serial"])
+
     def testopen(self):
         with ftd2xx.open() as device:
             self.assertIsInstance(device, ftd2xx.FTD2XX)
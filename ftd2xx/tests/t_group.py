@@ -0,0 +1,134 @@
+import unittest
+from unittest import mock
+
+from .. import ftd2xx, sim
+from ..group import DeviceGroup, DeviceGroupError, openChip
+from . import SimTestCase
+
+
+class TestDeviceGroup(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        serials = [b"SIMGRP%d" % i for i in range(4)]
+        self.sims = [sim.addDevice(serial=s, packet_size=1) for s in serials]
+        self.group = DeviceGroup(ftd2xx.openEx(s) for s in serials)
+        self.addCleanup(self.group.close)
+        self.group.setTimeouts(200, 200)
+
+    def testreadWrite(self):
+        self.assertEqual(self.group.write(b"abc"), [3] * 4)
+        self.assertEqual(self.group.read(3), [b"abc"] * 4)
+        self.group.write([b"%d" % i * (i + 1) for i in range(4)])
+        self.assertEqual(self.group.read([1, 2, 3, 4]), [b"0", b"11", b"222", b"3333"])
+        buffers = [bytearray(2) for _ in range(4)]
+        self.group.write(b"xy")
+        self.assertEqual(self.group.readinto(buffers), [2] * 4)
+        self.assertEqual(buffers, [bytearray(b"xy")] * 4)
+        self.assertRaises(ValueError, self.group.read, [1, 2])
+
+    def testmap(self):
+        serials = self.group.map(lambda device: device.serial)
+        self.assertEqual(serials, [s.serial for s in self.sims])
+        self.group.setBaudRate([9600, 19200, 38400, 57600])
+        self.assertEqual([s.baudrate for s in self.sims], [9600, 19200, 38400, 57600])
+        self.group.map(ftd2xx.FTD2XX.setLatencyTimer, range(2, 6))
+        self.assertEqual([s.latency_timer for s in self.sims], [2, 3, 4, 5])
+
+    def testerrors(self):
+        sim.removeDevice(self.sims[2])
+        with self.assertRaises(DeviceGroupError) as cm:
+            self.group.purge()
+        self.assertEqual(list(cm.exception.errors), [2])
+        self.assertIsInstance(cm.exception.errors[2], ftd2xx.IoError)
+        results = self.group.read(1, return_exceptions=True)
+        self.assertEqual(results[0], b"")
+        self.assertIsInstance(results[2], ftd2xx.IoError)
+        self.assertEqual(self.group.stats()["errors"], 2)
+        sim.addDevice(self.sims[2])
+
+    def testtimeout(self):
+        self.group.setTimeouts(2000, 2000)
+        self.sims[1].usb_latency = 0.3
+        results = self.group.write(b"x", timeout=0.1, return_exceptions=True)
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], TimeoutError)
+        # The next operation waits for the late one
+        self.assertEqual(self.group.read(1, timeout=2.0), [b"x"] * 4)
+        self.assertEqual(self.group.stats()["devices"][1]["timeouts"], 1)
+
+    def teststats(self):
+        self.group.resetStats()
+        self.group.write(bytes(1000))
+        self.group.read(1000)
+        stats = self.group.stats()
+        self.assertEqual(stats["batches"], 2)
+        self.assertEqual((stats["bytes_written"], stats["bytes_read"]), (4000, 4000))
+        self.assertEqual(stats["calls"], 8)
+        self.assertGreater(stats["read_rate"], 0)
+        self.assertEqual(stats["devices"][3]["bytes_read"], 1000)
+
+
+class TestChip(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sims = {
+            letter: sim.addDevice(serial=b"SIMCHIP" + letter.encode(), packet_size=1)
+            for letter in "BDAC"
+        }
+        sim.addDevice(serial=b"SIMCHIP2A")
+
+    def testopenChip(self):
+        with mock.patch.object(
+            sim, "FT_CreateDeviceInfoList", wraps=sim.FT_CreateDeviceInfoList
+        ) as enumeration:
+            chip = openChip("SIMCHIP")
+        self.addCleanup(chip.close)
+        self.assertEqual(enumeration.call_count, 1)
+        self.assertEqual(chip.channels, ["A", "B", "C", "D"])
+        self.assertEqual(chip["C"].serial, b"SIMCHIPC")
+        self.assertIs(chip[2], chip["C"])
+        self.assertRaises(KeyError, chip.__getitem__, "E")
+        chip.setTimeouts(200, 200)
+        chip.write([b"a", b"b", b"c", b"d"])
+        self.assertEqual(chip.read(1), [b"a", b"b", b"c", b"d"])
+        self.assertRaises(ftd2xx.DeviceNotFoundError, openChip, b"NOSUCH")
+
+    def testopenChipFailure(self):
+        openEx = ftd2xx.openEx
+
+        def failing(serial, *args, **kwargs):
+            if serial == b"SIMCHIPC":
+                raise RuntimeError("unexpected")
+            return openEx(serial, *args, **kwargs)
+
+        with mock.patch("ftd2xx.group.openEx", failing), self.assertRaises(
+            DeviceGroupError
+        ) as raised:
+            openChip(b"SIMCHIP")
+        self.assertEqual(list(raised.exception.errors), [2])
+        self.assertIsInstance(raised.exception.errors[2], RuntimeError)
+        # The channels that did open are closed again
+        self.assertEqual([s.handle for s in self.sims.values()], [None] * 4)
+
+    def testsettings(self):
+        chip = openChip(b"SIMCHIP")
+        self.addCleanup(chip.close)
+        chip.setBaudRate(115200)
+        calls = chip.stats()["calls"]
+        chip.setBaudRate(115200)
+        self.assertEqual(chip.stats()["calls"], calls)
+        chip.setBaudRate([115200, 115200, 9600, 115200])
+        self.assertEqual(chip.stats()["calls"], calls + 1)
+        self.assertEqual(self.sims["C"].baudrate, 9600)
+        chip.setLatencyTimer(2)
+        self.assertEqual(
+            chip.settings[3], {"setBaudRate": (115200,), "setLatencyTimer": (2,)}
+        )
+        self.sims["A"].latency_timer = 16
+        chip.forget()
+        chip.setLatencyTimer(2)
+        self.assertEqual(self.sims["A"].latency_timer, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
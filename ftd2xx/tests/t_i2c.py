@@ -0,0 +1,53 @@
+import unittest
+
+from .. import i2c
+from . import FakeDevice
+
+
+class FillDevice(FakeDevice):
+    """Stand-in for an FTD2XX in MPSSE mode that reads back a fixed byte"""
+
+    def __init__(self, fill=0):
+        self.fill = fill
+        self.writes = 0
+        self.reads = 0
+
+    def write_all(self, data):
+        self.writes += 1
+        return len(data)
+
+    def readinto(self, buffer):
+        self.reads += 1
+        view = memoryview(buffer).cast("B")
+        view[:] = bytes([self.fill]) * view.nbytes
+        return view.nbytes
+
+
+class TestI2cController(unittest.TestCase):
+    def testclockDivisor(self):
+        self.assertEqual(i2c.clockDivisor(400e3), (49, 400e3))
+        self.assertEqual(i2c.clockDivisor(100e3), (199, 100e3))
+
+    def testscan(self):
+        device = FillDevice(0)
+        controller = i2c.I2cController(device, init=False)
+        device.writes = device.reads = 0
+        self.assertEqual(controller.scan(), list(range(0x08, 0x78)))
+        self.assertEqual((device.writes, device.reads), (1, 1))
+        device.fill = 0xFF
+        self.assertEqual(controller.scan(), [])
+
+    def testexchange(self):
+        device = FillDevice(0)
+        controller = i2c.I2cController(device, init=False)
+        device.writes = device.reads = 0
+        data = controller.exchange(0x50, b"\x00", 256)
+        self.assertEqual(data, bytes(256))
+        self.assertEqual((device.writes, device.reads), (1, 1))
+
+    def testnack(self):
+        device = FillDevice(0xFF)
+        controller = i2c.I2cController(device, init=False)
+        with self.assertRaises(i2c.I2cNackError) as cm:
+            controller.write(0x50, b"\x00\x01")
+        self.assertEqual((cm.exception.address, cm.exception.index), (0x50, 0))
@@ -0,0 +1,83 @@
+import unittest
+
+from .. import ftd2xx, sim
+from ..instrument import Histogram, instrumentedClass
+from . import SimTestCase
+
+
+class TestHistogram(unittest.TestCase):
+    def testpercentile(self):
+        histogram = Histogram()
+        for ns in range(1, 1001):
+            histogram.record(ns)
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual((histogram.min, histogram.max), (1, 1000))
+        self.assertAlmostEqual(histogram.mean, 500.5)
+        # Within the 25% bucket width
+        self.assertTrue(500 <= histogram.percentile(50) < 625)
+        self.assertEqual(histogram.percentile(100), 1000)
+        self.assertEqual(Histogram().percentile(50), 0)
+
+    def testbuckets(self):
+        histogram = Histogram()
+        for ns in (3, 8, 9, 10, 11, 12, 1 << 20):
+            histogram.record(ns)
+        self.assertEqual(histogram.counts, {3: 1, 8: 2, 10: 2, 12: 1, 1 << 20: 1})
+        histogram.record(17)
+        histogram.record(19)
+        self.assertEqual(histogram.counts[16], 2)
+
+
+class TestInstrument(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        sim.addDevice(serial=b"SIMINST1", packet_size=1)
+        self.device = ftd2xx.openEx(b"SIMINST1")
+        self.addCleanup(self.device.close)
+        self.device.setTimeouts(1000, 1000)
+
+    def testrecord(self):
+        stats = self.device.instrument()
+        self.assertIs(type(self.device), instrumentedClass(ftd2xx.FTD2XX))
+        self.assertIsInstance(self.device, ftd2xx.FTD2XX)
+        self.device.write(b"hello")
+        self.assertEqual(self.device.read(5), b"hello")
+        self.device.write(b"abc")
+        self.device.readinto(bytearray(3))
+        self.device.getQueueStatus()
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["calls"], 5)
+        self.assertEqual(snapshot["bytes"], 16)
+        write = snapshot["methods"]["write"]
+        self.assertEqual((write["calls"], write["bytes"], write["errors"]), (2, 8, 0))
+        self.assertEqual(sum(write["buckets"].values()), 2)
+        self.assertLessEqual(write["min_ns"], write["p50_ns"])
+        self.assertLessEqual(write["p99_ns"], write["max_ns"])
+        self.assertEqual(snapshot["methods"]["getQueueStatus"]["bytes"], 0)
+
+    def testerrors(self):
+        stats = self.device.instrument()
+        self.assertRaises(NotImplementedError, self.device.ioctl)
+        self.assertEqual(stats.snapshot()["methods"]["ioctl"]["errors"], 1)
+
+    def testcallback(self):
+        snapshots: list = []
+        stats = self.device.instrument(callback=snapshots.append, interval=0.0)
+        self.device.getQueueStatus()
+        self.device.getQueueStatus()
+        self.assertEqual([s["calls"] for s in snapshots], [1, 1])
+        self.assertEqual(stats.snapshot()["calls"], 0)
+
+    def testuninstrument(self):
+        stats = self.device.instrument()
+        self.device.getQueueStatus()
+        self.assertIs(self.device.uninstrument(), stats)
+        self.assertIs(type(self.device), ftd2xx.FTD2XX)
+        self.device.getQueueStatus()
+        self.assertEqual(stats.snapshot(reset=True)["calls"], 1)
+        self.assertEqual(stats.snapshot()["calls"], 0)
+        self.assertIsNone(self.device.uninstrument())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from .. import jtag
+from ..jtag import TapState
+from . import FakeDevice
+
+
+class RecordingDevice(FakeDevice):
+    """Stand-in for an FTD2XX in MPSSE mode that reads back a fixed byte"""
+
+    def __init__(self, fill=0):
+        self.fill = fill
+        self.written = bytearray()
+        self.writes = 0
+
+    def write_all(self, data):
+        self.writes += 1
+        self.written += data
+        return len(data)
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        view[:] = bytes([self.fill]) * view.nbytes
+        return view.nbytes
+
+
+class TestTap(unittest.TestCase):
+    def testtmsPath(self):
+        self.assertEqual(
+            jtag.tmsPath(TapState.RUN_TEST_IDLE, TapState.SHIFT_DR), (0b001, 3)
+        )
+        self.assertEqual(
+            jtag.tmsPath(TapState.RUN_TEST_IDLE, TapState.SHIFT_IR), (0b0011, 4)
+        )
+        self.assertEqual(
+            jtag.tmsPath(TapState.EXIT1_DR, TapState.RUN_TEST_IDLE), (0b01, 2)
+        )
+        for state in TapState:
+            self.assertEqual(jtag.tmsPath(state, state), (0, 0))
+            self.assertLessEqual(jtag.tmsPath(state, TapState.TEST_LOGIC_RESET)[1], 5)
+
+
+class TestJtagController(unittest.TestCase):
+    def testshiftIr(self):
+        device = RecordingDevice()
+        controller = jtag.JtagController(device, init=False)
+        device.written.clear()
+        controller.shiftIr(0x29, 6)
+        controller.flush()
+        self.assertEqual(
+            bytes(device.written),
+            bytes.fromhex("4b 03 03 1b 04 29 4b 00 81 4b 01 01"),
+        )
+        self.assertEqual(controller.state, TapState.RUN_TEST_IDLE)
+
+    def testshiftDrRead(self):
+        device = RecordingDevice(0xFF)
+        controller = jtag.JtagController(device, init=False)
+        scan = controller.shiftDr(bytes(3), 21, read=True)
+        controller.flush()
+        self.assertEqual(scan.data, b"\xff\xff\x1f")
+        self.assertEqual(scan.value, (1 << 21) - 1)
+
+    def testreadIdcode(self):
+        device = RecordingDevice(0xFF)
+        controller = jtag.JtagController(device, init=False)
+        self.assertEqual(controller.readIdcode(), 0xFFFFFFFF)
+
+    def teststreaming(self):
+        device = RecordingDevice()
+        controller = jtag.JtagController(device, chunk_size=1 << 18, init=False)
+        device.writes = 0
+        device.written.clear()
+        controller.shiftDr(bytes(1 << 20))
+        controller.flush()
+        self.assertEqual(device.writes, 5)
+        self.assertLess(len(device.written), (1 << 20) + 100)
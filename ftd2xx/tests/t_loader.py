@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from .. import _loader
+
+
+class FakeLibrary:
+    """Stand-in for a ctypes library"""
+
+    def __init__(self):
+        self.FT_Test = lambda *args: sum(args)
+
+
+class TestLazyLibrary(unittest.TestCase):
+    def testlazy(self):
+        loads = []
+
+        def load():
+            loads.append(1)
+            return FakeLibrary()
+
+        namespace: dict = {}
+        library = _loader.LazyLibrary(load, namespace)
+        function = namespace["FT_Test"] = library.FT_Test
+        function.restype = int
+        function.argtypes = [int, int]
+        function.__doc__ = "FT_Test(a, b)"
+        self.assertEqual(function.restype, int)
+        self.assertEqual(function.__doc__, "FT_Test(a, b)")
+        self.assertFalse(library.loaded)
+        self.assertEqual(loads, [])
+        self.assertEqual(function(2, 3), 5)
+        self.assertEqual(loads, [1])
+        resolved = namespace["FT_Test"]
+        self.assertIsNot(resolved, function)
+        self.assertEqual(resolved.argtypes, [int, int])
+        self.assertEqual(function(1, 1), 2)
+        self.assertEqual(loads, [1])
+
+    def testlibraryPath(self):
+        self.addCleanup(_loader.setLibraryPath, None)
+        environ = os.environ.pop(_loader.LIBRARY_PATH_ENV, None)
+        if environ is not None:
+            self.addCleanup(os.environ.__setitem__, _loader.LIBRARY_PATH_ENV, environ)
+        self.assertEqual(_loader.getLibraryPath("libftd2xx.so"), "libftd2xx.so")
+        _loader.setLibraryPath("/opt/ftdi/libftd2xx.so")
+        self.assertEqual(
+            _loader.getLibraryPath("libftd2xx.so"), "/opt/ftdi/libftd2xx.so"
+        )
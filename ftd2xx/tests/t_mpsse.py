@@ -0,0 +1,71 @@
+import unittest
+
+from .. import mpsse
+from ..ftd2xx import DeviceError
+from . import FakeDevice
+
+
+class RecordingDevice(FakeDevice):
+    """Stand-in for FTD2XX that records writes and answers with fixed data"""
+
+    def __init__(self, reply: bytes = b""):
+        self.written = bytearray()
+        self.reply = bytearray(reply)
+        self.writes = 0
+        self.reads = 0
+
+    def write_all(self, data):
+        self.writes += 1
+        self.written += data
+        return len(data)
+
+    def readinto(self, buffer):
+        self.reads += 1
+        view = memoryview(buffer).cast("B")
+        n = min(view.nbytes, len(self.reply))
+        view[:n] = self.reply[:n]
+        del self.reply[:n]
+        return n
+
+
+class TestCommandBuffer(unittest.TestCase):
+    def testencoding(self):
+        cmd = mpsse.CommandBuffer()
+        cmd.setDivisor(0x1234)
+        cmd.setGpioLow(0x08, 0x0B)
+        cmd.clockOut(b"\x01\x02")
+        cmd.clockBitsOut(0x5, 3)
+        cmd.clockTms(0b011, 3, tdi=True)
+        cmd.clockCycles(20)
+        self.assertEqual(
+            bytes(cmd._buffer),
+            bytes.fromhex("863412 80080b 1101000102 1302 05 4b0283 8e03 8f0100"),
+        )
+        self.assertEqual(cmd.expected, 0)
+
+    def testlongtransfer(self):
+        cmd = mpsse.CommandBuffer()
+        cmd.clockOut(bytes(mpsse.MAX_TRANSFER + 1))
+        self.assertEqual(len(cmd), mpsse.MAX_TRANSFER + 1 + 6)
+        self.assertEqual(bytes(cmd._buffer[-4:]), b"\x11\x00\x00\x00")
+
+    def testflush(self):
+        device = RecordingDevice(b"\xaa\xbb\xcc\x42\x01")
+        cmd = mpsse.CommandBuffer(device)
+        inout = cmd.clockInOut(b"\x9f\x00\x00")
+        gpio = cmd.readGpioLow()
+        bit = cmd.clockBitsIn(1)
+        self.assertFalse(inout.ready)
+        self.assertEqual(cmd.expected, 5)
+        cmd.flush()
+        self.assertEqual((device.writes, device.reads), (1, 1))
+        self.assertEqual(device.written[-1], mpsse.SEND_IMMEDIATE)
+        self.assertEqual(inout.data, b"\xaa\xbb\xcc")
+        self.assertEqual(gpio.value, 0x42)
+        self.assertEqual(bit.value, 1)
+        self.assertEqual(len(cmd), 0)
+
+    def testflushtimeout(self):
+        cmd = mpsse.CommandBuffer(RecordingDevice(b"\x00"))
+        cmd.clockIn(2)
+        self.assertRaises(DeviceError, cmd.flush)
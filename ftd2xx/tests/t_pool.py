@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from .. import defines, ftd2xx, sim
+from ..directory import DeviceDirectory
+from ..pool import DevicePool
+from . import SimTestCase
+
+
+class TestDevicePool(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sim = sim.addDevice(serial=b"SIMPOOL1", location=0x21, packet_size=1)
+        self.other = sim.addDevice(serial=b"SIMPOOL2", location=0x22)
+        self.pool = DevicePool(DeviceDirectory(ttl=60.0), check_interval=0.0)
+        self.addCleanup(self.pool.close)
+
+    def replug(self):
+        # Keeps the device indexes, as when the adapter comes back in the
+        # same port
+        sim.removeDevice(self.sim)
+        sim.removeDevice(self.other)
+        self.sim = sim.addDevice(serial=b"SIMPOOL1", location=0x21, packet_size=1)
+        sim.addDevice(self.other)
+
+    def testlease(self):
+        with self.pool.lease("SIMPOOL1") as device:
+            handle = device.device
+            self.assertEqual(device.serial, b"SIMPOOL1")
+            self.assertRaises(TimeoutError, self.pool.lease, b"SIMPOOL1", 0.01)
+        self.assertRaises(ValueError, getattr, device, "serial")
+        with self.pool.lease(b"SIMPOOL1") as device:
+            self.assertIs(device.device, handle)
+        stats = self.pool.stats()[b"SIMPOOL1"]
+        self.assertEqual((stats["open"], stats["leased"]), (True, False))
+        self.assertEqual(stats["location"], 0x21)
+
+    def testreopen(self):
+        with self.pool.lease(b"SIMPOOL1") as device:
+            device.setBaudRate(9600)
+            device.setTimeouts(200, 200)
+            device.setLatencyTimer(2)
+            device.setBitMode(0xFF, defines.BITMODE_ASYNC_BITBANG)
+            device.setBaudRate(115200)
+            self.replug()
+            with mock.patch.object(
+                sim, "FT_CreateDeviceInfoList", wraps=sim.FT_CreateDeviceInfoList
+            ) as enumeration:
+                self.assertEqual(device.getQueueStatus(), 0)
+            self.assertEqual(enumeration.call_count, 0)
+            self.assertEqual(device.write(b"x"), 1)
+        self.assertEqual(self.sim.baudrate, 115200)
+        self.assertEqual(self.sim.latency_timer, 2)
+        self.assertEqual(self.sim.bitmode, defines.BITMODE_ASYNC_BITBANG)
+        stats = self.pool.stats()[b"SIMPOOL1"]
+        self.assertEqual(stats["reopens"], 1)
+        self.assertEqual(
+            stats["settings"],
+            ["setTimeouts", "setLatencyTimer", "setBitMode", "setBaudRate"],
+        )
+
+    def testwriteNotRetried(self):
+        with self.pool.lease(b"SIMPOOL1") as device:
+            device.setTimeouts(200, 200)
+            self.replug()
+            # Part of the data may have been sent before the failure
+            self.assertRaises(self.pool.reopen_errors, device.write, b"x")
+            self.assertEqual(self.sim.bytes_written, 0)
+            self.assertEqual(self.pool.stats()[b"SIMPOOL1"]["reopens"], 1)
+            self.assertEqual(device.write(b"x"), 1)
+            self.assertEqual(self.sim.bytes_written, 1)
+
+    def testcheck(self):
+        with self.pool.lease(b"SIMPOOL1") as device:
+            device.setLatencyTimer(3)
+        self.replug()
+        with self.pool.lease(b"SIMPOOL1") as device:
+            self.assertEqual(self.pool.stats()[b"SIMPOOL1"]["reopens"], 1)
+            self.assertEqual(self.sim.latency_timer, 3)
+        self.replug()
+        self.pool.check()
+        self.assertEqual(self.pool.stats()[b"SIMPOOL1"]["reopens"], 2)
+        sim.removeDevice(self.sim)
+        self.pool.retry_delay = 0.0
+        self.assertRaises(ftd2xx.DeviceNotFoundError, self.pool.lease, b"SIMPOOL1")
+        self.assertFalse(self.pool.stats()[b"SIMPOOL1"]["leased"])
+
+    def testmoved(self):
+        with self.pool.lease(b"SIMPOOL1") as device:
+            device.setLatencyTimer(4)
+        sim.removeDevice(self.sim)
+        self.sim = sim.addDevice(serial=b"SIMPOOL1", location=0x31)
+        with self.pool.lease(b"SIMPOOL1"):
+            self.assertEqual(self.pool.stats()[b"SIMPOOL1"]["location"], 0x31)
+        self.assertEqual(self.sim.latency_timer, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+import array
+import ctypes as c
+import mmap
+import threading
+import time
+import unittest
+import weakref
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .. import defines, ftd2xx, sim
+from . import SimTestCase
+
+
+class TestSim(SimTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sim = sim.addDevice(serial=b"SIMTEST1", description=b"Sim A")
+        self.device = ftd2xx.openEx(b"SIMTEST1")
+        self.addCleanup(self.device.close)
+
+    def testenumerate(self):
+        sim.addDevice(serial=b"SIMTEST2")
+        self.assertEqual(ftd2xx.listDevices(), [b"SIMTEST1", b"SIMTEST2"])
+        info = ftd2xx.getDeviceInfoList()
+        self.assertEqual(info[0]["description"], b"Sim A")
+        self.assertEqual(info[0]["flags"] & 1, 1)
+        detail = ftd2xx.getDeviceInfoDetail(0)
+        self.assertIsInstance(info[0]["handle"], type(detail["handle"]))
+        for handle in (info[0]["handle"], detail["handle"]):
+            self.assertEqual(c.cast(handle, c.c_void_p).value, self.sim.handle)
+        self.assertEqual(self.device.serial, b"SIMTEST1")
+
+    def testrecord(self):
+        self.assertFalse(hasattr(self.device, "__dict__"))
+        self.assertIsInstance(self.device.info, ftd2xx.DeviceRecord)
+        self.assertEqual(self.device.info.serial, b"SIMTEST1")
+        self.assertEqual(self.device.type, defines.DEVICE_232H)
+        self.assertEqual(self.device.info._asdict(), self.device.getDeviceInfo())
+        self.assertIs(weakref.ref(self.device)(), self.device)
+
+    def testpoll(self):
+        self.device.setRts()
+        self.sim.feed(bytes(600))
+        self.sim.line_status = 0x62
+        self.sim.tx_queue = 5
+        status = self.device.poll()
+        self.assertEqual((status.rx, status.tx), (600, 5))
+        self.assertTrue(status.events & defines.EVENT_RXCHAR)
+        self.assertEqual(status.modem, defines.ModemStatus.CTS)
+        self.assertEqual((status.line, status.errors), (0x62, 0x02))
+        self.assertTrue(status.modem_status & defines.ModemStatus.OE)
+        self.device.purge()
+        self.assertIs(self.device.poll(), status)
+        self.assertEqual((status.rx, status.events), (0, 0))
+
+    @unittest.skipIf(np is None, "needs numpy")
+    def testpollAll(self):
+        second = sim.addDevice(serial=b"SIMTEST2")
+        other = ftd2xx.openEx(b"SIMTEST2")
+        self.addCleanup(other.close)
+        second.feed(bytes(700))
+        table = ftd2xx.pollAll([self.device, other])
+        self.assertEqual(table.dtype, ftd2xx.statusDtype())
+        self.assertEqual(list(table["rx"]), [0, 700])
+        table[:] = 0
+        self.device.poll(table[1])
+        self.assertEqual(list(table["rx"]), [0, 0])
+        ftd2xx.pollAll([other], table[1:])
+        self.assertEqual(list(table["rx"]), [0, 700])
+
+    def testloopback(self):
+        self.device.setTimeouts(1000, 1000)
+        self.device.setLatencyTimer(2)
+        self.assertEqual(self.device.write(b"hello"), 5)
+        self.assertEqual(self.device.read(5), b"hello")
+        self.assertEqual(self.sim.bytes_written, 5)
+
+    def testreadinto(self):
+        self.device.setTimeouts(1000, 1000)
+        self.device.setLatencyTimer(2)
+        buf = bytearray(16)
+        self.sim.feed(b"0123456789ab")
+        self.assertEqual(self.device.readinto(memoryview(buf)[4:]), 12)
+        self.assertEqual(buf, bytes(4) + b"0123456789ab")
+        words = array.array("H", bytes(8))
+        for data in (b"abcdefgh", b"ijklmnop"):
+            self.sim.feed(data)
+            self.assertEqual(self.device.readinto(words), 8)
+            self.assertEqual(words.tobytes(), data)
+        # The buffers are not kept exported after the calls
+        words.append(0)
+        buf.extend(b"z")
+        mm = mmap.mmap(-1, 16)
+        for _ in range(2):
+            self.sim.feed(b"mm")
+            self.assertEqual(self.device.readinto(mm), 2)
+        self.sim.feed(b"mm")
+        self.assertEqual(self.device.readinto(memoryview(mm)[2:]), 2)
+        mm.close()
+        self.assertRaises(TypeError, self.device.readinto, bytes(4))
+        self.assertEqual(self.device.readinto(bytearray()), 0)
+
+    @unittest.skipIf(np is None, "needs numpy")
+    def testreadintoNumpy(self):
+        self.device.setTimeouts(1000, 1000)
+        self.device.setLatencyTimer(2)
+        samples: np.ndarray = np.zeros((2, 4), dtype=np.uint16)
+        self.sim.feed(bytes(range(16)))
+        self.assertEqual(self.device.readinto(samples[1]), 8)
+        self.assertEqual(samples[1].tobytes(), bytes(range(8)))
+        self.assertFalse(samples[0].any())
+
+    def testshortWrite(self):
+        self.device.setTimeouts(1000, 20)
+        self.sim.tx_capacity = 3
+        start = time.monotonic()
+        self.assertEqual(self.device.write(b"hello"), 3)
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+        self.assertEqual(self.device.write_all(b"hello"), 5)
+        self.assertEqual(self.device.read(8), b"helhello")
+        self.sim.tx_capacity = 0
+        with self.assertRaises(ftd2xx.WriteTimeoutError) as cm:
+            self.device.write_all(b"hello")
+        self.assertEqual((cm.exception.written, cm.exception.total), (0, 5))
+        start = time.monotonic()
+        deadline = start + 0.1
+        self.assertRaises(
+            ftd2xx.WriteTimeoutError, self.device.write_all, b"hello", deadline
+        )
+        self.assertGreaterEqual(time.monotonic(), deadline)
+
+    def testlatencyTimer(self):
+        self.device.setLatencyTimer(50)
+        self.device.setTimeouts(10, 0)
+        self.sim.feed(b"x")
+        self.assertEqual(self.device.getQueueStatus(), 0)
+        self.assertEqual(self.device.read(1), b"")
+        self.sim.feed(bytes(512))
+        self.device.setTimeouts(1000, 0)
+        self.assertEqual(len(self.device.read(513)), 513)
+
+    def testthreads(self):
+        self.device.setLatencyTimer(7)
+        self.sim.inputs = 0xA5
+        getBitMode = sim.FT_GetBitMode
+        results = []
+
+        def interleaved(handle, pins):
+            # Another thread reads the same kind of out-parameter back
+            # between this call and its read back
+            getBitMode(handle, pins)
+            thread = threading.Thread(
+                target=lambda: results.append(self.device.getLatencyTimer())
+            )
+            thread.start()
+            thread.join()
+
+        with mock.patch.object(sim, "FT_GetBitMode", interleaved):
+            self.assertEqual(self.device.getBitMode(), 0xA5)
+        self.assertEqual(results, [7])
+
+    def testreadTimeout(self):
+        self.device.setTimeouts(20, 0)
+        start = time.monotonic()
+        self.assertEqual(self.device.read(4), b"")
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+
+    def testsyncBitbang(self):
+        self.device.setTimeouts(1000, 0)
+        self.device.setBitMode(0x0F, defines.BITMODE_SYNC_BITBANG)
+        self.sim.inputs = 0xA0
+        self.device.write(bytes(i & 0xFF for i in range(1, 600)))
+        samples = self.device.read(599)
+        self.assertEqual(samples[0], 0xA0)
+        self.assertEqual(samples[1:4], bytes((0xA1, 0xA2, 0xA3)))
+        self.assertEqual(self.device.getBitMode(), 0xA0 | (599 & 0x0F))
+
+    def testmodemStatus(self):
+        self.device.setRts()
+        self.assertEqual(self.device.getModemStatus(), defines.ModemStatus.CTS)
+        self.device.clrRts()
+        self.assertEqual(self.device.getModemStatus(), 0)
+
+    def testwait_for_event(self):
+        self.device.setLatencyTimer(1)
+        self.sim.feed(b"data", delay=0.05)
+        start = time.monotonic()
+        events = self.device.wait_for_event(defines.EVENT_RXCHAR, timeout=2000)
+        self.assertEqual(events, defines.EVENT_RXCHAR)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def testeeprom(self):
+        self.device.eeProgram(
+            Manufacturer=b"ACME",
+            ManufacturerId=b"AC",
+            Description=b"Widget",
+            SerialNumber=b"AC000042",
+        )
+        data = self.device.eeRead()
+        self.assertEqual(data.Manufacturer, b"ACME")
+        self.assertEqual(data.SerialNumber, b"AC000042")
+        self.device.eeUAWrite(b"user data")
+        self.assertEqual(self.device.eeUARead(9), b"user data")
+        self.assertEqual(self.device.eeUASize(), 128)
+
+    def testunplug(self):
+        sim.removeDevice(self.sim)
+        with self.assertRaises(ftd2xx.DeviceError) as cm:
+            self.device.getQueueStatus()
+        self.assertEqual(cm.exception.message, "IO_ERROR")
+        self.assertRaises(ftd2xx.DeviceError, ftd2xx.openEx, b"SIMTEST1")
@@ -0,0 +1,68 @@
+import unittest
+
+from .. import spi
+from . import FakeDevice
+
+
+class ZeroDevice(FakeDevice):
+    """Stand-in for an FTD2XX in MPSSE mode that reads back zeros"""
+
+    def __init__(self):
+        self.written = bytearray()
+        self.writes = 0
+        self.reads = 0
+
+    def write_all(self, data):
+        self.writes += 1
+        self.written += data
+        return len(data)
+
+    def readinto(self, buffer):
+        self.reads += 1
+        return memoryview(buffer).nbytes
+
+
+class TestSpiController(unittest.TestCase):
+    def testclockDivisor(self):
+        self.assertEqual(spi.clockDivisor(30e6), (0, 30e6))
+        self.assertEqual(spi.clockDivisor(1e6), (29, 1e6))
+        self.assertEqual(spi.clockDivisor(7e6)[1], 6e6)
+
+    def testqueue(self):
+        device = ZeroDevice()
+        controller = spi.SpiController(device, 30e6, mode=0, cs_count=2, init=False)
+        device.written.clear()
+        controller.queue(b"\x9f", 3, cs=1)
+        controller.flush()
+        self.assertEqual(
+            bytes(device.written),
+            bytes.fromhex("80 08 1b 11 0000 9f 20 0200 80 18 1b 87"),
+        )
+
+    def testwrite(self):
+        device = ZeroDevice()
+        controller = spi.SpiController(device, 30e6, init=False)
+        device.written.clear()
+        device.writes = device.reads = 0
+        controller.write(b"\x06")
+        self.assertEqual((device.writes, device.reads), (1, 0))
+        self.assertIn(b"\x11\x00\x00\x06", bytes(device.written))
+        self.assertEqual(controller.pending, 0)
+
+    def testpipelining(self):
+        device = ZeroDevice()
+        controller = spi.SpiController(device, 30e6, init=False)
+        device.writes = device.reads = 0
+        transfers = [controller.queue(b"\x03\x00\x00", 256) for _ in range(100)]
+        controller.flush()
+        self.assertEqual((device.writes, device.reads), (1, 1))
+        self.assertEqual(transfers[-1].data, bytes(256))
+
+    def testlargeread(self):
+        device = ZeroDevice()
+        controller = spi.SpiController(device, 30e6, max_read=4096, init=False)
+        device.writes = 0
+        transfer = controller.queue(b"\x03\x00\x00", 10000)
+        controller.flush()
+        self.assertEqual(device.writes, 3)
+        self.assertEqual(len(transfer.data), 10000)
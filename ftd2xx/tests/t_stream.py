@@ -0,0 +1,52 @@
+import time
+import unittest
+
+from ..stream import StreamReader
+
+
+class LoopDevice:
+    """Stand-in for FTD2XX that returns a fixed byte sequence"""
+
+    def __init__(self, data: bytes, chunk: int):
+        self.data = data
+        self.chunk = chunk
+        self.pos = 0
+
+    def setTimeouts(self, read, write):
+        pass
+
+    def getQueueStatus(self):
+        return min(self.chunk, len(self.data) - self.pos)
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        n = min(view.nbytes, len(self.data) - self.pos)
+        if not n:
+            time.sleep(0.001)
+        view[:n] = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return n
+
+
+class TestStreamReader(unittest.TestCase):
+    def testread(self):
+        device = LoopDevice(bytes(range(256)) * 16, 100)
+        received = bytearray()
+        with StreamReader(device, size=1 << 16, chunk_size=512) as stream:
+            while len(received) < len(device.data):
+                data = stream.read(1000, timeout=1.0)
+                if not data:
+                    break
+                received += data
+        self.assertEqual(received, device.data)
+        self.assertEqual(stream.overflows, 0)
+
+    def testoverflow(self):
+        device = LoopDevice(bytes(range(256)) * 16, 100)
+        with StreamReader(device, size=1024, chunk_size=512) as stream:
+            while device.pos < len(device.data):
+                time.sleep(0.001)
+        self.assertEqual(stream.read_available(), 1024)
+        self.assertEqual(stream.peek(4), stream.read(4))
+        self.assertEqual(stream.dropped, len(device.data) - 1024)
+        self.assertGreater(stream.overflows, 0)